@@ -0,0 +1,119 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+AV_BASE_URL = "https://www.alphavantage.co/query"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at `rate_per_minute`; at most `burst` can be
+    banked. With burst=1 calls are spaced exactly 60/rate seconds apart, which
+    never exceeds a sliding per-minute quota (Alpha Vantage free tier: 5/min).
+    """
+
+    def __init__(self, rate_per_minute, burst=1, clock=time.monotonic, sleep=time.sleep):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """ Blocks until a token is available, then consumes it. """
+        while True:
+            with self._lock:
+                now = self._clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = (1.0 - self.tokens) / self.rate
+            self._sleep(wait)
+
+
+class AlphaVantageClient:
+    """
+    Pooled, concurrent Alpha Vantage EARNINGS fetcher.
+
+    All requests share one keep-alive session and one TokenBucket, so the
+    effective rate is bounded by the key's quota regardless of `max_workers`.
+    Throttle responses (HTTP 429, or a 200 carrying a "Note"/"Information"
+    rate-limit message) are retried with exponential backoff.
+    """
+
+    def __init__(self, api_key, requests_per_minute=5, burst=1, max_workers=4,
+                 max_retries=3, backoff_seconds=15.0, base_url=AV_BASE_URL, timeout=30):
+        self.logger = logging.getLogger(__name__)
+        self.api_key = api_key
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.base_url = base_url
+        self.timeout = timeout
+        self.limiter = TokenBucket(requests_per_minute, burst=burst)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @staticmethod
+    def _is_throttled(response, data):
+        if response.status_code == 429:
+            return True
+        message = str(data.get("Note") or data.get("Information") or "").lower()
+        return "rate limit" in message or "call frequency" in message or "requests per" in message
+
+    def fetch_earnings(self, ticker):
+        """
+        Returns the quarterlyEarnings list for `ticker` ([] if unavailable).
+        """
+        params = {"function": "EARNINGS", "symbol": ticker, "apikey": self.api_key}
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                r = self.session.get(self.base_url, params=params, timeout=self.timeout)
+                data = r.json() if r.content else {}
+            except (requests.RequestException, ValueError) as e:
+                self.logger.error(f"AV Fetch Error {ticker}: {e}")
+                return []
+
+            if self._is_throttled(r, data):
+                if attempt == self.max_retries:
+                    break
+                delay = self.backoff_seconds * (2 ** attempt)
+                self.logger.warning(f"AV throttled on {ticker}, retrying in {delay:.0f}s")
+                time.sleep(delay)
+                continue
+
+            if "quarterlyEarnings" in data:
+                return data["quarterlyEarnings"]
+            self.logger.warning(f"No quarterly earnings data found for {ticker}. Response: {list(data.keys())}")
+            return []
+
+        self.logger.error(f"AV Fetch Error {ticker}: still throttled after {self.max_retries} retries")
+        return []
+
+    def fetch_earnings_many(self, tickers):
+        """
+        Fetches tickers concurrently. Yields (ticker, quarterlyEarnings) as each completes.
+        """
+        tickers = list(tickers)
+        if not tickers:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tickers))) as pool:
+            futures = {pool.submit(self.fetch_earnings, t): t for t in tickers}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
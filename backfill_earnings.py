@@ -1,6 +1,14 @@
-import requests
+import argparse
+import json
+import os
+import threading
 import time
-import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
 
 # Tickers from src/tickers.ts
 QQQ_TICKERS = [
@@ -15,55 +23,196 @@ QQQ_TICKERS = [
     "TTD", "FANG", "ALGN", "ILMN", "WBA", "CRWD", "DDOG", "ZS", "LCID", "SIRI"
 ]
 
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
+# HTTP codes that mean "slow down" rather than "this symbol failed"
+THROTTLE_CODES = {429, 502, 503, 504}
+
+
+class AdaptivePacer:
+    """
+    Spaces request starts across all worker threads by a shared delay that adapts
+    to the worker's responses: throttling (429/5xx, honouring Retry-After) or
+    latency above `target_latency` doubles the delay, fast successes shrink it
+    by 10% down to `min_delay`.
+    """
+
+    def __init__(self, delay, min_delay=0.5, max_delay=60.0, target_latency=10.0):
+        self.delay = delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.target_latency = target_latency
+        self._next_start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.delay
+        time.sleep(max(0.0, start - now))
+
+    def record(self, status_code, latency, retry_after=None):
+        with self._lock:
+            if status_code in THROTTLE_CODES or latency > self.target_latency:
+                self.delay = min(self.max_delay, max(self.delay * 2, retry_after or 0, self.min_delay))
+            elif status_code == 200:
+                self.delay = max(self.min_delay, self.delay * 0.9)
 
-def backfill(base_url, delay=15):
-    print(f"Starting backfill for {len(QQQ_TICKERS)} tickers...")
+
+class Journal:
+    """
+    Append-only JSONL record of finished symbols, so an interrupted run resumes
+    where it stopped: its successful symbols are skipped on the next run. A run
+    that reaches the end clears the journal, even if some symbols failed, so the
+    next scheduled run refreshes everything (failed symbols included).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def completed(self):
+        done = set()
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from a crash
+                    if entry.get('status') == 'ok':
+                        done.add(entry['symbol'])
+        return done
+
+    def append(self, entry):
+        with self._lock, open(self.path, 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self):
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def update_symbol(session, base_url, symbol, pacer, max_attempts=4):
+    """ POSTs /api/update for one symbol, retrying throttled responses. Returns a journal entry. """
+    started = time.monotonic()
+    message = ""
+    for attempt in range(1, max_attempts + 1):
+        pacer.wait()
+        t0 = time.monotonic()
+        try:
+            # Note: The worker endpoint expects POST
+            response = session.post(f"{base_url}/api/update", params={"symbol": symbol}, timeout=30)
+            latency = time.monotonic() - t0
+            retry_after = response.headers.get('Retry-After')
+            pacer.record(response.status_code, latency, float(retry_after) if retry_after and retry_after.isdigit() else None)
+            if response.status_code == 200:
+                data = response.json()
+                message = f"{data.get('message', 'No msg')} (Count: {data.get('count', 0)})"
+                status = 'ok'
+                break
+            message = f"Failed ({response.status_code}): {response.text[:200]}"
+            status = 'failed'
+            if response.status_code not in THROTTLE_CODES:
+                break
+        except Exception as e:
+            pacer.record(None, time.monotonic() - t0)
+            message = f"Error: {e}"
+            status = 'failed'
+    return {
+        "symbol": symbol,
+        "status": status,
+        "attempts": attempt,
+        "seconds": round(time.monotonic() - started, 3),
+        "message": message,
+        "ts": datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def refresh_quotes(session, base_url, symbols, chunk_size=50):
+    """ Refreshes quotes for the backfilled symbols through /api/refresh-batch. """
+    for i in range(0, len(symbols), chunk_size):
+        batch = symbols[i:i + chunk_size]
+        try:
+            response = session.post(f"{base_url}/api/refresh-batch", json={"symbols": batch}, timeout=120)
+            data = response.json()
+            print(f"Quotes refresh [{i + 1}-{i + len(batch)}]: updated {data.get('updatedCount', 0)}, failed {data.get('failedCount', 0)}")
+        except Exception as e:
+            print(f"Quotes refresh [{i + 1}-{i + len(batch)}] error: {e}")
+
+
+def print_summary(entries, elapsed):
+    ok = [e for e in entries if e['status'] == 'ok']
+    failed = [e for e in entries if e['status'] != 'ok']
+    print("\n--------------------------")
+    print(f"Backfill Complete in {elapsed:.1f}s. Success: {len(ok)}, Failed: {len(failed)}")
+    if entries:
+        secs = sorted(e['seconds'] for e in entries)
+        p50 = secs[len(secs) // 2]
+        p95 = secs[min(len(secs) - 1, int(len(secs) * 0.95))]
+        print(f"Per-ticker time: mean {sum(secs) / len(secs):.2f}s, p50 {p50:.2f}s, p95 {p95:.2f}s, max {secs[-1]:.2f}s")
+        print("Slowest: " + ", ".join(f"{e['symbol']} {e['seconds']:.1f}s" for e in sorted(entries, key=lambda e: -e['seconds'])[:5]))
+    if failed:
+        print("Failed: " + ", ".join(f"{e['symbol']} ({e['message']})" for e in failed))
+
+
+def backfill(base_url, delay=2.0, concurrency=4, journal_path="backfill_journal.jsonl", restart=False,
+             quotes=True, tickers=QQQ_TICKERS):
+    journal = Journal(journal_path)
+    if restart:
+        journal.clear()
+    done = journal.completed()
+    pending = [t for t in tickers if t not in done]
+
+    print(f"Starting backfill for {len(tickers)} tickers ({len(done)} already done, {len(pending)} pending)...")
     print(f"Target URL: {base_url}")
-    print(f"Delay between requests: {delay} seconds")
+    print(f"Concurrency: {concurrency}, initial delay between requests: {delay} seconds")
     
     # Configure session with retries and headers
     session = requests.Session()
     retries = Retry(total=5, backoff_factor=2, status_forcelist=[502, 503, 504])
-    session.mount('https://', HTTPAdapter(max_retries=retries))
+    adapter = HTTPAdapter(max_retries=retries, pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.auth = (os.getenv("AUTH_USERNAME", "admin"), os.getenv("AUTH_PASSWORD", "password"))
     session.headers.update({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     })
 
-    success_count = 0
-    fail_count = 0
-    
-    for i, symbol in enumerate(QQQ_TICKERS):
-        print(f"[{i+1}/{len(QQQ_TICKERS)}] Updating {symbol}...", end=' ', flush=True)
-        try:
-            # Note: The worker endpoint expects POST
-            response = session.post(f"{base_url}/api/update", params={"symbol": symbol}, timeout=30)
-            if response.status_code == 200:
-                data = response.json()
-                print(f"OK - {data.get('message', 'No msg')} (Count: {data.get('count', 0)})")
-                success_count += 1
-            else:
-                print(f"Failed ({response.status_code}): {response.text}")
-                fail_count += 1
-        except Exception as e:
-            print(f"Error: {e}")
-            fail_count += 1
-            
-        if i < len(QQQ_TICKERS) - 1:
-            time.sleep(delay)
-            
-    print("\n--------------------------")
-    print(f"Backfill Complete. Success: {success_count}, Failed: {fail_count}")
+    pacer = AdaptivePacer(delay)
+    entries = []
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(update_symbol, session, base_url, symbol, pacer) for symbol in pending]
+        for i, future in enumerate(as_completed(futures)):
+            entry = future.result()
+            journal.append(entry)
+            entries.append(entry)
+            print(f"[{i+1}/{len(pending)}] {entry['symbol']}: {entry['message']} in {entry['seconds']:.1f}s (pace {pacer.delay:.1f}s)", flush=True)
+
+    if quotes:
+        refresh_quotes(session, base_url, [e['symbol'] for e in entries if e['status'] == 'ok'])
+
+    print_summary(entries, time.monotonic() - started)
+    # Not interrupted: the journal only exists to resume interrupted runs. A permanently
+    # failing symbol must not keep it alive, or the others would never be refreshed again.
+    journal.clear()
+    return entries
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python backfill_earnings.py <WORKER_URL> [DELAY_SECONDS]")
-        print("Example: python backfill_earnings.py https://my-worker.workers.dev 15")
-        print("Example (Local): python backfill_earnings.py http://localhost:8787 5")
-        sys.exit(1)
-        
-    url = sys.argv[1].rstrip('/')
-    delay_sec = int(sys.argv[2]) if len(sys.argv) > 2 else 15
-    
-    backfill(url, delay_sec)
+    parser = argparse.ArgumentParser(
+        description="Backfill earnings for the QQQ universe through the worker",
+        epilog="Example: python backfill_earnings.py https://my-worker.workers.dev 2 --concurrency 4",
+    )
+    parser.add_argument('url', help='Worker URL (e.g. http://localhost:8787)')
+    parser.add_argument('delay', nargs='?', type=float, default=2.0, help='Initial delay between requests (adapts to the worker)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Maximum requests in flight')
+    parser.add_argument('--journal', default='backfill_journal.jsonl', help='Checkpoint journal used to resume interrupted runs')
+    parser.add_argument('--restart', action='store_true', help='Ignore the journal and backfill every ticker')
+    parser.add_argument('--no-quotes', action='store_true', help='Skip the /api/refresh-batch quote refresh at the end')
+    args = parser.parse_args()
+
+    backfill(args.url.rstrip('/'), args.delay, concurrency=args.concurrency, journal_path=args.journal,
+             restart=args.restart, quotes=not args.no_quotes)
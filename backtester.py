@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 
+from strategy import RebalanceSchedule
+
 class Backtester:
     def __init__(self, initial_capital=100000.0):
         self.initial_capital = initial_capital
@@ -11,11 +13,14 @@ class Backtester:
         
         Args:
             prices (pd.DataFrame): Daily Close/Adj Close prices.
-            weights (pd.DataFrame): Target weights for each day (0 to 1).
+            weights (pd.DataFrame or RebalanceSchedule): Target weights for each day (0 to 1).
             
         Returns:
             pd.DataFrame: Portfolio metrics (Total Value, Daily Return)
         """
+        if isinstance(weights, RebalanceSchedule):
+            return self._run_schedule(prices, weights)
+
         # Align data
         common_index = prices.index.intersection(weights.index)
         prices = prices.loc[common_index]
@@ -41,6 +46,51 @@ class Backtester:
         
         portfolio_returns = (weights * asset_returns).sum(axis=1)
         
+        return self._results(portfolio_returns)
+
+    def run_batch(self, prices, weights, names=None):
+        """
+        Simulate K weight sets in one pass.
+
+        Args:
+            prices (pd.DataFrame): Daily Close/Adj Close prices for every asset any strategy holds.
+            weights: Either an ndarray of shape (K, days, assets) aligned to `prices`, or a
+                list/dict of weights DataFrames and/or RebalanceSchedules.
+            names: Strategy labels (default: dict keys or 0..K-1).
+
+        Returns:
+            pd.DataFrame: Columns (strategy, Portfolio_Value | Daily_Return), so
+            `results[name]` matches run_backtest for that strategy. All strategies share one
+            timeline: the dates common to `prices` and every weights frame.
+        """
+        if isinstance(weights, dict):
+            names = list(weights) if names is None else names
+            weights = list(weights.values())
+
+        index = prices.index
+        if isinstance(weights, np.ndarray):
+            stack = weights
+        else:
+            for w in weights:
+                index = index.intersection(w.index)
+            stack = np.zeros((len(weights), len(index), len(prices.columns)))
+            for k, w in enumerate(weights):
+                dense = w.weights_at(index) if isinstance(w, RebalanceSchedule) else w.reindex(index=index)
+                stack[k] = dense.reindex(columns=prices.columns).fillna(0).to_numpy()
+        names = list(range(len(stack))) if names is None else list(names)
+
+        # Asset returns once for all strategies; weights of day t-1 earn day t's return
+        asset_returns = prices.loc[index].pct_change().fillna(0).to_numpy()
+        portfolio_returns = np.zeros((len(stack), len(index)))
+        if len(index) > 1:
+            np.einsum('ktn,tn->kt', stack[:, :-1], asset_returns[1:], out=portfolio_returns[:, 1:], optimize=True)
+        equity_curves = np.cumprod(1 + portfolio_returns, axis=1) * self.initial_capital
+
+        columns = pd.MultiIndex.from_product([names, ['Portfolio_Value', 'Daily_Return']])
+        data = np.stack([equity_curves, portfolio_returns], axis=2).transpose(1, 0, 2).reshape(len(index), -1)
+        return pd.DataFrame(data, index=index, columns=columns)
+
+    def _results(self, portfolio_returns):
         # Calculate equity curve
         equity_curve = (1 + portfolio_returns).cumprod() * self.initial_capital
         
@@ -50,3 +100,134 @@ class Backtester:
         })
         
         return results
+
+    def _run_schedule(self, prices, schedule):
+        """
+        run_backtest for a sparse RebalanceSchedule, without building the dense
+        weights frame: each day's return only reads the columns held by the event
+        standing the day before (same one-day signal lag as the dense path).
+        """
+        common_index = prices.index.intersection(schedule.index)
+        prices = prices.loc[common_index]
+
+        # Only held tickers that have prices matter; the rest contribute zero as in the dense path
+        column_pos = prices.columns.get_indexer(schedule.columns)
+        entry_cols = column_pos[schedule.ticker_idx]
+        held_cols = np.unique(entry_cols[entry_cols >= 0])
+        asset_returns = prices.iloc[:, held_cols].pct_change().fillna(0).to_numpy()
+        local_col = np.searchsorted(held_cols, entry_cols)
+
+        # Event standing on the previous day (shift(1)); day 0 holds nothing
+        standing = np.empty(len(common_index), dtype=np.int64)
+        standing[0:1] = -1
+        standing[1:] = schedule.event_at(common_index[:-1])
+
+        portfolio_returns = np.zeros(len(common_index))
+        for k in np.unique(standing[standing >= 0]):
+            span = slice(schedule.offsets[k], schedule.offsets[k + 1])
+            priced = entry_cols[span] >= 0
+            days = np.flatnonzero(standing == k)
+            portfolio_returns[days] = asset_returns[np.ix_(days, local_col[span][priced])] @ schedule.weights[span][priced]
+
+        return self._results(pd.Series(portfolio_returns, index=common_index))
+
+
+class DriftBacktester:
+    """
+    Portfolio simulator that holds share counts between rebalance events.
+
+    Unlike Backtester (constant weights, i.e. rebalanced daily for free), positions
+    drift with prices until the next event, and each event pays
+    `commission_per_trade` per ticker traded plus `commission_rate` and
+    `slippage_bps` on the traded notional. Trades happen at the close of the day
+    the new weights take effect, which is the timing Backtester's one-day shift implies.
+
+    Only events are visited in Python; each holding period is valued with one
+    matrix product over its days.
+    """
+
+    def __init__(self, initial_capital=100000.0, commission_per_trade=0.0, commission_rate=0.0, slippage_bps=0.0):
+        self.initial_capital = initial_capital
+        self.commission_per_trade = commission_per_trade
+        self.commission_rate = commission_rate
+        self.slippage_bps = slippage_bps
+
+    def _cost(self, trades):
+        notional = np.abs(trades).sum()
+        n_trades = np.count_nonzero(trades)
+        return n_trades * self.commission_per_trade + notional * (self.commission_rate + self.slippage_bps / 1e4), notional
+
+    def run_backtest(self, prices, weights):
+        """
+        Simulate a drifting, cost-aware portfolio.
+
+        Args:
+            prices (pd.DataFrame): Daily Close/Adj Close prices.
+            weights (pd.DataFrame or RebalanceSchedule): Target weights.
+
+        Returns:
+            pd.DataFrame: Portfolio_Value, Daily_Return, Turnover (traded notional / value,
+            non-zero on trade days) and Costs per day.
+        """
+        schedule = weights if isinstance(weights, RebalanceSchedule) else RebalanceSchedule.from_weights(weights)
+        common_index = prices.index.intersection(schedule.index)
+        n_days = len(common_index)
+
+        column_pos = prices.columns.get_indexer(schedule.columns)
+        entry_cols = column_pos[schedule.ticker_idx]
+        held_cols = np.unique(entry_cols[entry_cols >= 0])
+        # Holdings are valued at the last known price; a ticker is only bought once it has one
+        px = prices.loc[common_index].iloc[:, held_cols].ffill().to_numpy(dtype=np.float64)
+        priced = ~np.isnan(px)
+        px = np.where(priced, px, 0.0)
+        local_col = np.searchsorted(held_cols, entry_cols)
+
+        # Trade wherever the standing event changes between consecutive days
+        standing = schedule.event_at(common_index)
+        changes = np.flatnonzero(np.diff(standing, prepend=-1) != 0)
+        trade_days = changes[standing[changes] >= 0]
+
+        values = np.full(n_days, float(self.initial_capital))
+        turnover = np.zeros(n_days)
+        costs = np.zeros(n_days)
+        shares = np.zeros(len(held_cols))
+        cash = float(self.initial_capital)
+
+        for i, day in enumerate(trade_days):
+            k = standing[day]
+            span = slice(schedule.offsets[k], schedule.offsets[k + 1])
+            cols = local_col[span][entry_cols[span] >= 0]
+            w = schedule.weights[span][entry_cols[span] >= 0]
+            tradable = priced[day, cols]
+            cols, w = cols[tradable], w[tradable]
+
+            current = shares * px[day]
+            value = cash + current.sum()
+            target = np.zeros_like(current)
+            target[cols] = w * value
+            # Fund the costs from the new positions: size once on the gross value, then on the net
+            cost, _ = self._cost(target - current)
+            target[cols] = w * (value - cost)
+            cost, notional = self._cost(target - current)
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                shares = np.where(px[day] > 0, target / px[day], 0.0)
+            cash = value - target.sum() - cost
+            costs[day] = cost
+            turnover[day] = notional / value if value else 0.0
+
+            # Value the holding period up to the next trade in one product
+            end = trade_days[i + 1] if i + 1 < len(trade_days) else n_days
+            values[day:end] = cash + px[day:end] @ shares
+
+        portfolio_value = pd.Series(values, index=common_index)
+        daily_return = portfolio_value.pct_change().fillna(0)
+        if n_days:
+            # A trade on the first day is charged against the starting capital
+            daily_return.iloc[0] = values[0] / self.initial_capital - 1
+        return pd.DataFrame({
+            'Portfolio_Value': portfolio_value,
+            'Daily_Return': daily_return,
+            'Turnover': turnover,
+            'Costs': costs,
+        })
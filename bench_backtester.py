@@ -0,0 +1,62 @@
+"""
+Benchmarks the backtest engines on a synthetic panel:
+Backtester on dense weights, Backtester on a RebalanceSchedule, DriftBacktester,
+and K separate runs against one Backtester.run_batch.
+
+    python bench_backtester.py [--tickers 500] [--years 20] [--top_n 20]
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from backtester import Backtester, DriftBacktester
+from bench_strategy import synthetic_peg_panel, timed
+from strategy import PegStrategy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backtest engines")
+    parser.add_argument('--tickers', type=int, default=500)
+    parser.add_argument('--years', type=int, default=20)
+    parser.add_argument('--top_n', type=int, default=20)
+    parser.add_argument('--random', type=int, default=8, help='Random-portfolio baselines in the batch comparison')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    peg = synthetic_peg_panel(args.tickers, args.years)
+    rng = np.random.default_rng(1)
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, peg.shape), axis=0)),
+                          index=peg.index, columns=peg.columns)
+    strategy = PegStrategy(top_n=args.top_n)
+    schedule = strategy.generate_schedule(peg, prices.index)
+    weights = schedule.to_dense()
+    print(f"Panel: {prices.shape[0]} days x {prices.shape[1]} tickers, {len(schedule)} rebalances")
+
+    runs = {
+        "Backtester (dense weights)": lambda: Backtester().run_backtest(prices, weights),
+        "Backtester (schedule)": lambda: Backtester().run_backtest(prices, schedule),
+        "DriftBacktester (10 bps)": lambda: DriftBacktester(slippage_bps=10).run_backtest(prices, schedule),
+    }
+    for name, run in runs.items():
+        seconds, result = timed(run, args.repeat)
+        print(f"{name:<28} {seconds * 1000:8.1f} ms   final value {result['Portfolio_Value'].iloc[-1]:,.0f}")
+
+    # Strategy + benchmark + random-portfolio baselines: K separate runs vs one batch
+    n_random = args.random
+    random_weights = []
+    for _ in range(n_random):
+        picks = rng.choice(prices.shape[1], args.top_n, replace=False)
+        w = pd.DataFrame(0.0, index=prices.index, columns=prices.columns)
+        w.iloc[:, picks] = 1.0 / args.top_n
+        random_weights.append(w)
+    all_weights = [weights, pd.DataFrame(1.0 / prices.shape[1], index=prices.index, columns=prices.columns)] + random_weights
+    bt = Backtester()
+    loop_s, _ = timed(lambda: [bt.run_backtest(prices, w) for w in all_weights], 1)
+    batch_s, _ = timed(lambda: bt.run_batch(prices, all_weights), args.repeat)
+    print(f"{len(all_weights)} strategies: separate runs {loop_s * 1000:.1f} ms, run_batch {batch_s * 1000:.1f} ms "
+          f"({loop_s / batch_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Stationary bootstrap confidence intervals for backtest metrics.
+
+Daily returns are resampled in blocks of geometric length (Politis & Romano),
+so serial dependence such as volatility clustering survives. All paths of a
+chunk live in one (paths, days) array, and every metric is computed for all
+paths at once. Strategy and benchmark are resampled with the same indices,
+which keeps their correlation and makes the active-return test paired.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from metrics import Metrics
+
+
+def stationary_bootstrap_indices(n_days, n_paths, mean_block=20, rng=None):
+    """
+    (n_paths, n_days) array of row indices. Each day starts a new block with
+    probability 1/mean_block, otherwise continues the previous one (wrapping).
+    """
+    rng = np.random.default_rng(rng)
+    days = np.arange(n_days)
+    new_block = rng.random((n_paths, n_days)) < 1.0 / mean_block
+    new_block[:, 0] = True
+    # Day on which each day's block started, and where in the sample that block starts
+    block_start = np.where(new_block, days, 0)
+    np.maximum.accumulate(block_start, axis=1, out=block_start)
+    starts = rng.integers(0, n_days, size=(n_paths, n_days))
+    origin = np.take_along_axis(starts, block_start, axis=1)
+    origin += days - block_start
+    origin %= n_days
+    return origin
+
+
+def path_metrics(returns, years):
+    """
+    Metrics.get_summary_values for every row of a (paths, days) returns array,
+    as {metric: (paths,) array}. `years` is the calendar span used for CAGR.
+    """
+    return Metrics.summary_arrays(returns.T, years=years)
+
+
+def _bootstrap_chunk(returns, benchmark, years, n_paths, mean_block, seed):
+    idx = stationary_bootstrap_indices(len(returns), n_paths, mean_block, np.random.default_rng(seed))
+    out = path_metrics(returns[idx], years)
+    if benchmark is not None:
+        bm = path_metrics(benchmark[idx], years)
+        out["active_return"] = out["total_return"] - bm["total_return"]
+    return out
+
+
+def bootstrap_metrics(daily_returns, benchmark_returns=None, n_paths=10000, mean_block=20, confidence=0.95,
+                      seed=None, chunk_size=2500, max_workers=1):
+    """
+    Stationary-bootstrap distribution of the summary metrics.
+
+    Args:
+        daily_returns (pd.Series): Strategy Daily_Return.
+        benchmark_returns (pd.Series): Optional benchmark Daily_Return; adds `active_return`
+            (total return minus the benchmark's).
+        n_paths, mean_block: Number of resampled paths and expected block length in days.
+        chunk_size: Paths held in memory at once; max_workers > 1 spreads chunks over processes.
+
+    Returns:
+        (pd.DataFrame, float or None): per metric the point estimate, bootstrap mean and the
+        `confidence` interval; and the one-sided p-value for active return <= 0 (share of paths
+        where the strategy does not beat the benchmark), None without a benchmark.
+    """
+    if benchmark_returns is not None:
+        aligned = pd.concat([daily_returns, benchmark_returns], axis=1, join='inner').fillna(0)
+        daily_returns, benchmark_returns = aligned.iloc[:, 0], aligned.iloc[:, 1]
+    returns = daily_returns.to_numpy(dtype=np.float64)
+    benchmark = None if benchmark_returns is None else benchmark_returns.to_numpy(dtype=np.float64)
+    days = (daily_returns.index[-1] - daily_returns.index[0]).days if len(daily_returns) > 1 else 0
+    years = days / 365.25
+
+    point = path_metrics(returns[None, :], years)
+    if benchmark is not None:
+        point["active_return"] = point["total_return"] - path_metrics(benchmark[None, :], years)["total_return"]
+
+    sizes = [min(chunk_size, n_paths - start) for start in range(0, n_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(returns, benchmark, years, size, mean_block, s) for size, s in zip(sizes, seeds)]
+    if max_workers > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            chunks = list(pool.map(_bootstrap_chunk, *zip(*args)))
+    else:
+        chunks = [_bootstrap_chunk(*a) for a in args]
+    samples = {k: np.concatenate([c[k] for c in chunks]) for k in point}
+
+    alpha = (1 - confidence) / 2
+    table = pd.DataFrame({
+        "estimate": {k: v[0] for k, v in point.items()},
+        "mean": {k: v.mean() for k, v in samples.items()},
+        "low": {k: np.quantile(v, alpha) for k, v in samples.items()},
+        "high": {k: np.quantile(v, 1 - alpha) for k, v in samples.items()},
+    })
+    p_value = None
+    if benchmark is not None:
+        p_value = (1 + np.count_nonzero(samples["active_return"] <= 0)) / (1 + n_paths)
+    return table, p_value
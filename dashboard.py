@@ -2,20 +2,153 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import os
+import queue
 import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 # Ensure d:/AntigravityProjects/forward_peg_system is in path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from data_loader import DataProvider
+from replay_provider import make_data_provider
 from strategy import PegStrategy
 from backtester import Backtester
 from metrics import Metrics
+from peg_factor import compute_forward_peg
+from rolling_metrics import ROLLING_WINDOWS, rolling_metrics
+from downsample import DEFAULT_CHART_WIDTH, downsample
 from dotenv import load_dotenv
 
 # Load env variables (API Key)
 load_dotenv()
 
+# Bounded, cross-session caches for the pipeline stages (least recently used entries are evicted)
+DATA_CACHE_ENTRIES = 4        # market data sets: (universe, date range, source)
+PEG_CACHE_ENTRIES = 4         # one PEG panel per market data set
+BACKTEST_CACHE_ENTRIES = 32   # strategy/backtest results per parameter set
+LIVE_DATA_TTL = 6 * 60 * 60   # seconds before live prices and earnings are fetched again
+
+
+def price_buffer_start(start_date):
+    """ Fetch 1 year extra data for Growth calculation (Lookback 252 days); 400 days to be safe. """
+    return start_date - pd.Timedelta(days=400)
+
+
+@st.cache_resource
+def _loaded_ranges():
+    """
+    (lock, {(source, fetch_start, fetch_end): load time}) of the data sets loaded
+    recently, shared by all sessions. Kept within the data caches' bounds (same TTL
+    and max_entries, least recently used dropped first), so a record only exists
+    while its data is normally still cached.
+    """
+    return threading.Lock(), OrderedDict()
+
+
+def covering_range(source, fetch_start, fetch_end):
+    """
+    (fetch_start, fetch_end) to request for `source`: the narrowest recently loaded
+    range containing the request, so its cached data is reused; otherwise the
+    request itself.
+    """
+    lock, ranges = _loaded_ranges()
+    now = time.monotonic()
+    with lock:
+        for key in [k for k, loaded in ranges.items() if now - loaded > LIVE_DATA_TTL]:
+            del ranges[key]
+        covering = [(s, e) for src, s, e in ranges if src == source and s <= fetch_start and fetch_end <= e]
+        if covering:
+            fetch_start, fetch_end = min(covering, key=lambda r: pd.Timestamp(r[1]) - pd.Timestamp(r[0]))
+        key = (source, fetch_start, fetch_end)
+        ranges.setdefault(key, now)
+        ranges.move_to_end(key)
+        while len(ranges) > DATA_CACHE_ENTRIES:
+            ranges.popitem(last=False)
+    return fetch_start, fetch_end
+
+
+def trim(df, start, end):
+    """ Rows of `df` in [start, end). """
+    return df.loc[(df.index >= start) & (df.index < end)]
+
+
+@st.cache_resource(max_entries=DATA_CACHE_ENTRIES)
+def get_data_provider(data_mode, archive_path, api_key, av_rpm):
+    """ One DataProvider per source, shared by sessions and by the concurrent loaders. """
+    return make_data_provider(
+        api_key=api_key,
+        record=archive_path if data_mode == "Record" else None,
+        replay=archive_path if data_mode == "Replay" else None,
+        av_requests_per_minute=av_rpm,
+    )
+
+
+# Stage 1 loaders, keyed by data_key = (etf, mode, archive, fetch start, fetch end). They run
+# on background threads (see the loading loop below), so they render nothing themselves.
+@st.cache_data(max_entries=DATA_CACHE_ENTRIES, ttl=LIVE_DATA_TTL, show_spinner=False)
+def load_prices(data_key, _dp):
+    etf_ticker, _, _, fetch_start, fetch_end = data_key
+    prices_full = _dp.fetch_price_history(_dp.fetch_universe_constituents(etf_ticker), fetch_start, fetch_end)
+    if prices_full.empty:
+        raise ValueError("No price data found.")
+    return prices_full
+
+
+@st.cache_data(max_entries=DATA_CACHE_ENTRIES, ttl=LIVE_DATA_TTL, show_spinner=False)
+def load_benchmark(data_key, _dp):
+    etf_ticker, _, _, fetch_start, fetch_end = data_key
+    return _dp.fetch_price_history([etf_ticker], fetch_start, fetch_end)
+
+
+@st.cache_data(max_entries=DATA_CACHE_ENTRIES, ttl=LIVE_DATA_TTL, show_spinner=False)
+def load_forward_eps(data_key, _dp, _progress=None):
+    """ Forward EPS panel; `_progress(ticker, status)` is called per ticker while fetching. """
+    etf_ticker, _, _, fetch_start, fetch_end = data_key
+    universe = _dp.fetch_universe_constituents(etf_ticker)
+    return _dp.get_forward_peg_data(universe, fetch_start, fetch_end, progress=_progress)
+
+
+@st.cache_data(max_entries=PEG_CACHE_ENTRIES, ttl=LIVE_DATA_TTL, show_spinner="Computing Forward PEG...")
+def load_peg_panel(data_key, _dp):
+    """ Stage 2: Forward PEG over the whole fetched range (growth lookback of 252 rows needs the buffer year). """
+    return compute_forward_peg(load_prices(data_key, _dp), load_forward_eps(data_key, _dp))
+
+
+@st.cache_data(max_entries=BACKTEST_CACHE_ENTRIES, ttl=LIVE_DATA_TTL, show_spinner="Running backtest...")
+def run_backtest_stage(data_key, start, end, top_n, _dp):
+    """
+    Stage 3: trims the cached panels to [start, end) and runs the strategy and the
+    buy-and-hold benchmark in one batched pass.
+    Returns (prices, peg_ratio, schedule, strategy results, benchmark results or None).
+    """
+    # The buffer year is only used for the PEG calculation, so `start` already has valid signals
+    prices = trim(load_prices(data_key, _dp), start, end)
+    peg_ratio = trim(load_peg_panel(data_key, _dp), start, end)
+    bm_price_full = load_benchmark(data_key, _dp)
+    bm_price = trim(bm_price_full, start, end) if not bm_price_full.empty else pd.DataFrame()
+
+    # Align indices exactly
+    common_dates = prices.index.intersection(peg_ratio.index)
+    prices = prices.loc[common_dates]
+    peg_ratio = peg_ratio.loc[common_dates]
+
+    strat = PegStrategy(top_n=top_n, rebalance_freq='ME')
+    schedule = strat.generate_schedule(peg_ratio, prices.index)
+
+    bt = Backtester(initial_capital=10000.0)
+    strategies = {'Strategy': schedule}
+    all_prices = prices
+    if not bm_price.empty:
+        # Create weights 1.0 for benchmark
+        strategies['Benchmark'] = pd.DataFrame(1.0, index=bm_price.index, columns=bm_price.columns)
+        all_prices = prices.join(bm_price[bm_price.columns.difference(prices.columns)], how='left')
+    batch = bt.run_batch(all_prices, strategies)
+    res_bm = batch['Benchmark'] if 'Benchmark' in strategies else None
+    return prices, peg_ratio, schedule, batch['Strategy'], res_bm
+
+
 st.set_page_config(page_title="Forward PEG Backtester", layout="wide")
 
 st.title("Forward PEG Stock Selection System")
@@ -24,239 +157,244 @@ st.title("Forward PEG Stock Selection System")
 st.sidebar.header("Configuration")
 
 api_key_input = st.sidebar.text_input("Alpha Vantage API Key", value=os.getenv("ALPHA_VANTAGE_API_KEY", ""), type="password")
-if not api_key_input:
+
+data_mode = st.sidebar.selectbox("Data Source", ["Live", "Record", "Replay"], index=2 if os.getenv("PEG_REPLAY") else 0)
+archive_path = ""
+if data_mode != "Live":
+    archive_path = st.sidebar.text_input(
+        "Archive Path", value=os.getenv("PEG_REPLAY") or os.getenv("PEG_RECORD") or "peg_archive.zip"
+    )
+
+if not api_key_input and data_mode != "Replay":
     st.sidebar.warning("Please provide an API Key in .env or here.")
 
+av_rpm = st.sidebar.number_input("AV Requests / Minute", min_value=1, max_value=1200, value=int(os.getenv("ALPHA_VANTAGE_RPM", 5)))
 etf_ticker = st.sidebar.text_input("Universe ETF (Benchmark)", value="QQQ")
 start_date = st.sidebar.date_input("Start Date", value=datetime(2020, 1, 1))
 end_date = st.sidebar.date_input("End Date", value=datetime.today())
 top_n = st.sidebar.number_input("Top N Stocks", min_value=1, max_value=20, value=5)
+rolling_window = st.sidebar.selectbox("Rolling Window (days)", ROLLING_WINDOWS, index=1)
 
 if st.sidebar.button("Run Backtest"):
-    if not api_key_input:
+    # Keep showing results on later reruns, so parameter changes re-render straight from the caches
+    st.session_state['backtest_requested'] = True
+
+if st.session_state.get('backtest_requested'):
+    if not api_key_input and data_mode != "Replay":
         st.error("API Key is required to fetch earnings data.")
     else:
-        with st.spinner("Fetching Data & Running Backtest..."):
-            # 1. Initialize
-            dp = DataProvider(api_key=api_key_input)
-            
-            # 2. Universe
-            universe = dp.fetch_universe_constituents(etf_ticker)
-            st.write(f"Universe Size: {len(universe)} stocks (from {etf_ticker} proxy)")
-            
-            # 3. Prices
-            # Fetch 1 year extra data for Growth calculation (Lookback 252 days)
-            buffer_start = start_date - pd.Timedelta(days=400) # 400 days to be safe for 252 trading days
-            
-            s_str_fetch = buffer_start.strftime('%Y-%m-%d')
-            s_str_backtest = start_date.strftime('%Y-%m-%d')
-            e_str = end_date.strftime('%Y-%m-%d')
-            
-            # Fetch Stock Prices (Extended)
-            prices_full = dp.fetch_price_history(universe, s_str_fetch, e_str)
+        # Stages are cached separately: data by (universe, date range), PEG by data, backtest by parameters
+        s_str_backtest = start_date.strftime('%Y-%m-%d')
+        e_str = end_date.strftime('%Y-%m-%d')
+        source = (etf_ticker, data_mode, archive_path)
+        data_key = source + covering_range(source, price_buffer_start(start_date).strftime('%Y-%m-%d'), e_str)
+        dp = get_data_provider(data_mode, archive_path, api_key_input, av_rpm)
+        universe = dp.fetch_universe_constituents(etf_ticker)
+        st.write(f"Universe Size: {len(universe)} stocks (from {etf_ticker} proxy)")
+        
+        # Prices, benchmark and earnings load concurrently; each chart is drawn as soon as its data arrives
+        st.subheader("Market Data")
+        m1, m2 = st.columns(2)
+        price_slot, bm_slot = m1.empty(), m2.empty()
+        price_slot.info("Loading prices...")
+        bm_slot.info(f"Loading {etf_ticker}...")
+        earnings_bar = st.progress(0.0, text="Loading earnings...")
+        
+        updates = queue.Queue()
+        loaders = ThreadPoolExecutor(max_workers=3)
+        futures = {
+            loaders.submit(load_prices, data_key, dp): 'prices',
+            loaders.submit(load_benchmark, data_key, dp): 'benchmark',
+            loaders.submit(load_forward_eps, data_key, dp, lambda t, s: updates.put((t, s))): 'eps',
+        }
+        try:
+            settled = 0
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                # Earnings progress is reported from the loader thread and drawn here
+                while not updates.empty():
+                    ticker, status = updates.get()
+                    settled += 1
+                    earnings_bar.progress(min(settled / len(universe), 1.0),
+                                          text=f"Earnings {settled}/{len(universe)}: {ticker} ({status})")
+                for future in done:
+                    name = futures[future]
+                    result = future.result()
+                    if name == 'prices':
+                        constituents = trim(result, s_str_backtest, e_str)
+                        price_slot.line_chart(downsample(constituents / constituents.bfill().iloc[0] * 100,
+                                                         DEFAULT_CHART_WIDTH // 2, method='lttb'))
+                    elif name == 'benchmark':
+                        if result.empty:
+                            bm_slot.warning(f"No price data for {etf_ticker}")
+                        else:
+                            bm_slot.line_chart(downsample(trim(result, s_str_backtest, e_str),
+                                                          DEFAULT_CHART_WIDTH // 2, method='lttb'))
+                    else:
+                        earnings_bar.progress(1.0, text=f"Earnings loaded for {len(universe)} stocks")
             
-            # Fetch Benchmark Price (Extended)
-            bm_price_full = dp.fetch_price_history([etf_ticker], s_str_fetch, e_str)
-            
-            if prices_full.empty:
-                st.error("No price data found.")
-                st.stop()
-                
-            # 4. Earnings / PEG
-            try:
-                # Use extended range for fetching earnings
-                earnings_data = dp.get_forward_peg_data(universe, s_str_fetch, e_str)
-                
-                # PEG Calc Logic
-                common_idx = prices_full.index.intersection(earnings_data.index)
-                p_aligned = prices_full.loc[common_idx]
-                e_aligned = earnings_data.loc[common_idx]
-                
-                fw_pe = p_aligned / e_aligned
-                e_shift = e_aligned.shift(252) # Requires ~1 year of data
-                growth = (e_aligned / e_shift) - 1
-                
-                # Filter growth
-                growth = growth.replace([float('inf'), float('-inf')], float('nan'))
-                growth[growth < 0.01] = float('nan') # Minimum 1% growth
-                
-                peg_ratio_full = fw_pe / (growth * 100)
-                peg_ratio_full = peg_ratio_full.ffill(limit=10)
-                
-            except Exception as e:
-                st.error(f"Error calculating PEG: {e}")
-                st.stop()
-                
-            # --- TRIM DATA TO USER SELECTION ---
-            # Now satisfying the user request: We have 2019 data used for calc, 
-            # so 2020-01-01 should have valid signals.
-            
-            mask_prices = (prices_full.index >= s_str_backtest)
-            prices = prices_full.loc[mask_prices]
-            
-            mask_peg = (peg_ratio_full.index >= s_str_backtest)
-            peg_ratio = peg_ratio_full.loc[mask_peg]
-            
-            if not bm_price_full.empty:
-                mask_bm = (bm_price_full.index >= s_str_backtest)
-                bm_price = bm_price_full.loc[mask_bm]
-            else:
-                bm_price = pd.DataFrame()
-            
-            # Align indices exactly
-            common_dates = prices.index.intersection(peg_ratio.index)
-            prices = prices.loc[common_dates]
-            peg_ratio = peg_ratio.loc[common_dates]
-            
-            if not bm_price.empty:
-                # Benchmark aligned to same start date (it might have slightly diff trading days if yahoo issues, but usually fine)
-                # Just ensure it starts >= start_date
-                pass
-
-            # 5. Strategy
-            strat = PegStrategy(top_n=top_n, rebalance_freq='ME')
-            weights = strat.generate_signals(peg_ratio, prices.index)
-            
-            # 6. Backtest Portfolio
-            bt = Backtester(initial_capital=10000.0)
-            res_port = bt.run_backtest(prices, weights)
-            
-            # 7. Backtest Benchmark (Buy and Hold)
-            # Create weights 1.0 for benchmark
-            if not bm_price.empty:
-                bm_weights = pd.DataFrame(1.0, index=bm_price.index, columns=bm_price.columns)
-                res_bm = bt.run_backtest(bm_price, bm_weights)
-            else:
-                res_bm = None
-            
-            # 8. Metrics Comparison
-            st.subheader("Performance Metrics")
-            
-            bm_ret = res_bm['Daily_Return'] if res_bm is not None else None
-            bm_curve = res_bm['Portfolio_Value'] if res_bm is not None else None
-            
-            stats = Metrics.get_summary_stats(
-                res_port['Daily_Return'], 
-                res_port['Portfolio_Value'],
-                benchmark_returns=bm_ret,
-                benchmark_curve=bm_curve
+            prices, peg_ratio, schedule, res_port, res_bm = run_backtest_stage(
+                data_key, s_str_backtest, e_str, top_n, dp
             )
+        except Exception as e:
+            st.error(f"Error loading data or running the backtest: {e}")
+            st.stop()
+        finally:
+            # On a rerun mid-load the loaders keep going, and their results still land in the caches
+            loaders.shutdown(wait=False)
+        
+        # 8. Metrics Comparison
+        st.subheader("Performance Metrics")
+        
+        bm_ret = res_bm['Daily_Return'] if res_bm is not None else None
+        bm_curve = res_bm['Portfolio_Value'] if res_bm is not None else None
+        
+        stats = Metrics.get_summary_stats(
+            res_port['Daily_Return'], 
+            res_port['Portfolio_Value'],
+            benchmark_returns=bm_ret,
+            benchmark_curve=bm_curve
+        )
+        
+        # Display Metrics
+        # Display Metrics
+        st.divider()
+        
+        # Row 1: Key Performance
+        k1, k2, k3, k4 = st.columns(4)
+        k1.metric("Strategy Return", stats.get("Total Return"), delta=stats.get("Active Return"))
+        k2.metric("CAGR", stats.get("CAGR"))
+        k3.metric("Sharpe Ratio", stats.get("Sharpe Ratio"))
+        k4.metric("Max Drawdown", stats.get("Max Drawdown"))
+        
+        # Row 2: Advanced Risk/Return
+        a1, a2, a3, a4 = st.columns(4)
+        a1.metric("Volatility (Ann.)", stats.get("Volatility"))
+        a2.metric("Sortino Ratio", stats.get("Sortino Ratio"))
+        a3.metric("Calmar Ratio", stats.get("Calmar Ratio"))
+        a4.metric("Active Return", stats.get("Active Return", "N/A"))
+        
+        # Benchmark Comparison Row
+        if res_bm is not None:
+            st.markdown("### Benchmark Performance (QQQ)")
+            b1, b2, b3, b4 = st.columns(4)
+            b1.metric("Benchmark Return", stats.get("Benchmark Return"))
+            b2.metric("Benchmark CAGR", stats.get("Benchmark CAGR"))
+            b3.metric("Benchmark Sharpe", stats.get("Benchmark Sharpe"))
+            b4.metric("Benchmark MDD", stats.get("Benchmark MDD"))
             
-            # Display Metrics
-            # Display Metrics
-            st.divider()
-            
-            # Row 1: Key Performance
-            k1, k2, k3, k4 = st.columns(4)
-            k1.metric("Strategy Return", stats.get("Total Return"), delta=stats.get("Active Return"))
-            k2.metric("CAGR", stats.get("CAGR"))
-            k3.metric("Sharpe Ratio", stats.get("Sharpe Ratio"))
-            k4.metric("Max Drawdown", stats.get("Max Drawdown"))
-            
-            # Row 2: Advanced Risk/Return
-            a1, a2, a3, a4 = st.columns(4)
-            a1.metric("Volatility (Ann.)", stats.get("Volatility"))
-            a2.metric("Sortino Ratio", stats.get("Sortino Ratio"))
-            a3.metric("Calmar Ratio", stats.get("Calmar Ratio"))
-            a4.metric("Active Return", stats.get("Active Return", "N/A"))
-            
-            # Benchmark Comparison Row
-            if res_bm is not None:
-                st.markdown("### Benchmark Performance (QQQ)")
-                b1, b2, b3, b4 = st.columns(4)
-                b1.metric("Benchmark Return", stats.get("Benchmark Return"))
-                b2.metric("Benchmark CAGR", stats.get("Benchmark CAGR"))
-                b3.metric("Benchmark Sharpe", stats.get("Benchmark Sharpe"))
-                b4.metric("Benchmark MDD", stats.get("Benchmark MDD"))
-                
-                b5, b6, b7, b8 = st.columns(4)
-                b5.metric("Benchmark Volatility", stats.get("Benchmark Volatility"))
-                b6.metric("Benchmark Sortino", stats.get("Benchmark Sortino"))
-                b7.metric("Benchmark Calmar", stats.get("Benchmark Calmar"))
-                b8.empty()
-            st.divider()
-            
-            # Debug Prints to Console
-            print("--- Dashboard Debug ---")
-            print("Portfolio Value Head:")
-            print(res_port['Portfolio_Value'].head())
-            print("Portfolio Value Tail:")
-            print(res_port['Portfolio_Value'].tail())
-            
-            # 9. Charts
-            st.subheader("Equity Curve Comparison")
+            b5, b6, b7, b8 = st.columns(4)
+            b5.metric("Benchmark Volatility", stats.get("Benchmark Volatility"))
+            b6.metric("Benchmark Sortino", stats.get("Benchmark Sortino"))
+            b7.metric("Benchmark Calmar", stats.get("Benchmark Calmar"))
+            b8.empty()
+        st.divider()
+        
+        # Debug Prints to Console
+        print("--- Dashboard Debug ---")
+        print("Portfolio Value Head:")
+        print(res_port['Portfolio_Value'].head())
+        print("Portfolio Value Tail:")
+        print(res_port['Portfolio_Value'].tail())
+        
+        # 9. Charts
+        st.subheader("Equity Curve Comparison")
+        
+        # Use native Streamlit chart (proven to work)
+        chart_data = res_port[['Portfolio_Value']].rename(columns={'Portfolio_Value': 'Strategy'})
+        
+        if res_bm is not None:
+             # Normalize benchmark to same start capital
+             start_val_port = res_port['Portfolio_Value'].iloc[0]
+             start_val_bm = res_bm['Portfolio_Value'].iloc[0]
+             if start_val_bm > 0:
+                 bm_norm = res_bm['Portfolio_Value'] * (start_val_port / start_val_bm)
+                 chart_data['Benchmark'] = bm_norm
+        
+        # Charts get a downsampled copy sized to their width; drawdowns keep exact troughs (min/max buckets)
+        st.line_chart(downsample(chart_data, method='lttb'))
+        
+        # 10. Drawdown Chart
+        st.subheader("Drawdown Analysis")
+        dd_port = (res_port['Portfolio_Value'] / res_port['Portfolio_Value'].cummax()) - 1
+        dd_df = pd.DataFrame(dd_port).rename(columns={'Portfolio_Value': 'Strategy'})
+        
+        if res_bm is not None:
+            dd_bm = (res_bm['Portfolio_Value'] / res_bm['Portfolio_Value'].cummax()) - 1
+            dd_df['Benchmark'] = dd_bm
+        
+        st.area_chart(downsample(dd_df))
+        
+        # 11. Rolling Metrics
+        st.subheader(f"Rolling Metrics ({rolling_window} days)")
+        curves = pd.DataFrame({'Strategy': res_port['Daily_Return']})
+        if bm_ret is not None:
+            curves['Benchmark'] = bm_ret
+        rolling = rolling_metrics(curves, rolling_window, benchmark_returns=bm_ret)
+        
+        r1, r2 = st.columns(2)
+        r1.caption("Sharpe Ratio")
+        half = DEFAULT_CHART_WIDTH // 2
+        r1.line_chart(downsample(rolling['sharpe'], half, method='lttb'))
+        r2.caption("Volatility (Ann.)")
+        r2.line_chart(downsample(rolling['volatility'], half, method='lttb'))
+        r3, r4 = st.columns(2)
+        r3.caption(f"Drawdown from {rolling_window}-day peak")
+        r3.area_chart(downsample(rolling['drawdown'], half))
+        if 'beta' in rolling:
+            r4.caption(f"Beta to {etf_ticker}")
+            r4.line_chart(downsample(rolling['beta'][['Strategy']], half, method='lttb'))
+        
+        with st.expander(f"Constituent Rolling Metrics (latest {rolling_window} days)"):
+            const_returns = prices.pct_change(fill_method=None)
+            const = rolling_metrics(const_returns, rolling_window, equity=prices, benchmark_returns=bm_ret)
+            latest = pd.DataFrame({name: frame.iloc[-1] for name, frame in const.items()})
+            st.dataframe(latest.sort_values('sharpe', ascending=False), use_container_width=True)
+        
+        # Show Rebalance Details
+        st.subheader("Rebalancing History")
+        with st.expander("See Monthly Rebalance Details", expanded=True):
+            # Logic to extract rebalance events
+            # Problem: weights.diff() skips months where portfolio didn't change.
+            # Fix: Explicitly selecting the first trading day of each month to show the standing portfolio.
             
-            # Use native Streamlit chart (proven to work)
-            chart_data = res_port[['Portfolio_Value']].rename(columns={'Portfolio_Value': 'Strategy'})
+            # Resample to get the first entry of each month (MS = Month Start)
+            # We need the ACTUAL dates, so we can't just use resample().first() which might set index to 1st of month.
+            # Instead, we identify the indices.
             
-            if res_bm is not None:
-                 # Normalize benchmark to same start capital
-                 start_val_port = res_port['Portfolio_Value'].iloc[0]
-                 start_val_bm = res_bm['Portfolio_Value'].iloc[0]
-                 if start_val_bm > 0:
-                     bm_norm = res_bm['Portfolio_Value'] * (start_val_port / start_val_bm)
-                     chart_data['Benchmark'] = bm_norm
+            rebal_dates = schedule.index.to_series().groupby(schedule.index.to_period('M')).first()
             
-            st.line_chart(chart_data)
+            # Standing weights on those dates only; the full Date x Ticker frame is never built
+            rebal_events = schedule.weights_at(rebal_dates)
             
-            # 10. Drawdown Chart
-            st.subheader("Drawdown Analysis")
-            dd_port = (res_port['Portfolio_Value'] / res_port['Portfolio_Value'].cummax()) - 1
-            dd_df = pd.DataFrame(dd_port).rename(columns={'Portfolio_Value': 'Strategy'})
-            
-            if res_bm is not None:
-                dd_bm = (res_bm['Portfolio_Value'] / res_bm['Portfolio_Value'].cummax()) - 1
-                dd_df['Benchmark'] = dd_bm
-            
-            st.area_chart(dd_df)
-            
-            # Show Rebalance Details
-            st.subheader("Rebalancing History")
-            with st.expander("See Monthly Rebalance Details", expanded=True):
-                # Logic to extract rebalance events
-                # Problem: weights.diff() skips months where portfolio didn't change.
-                # Fix: Explicitly selecting the first trading day of each month to show the standing portfolio.
-                
-                # Resample to get the first entry of each month (MS = Month Start)
-                # We need the ACTUAL dates, so we can't just use resample().first() which might set index to 1st of month.
-                # Instead, we identify the indices.
+            details = []
+            for date, row in rebal_events.iterrows():
+                # Get non-zero tickers
+                holdings = row[row > 0.001].index.tolist()
                 
-                weights.index.name = 'Date' # Still good practice
-                weights['YearMonth'] = weights.index.to_period('M')
-                # Safer groupby that doesn't rely on reset_index column naming
-                rebal_dates = weights.index.to_series().groupby(weights['YearMonth']).first()
-                # Drop the simple column we added to not mess up valid_pegs check later if we reused 'weights'
-                weights = weights.drop(columns=['YearMonth'])
-                
-                rebal_events = weights.loc[rebal_dates]
-                
-                details = []
-                for date, row in rebal_events.iterrows():
-                    # Get non-zero tickers
-                    holdings = row[row > 0.001].index.tolist()
-                    
-                    if holdings:
-                         # Look up PEG values for these holdings at this date
-                         # We need to ensure we look at the date *before* the shift if we were strict,
-                         # but here 'peg_ratio' is aligned to 'weights' dates.
-                         # Weights are generated from peg_ratio at 'date'.
-                         
-                         holdings_str = []
-                         for ticker in holdings:
-                             try:
-                                 val = peg_ratio.loc[date, ticker]
-                                 holdings_str.append(f"{ticker} ({val:.2f})")
-                             except:
-                                 holdings_str.append(f"{ticker} (N/A)")
-                         
-                         details.append({
-                            "Date": date.strftime('%Y-%m-%d'),
-                            "Holdings": ", ".join(holdings_str),
-                            "Count": len(holdings)
-                        })
-                
-                df_details = pd.DataFrame(details)
-                st.dataframe(df_details, use_container_width=True)
+                if holdings:
+                     # Look up PEG values for these holdings at this date
+                     # We need to ensure we look at the date *before* the shift if we were strict,
+                     # but here 'peg_ratio' is aligned to 'weights' dates.
+                     # Weights are generated from peg_ratio at 'date'.
+                     
+                     holdings_str = []
+                     for ticker in holdings:
+                         try:
+                             val = peg_ratio.loc[date, ticker]
+                             holdings_str.append(f"{ticker} ({val:.2f})")
+                         except:
+                             holdings_str.append(f"{ticker} (N/A)")
+                     
+                     details.append({
+                        "Date": date.strftime('%Y-%m-%d'),
+                        "Holdings": ", ".join(holdings_str),
+                        "Count": len(holdings)
+                    })
+            
+            df_details = pd.DataFrame(details)
+            st.dataframe(df_details, use_container_width=True)
 
 else:
     st.info("Configure parameters on the left sidebar and click 'Run Backtest'.")
@@ -1,15 +1,126 @@
 import yfinance as yf
 import pandas as pd
 import numpy as np
-import requests
-import json
 import os
-import time
 from datetime import datetime, timedelta
 import logging
+import threading
+
+from av_client import AlphaVantageClient
+from earnings_store import EarningsStore
+from price_store import PriceStore
+
+# Each quarter's estimatedEPS is assumed to be known this many days before
+# its fiscalDateEnding (see _process_earnings_to_timeseries).
+ESTIMATE_LEAD_DAYS = 90
+
+# Per-ticker outcomes reported to get_forward_peg_data's progress callback
+EARNINGS_STATUSES = ("cached", "fetched", "stale", "missing")
+
+
+def _no_progress(ticker, status):
+    pass
+
+
+def _parse_estimate_records(earnings_list):
+    """
+    Parses AV quarterlyEarnings records into (fiscal_end, annualized_eps) arrays,
+    ordered by fiscalDateEnding. Records without a usable estimate are skipped.
+    """
+    sorted_e = sorted(earnings_list, key=lambda x: x['fiscalDateEnding'])
+    ends = []
+    values = []
+    for record in sorted_e:
+        raw_est = record.get('estimatedEPS')
+        if raw_est is None or str(raw_est).lower() == 'none':
+            continue
+        try:
+            est = float(raw_est)
+        except ValueError:
+            continue
+        ends.append(record['fiscalDateEnding'])
+        values.append(est * 4)
+
+    ends = pd.to_datetime(ends, format='%Y-%m-%d').values.astype('datetime64[ns]')
+    return ends, np.asarray(values, dtype=float)
+
+
+def build_forward_eps_panel(earnings_by_ticker, index_dates, tickers=None, dtype=np.float64):
+    """
+    Builds the daily Forward EPS panel (Index=Date, Cols=Tickers) for all tickers at once.
+
+    Same values as calling _process_earnings_to_timeseries per ticker: every quarter
+    covers [fiscal_end - 90d, fiscal_end], a later fiscal date wins where windows
+    overlap, and gaps are forward filled.
+
+    Instead of masking the whole index once per record, each record is mapped to the
+    index positions it covers with searchsorted. Because all windows have the same
+    length, the record in force at position k is the last one (in fiscal order) whose
+    window starts at or before k, so one sorted lookup over (ticker, start) answers
+    every (date, ticker) cell.
+
+    The result is written into a single preallocated array of `dtype`
+    (float64 by default, float32 to halve memory on large universes).
+    """
+    index_dates = pd.DatetimeIndex(index_dates)
+    if tickers is None:
+        tickers = list(earnings_by_ticker.keys())
+    n_dates = len(index_dates)
+    n_tickers = len(tickers)
+
+    rec_ticker = []
+    rec_end = []
+    rec_value = []
+    for j, ticker in enumerate(tickers):
+        records = earnings_by_ticker.get(ticker)
+        if not records:
+            continue
+        ends, values = _parse_estimate_records(records)
+        rec_ticker.append(np.full(len(ends), j, dtype=np.int64))
+        rec_end.append(ends)
+        rec_value.append(values)
+
+    # Preallocated, typed output; filled in place below
+    panel = np.empty((n_dates, n_tickers), dtype=dtype)
+    panel.fill(np.nan)
+    if rec_ticker and n_dates:
+        # Records are appended in ticker order and in fiscal order within
+        # each ticker, which is exactly the overwrite order.
+        rec_ticker = np.concatenate(rec_ticker)
+        rec_end = np.concatenate(rec_end)
+        rec_value = np.concatenate(rec_value)
+
+        # Index positions covered by each record: [lo, hi]
+        idx_values = index_dates.values.astype('datetime64[ns]')
+        lo = np.searchsorted(idx_values, rec_end - np.timedelta64(ESTIMATE_LEAD_DAYS, 'D'), side='left')
+        hi = np.searchsorted(idx_values, rec_end, side='right') - 1
+
+        stride = n_dates + 1
+        keys = rec_ticker * stride + lo
+        positions = np.arange(n_dates, dtype=np.int64)
+        columns = np.arange(n_tickers, dtype=np.int64)
+        found = np.searchsorted(keys, positions[:, None] + columns[None, :] * stride, side='right') - 1
+
+        safe = np.maximum(found, 0)
+        in_force = (found >= 0) & (rec_ticker[safe] == columns[None, :]) & (hi[safe] >= positions[:, None])
+        in_force &= ~np.isnan(rec_value[safe])
+        panel[in_force] = rec_value[safe[in_force]]
+
+        # Forward fill: every cell takes the last in-force row at or above it
+        src = np.where(in_force, positions[:, None], -1)
+        np.maximum.accumulate(src, axis=0, out=src)
+        has_src = src >= 0
+        panel[has_src] = panel[src[has_src], np.broadcast_to(columns, src.shape)[has_src]]
+
+    return pd.DataFrame(panel, index=index_dates, columns=list(tickers), copy=False)
+
 
 class DataProvider:
-    def __init__(self, api_key=None):
+    # yf.download keeps per-call state in module globals, so concurrent downloads
+    # (e.g. universe and benchmark loaded in parallel) are serialized
+    _yf_lock = threading.Lock()
+
+    def __init__(self, api_key=None, earnings_ttl_days=30, av_requests_per_minute=5, av_max_workers=4):
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
         self.api_key = api_key
@@ -20,6 +131,26 @@ class DataProvider:
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
 
+        # Per-ticker earnings store; entries older than earnings_ttl_days get refreshed
+        # (None = never refresh). An old whole-file cache is migrated on first use.
+        self.earnings_store = EarningsStore(
+            os.path.join(self.cache_dir, "earnings"),
+            ttl_days=earnings_ttl_days,
+            legacy_file=self.earnings_cache_file,
+        )
+
+        # Local adjusted-close history; only uncovered date ranges get downloaded
+        self.price_store = PriceStore(os.path.join(self.cache_dir, "prices"))
+
+        # Shared, rate-limited AV client (one session, one token bucket)
+        self.av_client = None
+        if self.api_key:
+            self.av_client = AlphaVantageClient(
+                self.api_key,
+                requests_per_minute=av_requests_per_minute,
+                max_workers=av_max_workers,
+            )
+
     def fetch_universe_constituents(self, etf_ticker="QQQ"):
         """
         Returns a larger static list of QQQ constituents (Top ~50) 
@@ -36,138 +167,190 @@ class DataProvider:
     def fetch_price_history(self, tickers, start_date, end_date):
         """
         Fetches daily adjusted close prices from Yahoo Finance.
+
+        Prices are served from the local PriceStore; only the date ranges not yet
+        covered (before the stored head or after the stored tail) are downloaded
+        and merged in. `end_date` is exclusive, as in yf.download.
         """
         self.logger.info(f"Fetching price data for {len(tickers)} tickers from {start_date} to {end_date}")
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date)
+        # Today's bar is still moving: it is returned but never persisted
+        today = pd.Timestamp.today().normalize()
+
+        stored = {t: self.price_store.load(t) for t in tickers}
+        live_bars = {}
+
+        pending = {}
+        for ticker in tickers:
+            closes, cov_start, cov_end = stored[ticker]
+            last_bar = closes.index[-1] if closes is not None and len(closes) else None
+            for kind, s, e in PriceStore.missing_ranges(cov_start, cov_end, last_bar, start, end):
+                pending.setdefault((s, e), []).append((ticker, kind))
+
+        # One download per distinct missing range, shared by all tickers that need it
+        for (s, e), items in pending.items():
+            fetched = self._download_prices([t for t, _ in items], s, e)
+            if fetched is None:
+                # Whole download failed: the range stays uncovered and is retried next run
+                continue
+            for ticker, kind in items:
+                # A ticker without bars in a successful download (before its IPO, a weekend tail)
+                # still gets the range covered, so it is not requested again on every run
+                if ticker in fetched.columns:
+                    new = fetched[ticker].dropna()
+                else:
+                    new = pd.Series(dtype=float, index=pd.DatetimeIndex([], name='Date'))
+                live_bars[ticker] = new[new.index >= today]
+                new = new[new.index < today]
+                closes, cov_start, cov_end = stored[ticker]
+
+                if kind == 'tail' and len(closes) and closes.index[-1] in new.index:
+                    last = closes.index[-1]
+                    if not np.isclose(new[last], closes.iloc[-1], rtol=1e-6, atol=0):
+                        # Dividend/split re-based the adjusted history: refetch it whole
+                        self.logger.info(f"Adjusted history changed for {ticker}, refetching")
+                        closes, cov_start = None, min(start, cov_start)
+                        full = self._download_prices([ticker], cov_start, e)
+                        if full is None or ticker not in full.columns or full[ticker].isna().all():
+                            continue
+                        new = full[ticker].dropna()
+                        live_bars[ticker] = new[new.index >= today]
+                        new = new[new.index < today]
+
+                if closes is not None:
+                    new = pd.concat([closes, new])
+                    new = new[~new.index.duplicated(keep='last')].sort_index()
+                cov_start = s if cov_start is None else min(s, cov_start)
+                cov_end = min(e, today) if cov_end is None else max(cov_end, min(e, today))
+                self.price_store.save(ticker, new, cov_start, cov_end)
+                stored[ticker] = (new, cov_start, cov_end)
+
+        columns = {}
+        for ticker in sorted(tickers):
+            closes = stored[ticker][0]
+            if closes is None:
+                continue
+            if ticker in live_bars and len(live_bars[ticker]):
+                closes = pd.concat([closes, live_bars[ticker]])
+            closes = closes[(closes.index >= start) & (closes.index < end)]
+            if len(closes):
+                columns[ticker] = closes
+        if not columns:
+            return pd.DataFrame()
+
+        data = pd.DataFrame(columns)
+        data.index = pd.DatetimeIndex(data.index, name='Date').as_unit('ns')
+        # Fill missing values if necessary (forward fill limit 3 days)
+        return data.ffill(limit=3)
+
+    def _download_prices(self, tickers, start_date, end_date):
+        """
+        Downloads adjusted closes for [start_date, end_date) from Yahoo Finance.
+        Returns a DataFrame (Index=Date, Cols=Tickers), or None if the download failed.
+        """
         try:
-            # yfinance expects space separated string for multiple tickers
             # auto_adjust=True means 'Close' is adjusted.
-            full_data = yf.download(tickers, start=start_date, end=end_date, progress=False, auto_adjust=True)
+            with self._yf_lock:
+                full_data = yf.download(
+                    tickers,
+                    start=pd.Timestamp(start_date).strftime('%Y-%m-%d'),
+                    end=pd.Timestamp(end_date).strftime('%Y-%m-%d'),
+                    progress=False,
+                    auto_adjust=True,
+                )
             
             if 'Close' in full_data.columns:
                 data = full_data['Close']
             elif 'Adj Close' in full_data.columns:
                 data = full_data['Adj Close']
+            elif full_data.empty:
+                self.logger.error("Price download returned no data")
+                return None
             else:
                 # Keep original check, though auto_adjust usually returns specific cols
                 self.logger.error(f"Could not find Close or Adj Close in data. Cols: {full_data.columns}")
-                return pd.DataFrame()
+                return None
             
             # Ensure we have a DataFrame even if one ticker 
             if isinstance(data, pd.Series):
-                data = data.to_frame()
-                
-            # Fill missing values if necessary (forward fill limit 3 days)
-            data = data.ffill(limit=3)
+                data = data.to_frame(name=tickers[0])
+            # yfinance reports network errors as an empty (or all-NaN) frame that still has the Close columns
+            if data.empty or data.isna().all().all():
+                self.logger.error(f"Price download returned no bars for {len(tickers)} tickers")
+                return None
             return data
         except Exception as e:
             self.logger.error(f"Error fetching price data: {e}")
-            return pd.DataFrame()
+            return None
 
-    def _load_earnings_cache(self):
-        if os.path.exists(self.earnings_cache_file):
-            with open(self.earnings_cache_file, 'r') as f:
-                return json.load(f)
-        return {}
-
-    def _save_earnings_cache(self, cache):
-        with open(self.earnings_cache_file, 'w') as f:
-            json.dump(cache, f)
-
-    def _fetch_av_earnings(self, ticker):
-        if not self.api_key:
+    def _fetch_av_earnings(self, tickers):
+        """
+        Fetches quarterlyEarnings for several tickers concurrently, within the key's quota.
+        Yields (ticker, earnings_list) as each one completes.
+        """
+        if not self.av_client:
             self.logger.warning("No API Key provided, cannot fetch Alpha Vantage data.")
-            return []
-            
-        url = f"https://www.alphavantage.co/query?function=EARNINGS&symbol={ticker}&apikey={self.api_key}"
-        try:
-            r = requests.get(url)
-            data = r.json()
-            if "quarterlyEarnings" in data:
-                return data["quarterlyEarnings"]
-            return []
-        except Exception as e:
-            self.logger.error(f"AV Fetch Error {ticker}: {e}")
-            return []
+            for ticker in tickers:
+                yield ticker, []
+            return
+        yield from self.av_client.fetch_earnings_many(tickers)
 
-    def get_forward_peg_data(self, tickers, start_date, end_date):
+    def get_forward_peg_data(self, tickers, start_date, end_date, dtype=np.float64, progress=None):
         """
-        Generates historical Forward PEG data using Alpha Vantage estimates.
+        Generates historical Forward EPS data using Alpha Vantage estimates.
+
+        Note: despite the name this returns the annualized Estimated EPS panel
+        (Index=Date, Cols=Tickers); PEG itself needs prices and is derived by the caller.
+        Each ticker is fetched (if not cached), parsed and materialized exactly once,
+        into a single preallocated array of `dtype` (float64, or float32 to save memory).
+
+        `progress(ticker, status)` is called once per ticker as soon as its earnings
+        are settled; status is one of EARNINGS_STATUSES.
         """
         self.logger.info("Generating/Loading Forward PEG data from Alpha Vantage...")
         
         dates = pd.date_range(start=start_date, end=end_date, freq='D')
-        peg_df = pd.DataFrame(index=dates, columns=tickers)
-        
-        cache = self._load_earnings_cache()
-        cache_updated = False
+        earnings = self._load_earnings(tickers, progress=progress)
+
+        # Constructing the EPS Time Series (all tickers in one pass)
+        return build_forward_eps_panel(earnings, dates, tickers=tickers, dtype=dtype)
+
+    def _load_earnings(self, tickers, progress=None):
+        """
+        Returns {ticker: quarterlyEarnings} from the earnings store, fetching
+        missing or stale tickers from Alpha Vantage first.
+        """
+        progress = progress or _no_progress
+        earnings = {}
+        to_fetch = []
         
         for ticker in tickers:
-            # Check cache
-            if ticker not in cache:
-                self.logger.info(f"Fetching earnings for {ticker} (API)...")
-                earnings_data = self._fetch_av_earnings(ticker)
-                if earnings_data:
-                    cache[ticker] = earnings_data
-                    cache_updated = True
-                    # Rate limit sleep
-                    time.sleep(12) 
-                else:
-                    self.logger.warning(f"No earnings data for {ticker}")
-                    continue
+            cached = self.earnings_store.get(ticker)
+            if cached is not None:
+                earnings[ticker] = cached
+            if cached is None or self.earnings_store.is_stale(ticker):
+                to_fetch.append(ticker)
             else:
                 self.logger.info(f"Using cached earnings for {ticker}")
+                progress(ticker, "cached")
 
-            # Process earnings into a daily series of "Next 12M EPS"
-            earnings_ts = self._process_earnings_to_timeseries(cache[ticker], dates)
-            
-            # We would typically need Price / Estimated_EPS / Growth
-            # Here, we simplify: PEG = (1 / Growth) * (Price / Est_EPS)
-            # Need Price aligned with dates. We don't have price *inside* this method easily unless passed.
-            # But wait, this method returns PEG. It implies we need price.
-            # Design Flaw fix: This method currently only fills based on earnings. 
-            # Ideally, get_forward_peg_data should take prices as input or we return Factor (EPS) and calculate PEG later.
-            # To stick to interface `get_forward_peg_data`, we assume we can't fully calculate it without price.
-            # BUT, usually Factor generation takes universe prices. 
-            # Hack: We will return the "EPS / Growth" component here? 
-            # Or better: We return a dataframe of "Estimated EPS" and handled PEG calc in Strategy?
-            # Strategy expects "PEG Data". 
-            
-            # Let's try to pass Prices into this method? Or fetch them again? (inefficient)
-            # Strategy: We will return a DataFrame of "Estimated EPS" for now, and let Strategy divide by Price?
-            # No, 'peg_data' implies the ratio.
-            
-            # Let's assume for this step we return the "EPS * Growth" denominator or similar?
-            # Actually, standard PEG = PE / Growth.
-            # I will return just the Estimated EPS for now in this DF, and 
-            # I'll update Strategy to take Price and EPS and calculate PEG on the fly.
-            # WAIT: If I change the return type to EPS, I break the contract.
-            # The user asked to "replace random data with AV data".
-            
-            # To do it right: I need to fetch price here too or change the signature.
-            # Use `yf.download` for just this ticker to calc PEG?
-            pass 
-
-        if cache_updated:
-            self._save_earnings_cache(cache)
-
-        # RE-DESIGN:
-        # It's better to change this method to `get_earnings_estimates(tickers)`
-        # And let the calling main.py or strategy combine them. 
-        # But to respect the existing structure:
-        # I will fetch prices inside here *or* just return the EPS dataframe 
-        # and rename the variable in main.py to reflect it's actually EPS, 
-        # then calculate PEG in main before strategy.
-        
-        # Let's proceed with returning the Estimated EPS Series in the dataframe, 
-        # and I will update main.py to perform the division: PEG = Price / (EPS * Growth_Factor).
-        
-        # Constructing the EPS Time Series
-        for ticker in tickers:
-            if ticker in cache:
-                series = self._process_earnings_to_timeseries(cache[ticker], dates)
-                peg_df[ticker] = series
-        
-        return peg_df
+        if to_fetch:
+            self.logger.info(f"Fetching earnings for {len(to_fetch)} tickers (API)...")
+        for ticker, earnings_data in self._fetch_av_earnings(to_fetch):
+            if earnings_data:
+                # Saved immediately, so a crash later in the run keeps it
+                self.earnings_store.put(ticker, earnings_data)
+                earnings[ticker] = earnings_data
+                progress(ticker, "fetched")
+            elif ticker in earnings:
+                self.logger.warning(f"Refresh failed for {ticker}, using stale cached earnings")
+                progress(ticker, "stale")
+            else:
+                self.logger.warning(f"No earnings data for {ticker}")
+                progress(ticker, "missing")
+
+        return earnings
 
     def _process_earnings_to_timeseries(self, earnings_list, index_dates):
         """
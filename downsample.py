@@ -0,0 +1,95 @@
+"""
+Shape-preserving downsampling of long daily series before they are charted.
+
+min/max bucketing keeps, per bucket of rows, the rows holding each column's
+minimum and maximum, so every peak and trough (e.g. the maximum drawdown)
+survives exactly and the drawn line is indistinguishable at chart resolution.
+LTTB (Largest-Triangle-Three-Buckets) keeps one visually dominant row per
+bucket; the global extremes of every column are added to its selection.
+Multi-column frames keep the union of the rows chosen for each column, so all
+series stay on one shared date index.
+"""
+import numpy as np
+
+DEFAULT_CHART_WIDTH = 800  # px; about one bucket per two pixel columns of a full-width chart
+
+
+def minmax_indices(values, n_buckets):
+    """
+    Sorted row indices of a (rows,) or (rows, columns) array: first and last row plus,
+    for each of `n_buckets` equal row buckets, the argmin and argmax of every column (NaNs ignored).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    n = len(values)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    size = -(-n // max(1, min(n_buckets, n)))
+    n_buckets = -(-n // size)
+    pad = n_buckets * size - n
+
+    nan = np.isnan(values)
+    low = np.pad(np.where(nan, np.inf, values), ((0, pad), (0, 0)), constant_values=np.inf)
+    high = np.pad(np.where(nan, -np.inf, values), ((0, pad), (0, 0)), constant_values=-np.inf)
+    offsets = np.arange(n_buckets)[:, None] * size
+    shape = (n_buckets, size, values.shape[1])
+    argmin = low.reshape(shape).argmin(axis=1) + offsets
+    argmax = high.reshape(shape).argmax(axis=1) + offsets
+
+    keep = np.concatenate([[0, n - 1], argmin.ravel(), argmax.ravel()])
+    return np.unique(np.minimum(keep, n - 1))
+
+
+def lttb_indices(y, n_out, x=None):
+    """
+    Sorted row indices chosen by Largest-Triangle-Three-Buckets for one series `y`
+    (NaNs treated as gaps at 0). `x` defaults to the row number.
+    """
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.unique([0, n - 1])
+    x = np.arange(n, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+
+    # Interior rows 1..n-2 split into n_out-2 buckets; first and last rows are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the triangle's third vertex
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(df, width=DEFAULT_CHART_WIDTH, method="minmax"):
+    """
+    Rows of `df` (Date x Series) to draw on a chart `width` pixels wide. Frames that
+    already fit are returned unchanged.
+
+    Args:
+        method: "minmax" (exact extremes in every bucket; right for drawdowns) or
+            "lttb" (closer to the line's shape per point; global extremes are kept).
+    """
+    n_buckets = max(1, width // 2)
+    n_cols = max(1, df.shape[1])
+    if len(df) <= 2 * n_buckets:
+        return df
+    values = df.to_numpy(dtype=np.float64)
+    if method == "minmax":
+        rows = minmax_indices(values, n_buckets // n_cols)
+    elif method == "lttb":
+        per_column = max(3, 2 * n_buckets // n_cols)
+        picks = [lttb_indices(values[:, j], per_column) for j in range(values.shape[1])]
+        rows = np.unique(np.concatenate(picks + [minmax_indices(values, 1)]))
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return df.iloc[rows]
@@ -3,7 +3,38 @@ import { Bindings } from '../types';
 
 const app = new Hono<{ Bindings: Bindings }>();
 
+// Bulk reads: at most this many symbols per request (D1 bound-parameter limit is 100)
+const MAX_SYMBOLS = 50;
+
+// Parses ?symbols=A,B,C for bulk reads. Returns null when absent, an error string when invalid.
+function parseSymbols(raw: string | undefined): string[] | string | null {
+    if (!raw) return null;
+    const symbols = [...new Set(raw.split(',').map(s => s.trim().toUpperCase()).filter(Boolean))];
+    if (symbols.length === 0) return 'Missing symbols parameter';
+    if (symbols.length > MAX_SYMBOLS) return `At most ${MAX_SYMBOLS} symbols per request`;
+    return symbols;
+}
+
+// ?since=<updated_at> limits bulk reads to rows written after the caller's last sync
+function sinceClause(since: string | undefined, params: string[]): string {
+    if (!since) return '';
+    params.push(since);
+    return ' AND updated_at > ?';
+}
+
 app.get('/api/earnings', async (c) => {
+    const symbols = parseSymbols(c.req.query('symbols'));
+    if (typeof symbols === 'string') return c.json({ error: symbols }, 400);
+
+    if (symbols) {
+        const params = [...symbols];
+        const where = `symbol IN (${symbols.map(() => '?').join(',')})` + sinceClause(c.req.query('since'), params);
+        const { results } = await c.env.DB.prepare(
+            `SELECT * FROM earnings_estimates WHERE ${where} ORDER BY symbol, fiscal_date_ending DESC`
+        ).bind(...params).all();
+        return c.json({ results });
+    }
+
     const symbol = c.req.query('symbol')?.toUpperCase();
     if (!symbol) return c.json({ error: 'Missing symbol parameter' }, 400);
 
@@ -15,6 +46,23 @@ app.get('/api/earnings', async (c) => {
 });
 
 app.get('/api/prices', async (c) => {
+    const symbols = parseSymbols(c.req.query('symbols'));
+    if (typeof symbols === 'string') return c.json({ error: symbols }, 400);
+
+    if (symbols) {
+        const params = [...symbols];
+        let where = `symbol IN (${symbols.map(() => '?').join(',')})` + sinceClause(c.req.query('since'), params);
+        const start = c.req.query('start');
+        if (start) {
+            where += ' AND date >= ?';
+            params.push(start);
+        }
+        const { results } = await c.env.DB.prepare(
+            `SELECT symbol, date, close, updated_at FROM stock_prices WHERE ${where} ORDER BY symbol, date`
+        ).bind(...params).all();
+        return c.json({ results });
+    }
+
     const symbol = c.req.query('symbol')?.toUpperCase();
     if (!symbol) return c.json({ error: 'Missing symbol parameter' }, 400);
 
@@ -0,0 +1,42 @@
+import { createExecutionContext, waitOnExecutionContext } from 'cloudflare:test';
+import { describe, it, expect, vi } from 'vitest';
+import worker from '../src/main';
+
+const AUTH = { Authorization: 'Basic ' + btoa('admin:password') };
+
+function mockDb(results: any[] = []) {
+    const bind = vi.fn(() => ({ all: vi.fn().mockResolvedValue({ results }) }));
+    const prepare = vi.fn(() => ({ bind }));
+    return { prepare, bind };
+}
+
+describe('Legacy bulk read endpoints', () => {
+    it('reads earnings for several symbols incrementally', async () => {
+        const db = mockDb([{ symbol: 'AAPL', fiscal_date_ending: '2024-03-31' }]);
+        const request = new Request(
+            'http://example.com/api/earnings?symbols=aapl,MSFT,aapl&since=2024-01-01%2000:00:00',
+            { headers: AUTH }
+        );
+        const ctx = createExecutionContext();
+
+        const response = await worker.fetch(request, { DB: db } as any, ctx);
+        await waitOnExecutionContext(ctx);
+
+        expect(response.status).toBe(200);
+        const json: any = await response.json();
+        expect(json.results).toHaveLength(1);
+        expect(db.prepare.mock.calls[0][0]).toContain('symbol IN (?,?) AND updated_at > ?');
+        expect(db.bind).toHaveBeenCalledWith('AAPL', 'MSFT', '2024-01-01 00:00:00');
+    });
+
+    it('rejects oversized symbol lists', async () => {
+        const symbols = Array.from({ length: 51 }, (_, i) => `S${i}`).join(',');
+        const request = new Request(`http://example.com/api/prices?symbols=${symbols}`, { headers: AUTH });
+        const ctx = createExecutionContext();
+
+        const response = await worker.fetch(request, { DB: mockDb() } as any, ctx);
+        await waitOnExecutionContext(ctx);
+
+        expect(response.status).toBe(400);
+    });
+});
@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta
+
+
+class EarningsStore:
+    """
+    Per-ticker on-disk store for Alpha Vantage quarterlyEarnings payloads.
+
+    Layout: one JSON file per ticker under `store_dir`
+        {"symbol": ..., "fetched_at": ISO timestamp, "quarterlyEarnings": [...]}
+
+    Files are read lazily (only for tickers actually requested) and written
+    atomically (temp file + os.replace), so a crash mid-run never loses or
+    corrupts tickers that were already saved. Entries older than `ttl_days`
+    are reported as stale so the caller can refresh them.
+    """
+
+    def __init__(self, store_dir, ttl_days=30, legacy_file=None):
+        self.logger = logging.getLogger(__name__)
+        self.store_dir = store_dir
+        self.ttl = timedelta(days=ttl_days) if ttl_days is not None else None
+        self._memo = {}
+
+        os.makedirs(self.store_dir, exist_ok=True)
+
+        if legacy_file and os.path.exists(legacy_file):
+            self._migrate_legacy_cache(legacy_file)
+
+    def _path(self, ticker):
+        safe = re.sub(r'[^A-Za-z0-9._-]', '_', ticker)
+        return os.path.join(self.store_dir, f"{safe}.json")
+
+    def _read(self, ticker):
+        if ticker in self._memo:
+            return self._memo[ticker]
+        path = self._path(ticker)
+        entry = None
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Ignoring unreadable earnings cache entry {path}: {e}")
+        self._memo[ticker] = entry
+        return entry
+
+    def __contains__(self, ticker):
+        return self._read(ticker) is not None
+
+    def tickers(self):
+        """ Tickers present in the store (from the directory listing, no file reads). """
+        return sorted(name[:-5] for name in os.listdir(self.store_dir) if name.endswith('.json'))
+
+    def get(self, ticker):
+        """ Returns the cached quarterlyEarnings list for `ticker`, or None. """
+        entry = self._read(ticker)
+        return entry['quarterlyEarnings'] if entry else None
+
+    def fetched_at(self, ticker):
+        entry = self._read(ticker)
+        if not entry or not entry.get('fetched_at'):
+            return None
+        return datetime.fromisoformat(entry['fetched_at'])
+
+    def is_stale(self, ticker, now=None):
+        """ True if the ticker is missing or older than the configured TTL. """
+        if ticker not in self:
+            return True
+        if self.ttl is None:
+            return False
+        fetched = self.fetched_at(ticker)
+        if fetched is None:
+            return True
+        return (now or datetime.now()) - fetched > self.ttl
+
+    def put(self, ticker, earnings_list, fetched_at=None):
+        """ Atomically writes one ticker's payload. """
+        entry = {
+            "symbol": ticker,
+            "fetched_at": (fetched_at or datetime.now()).isoformat(timespec='seconds'),
+            "quarterlyEarnings": earnings_list,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path(ticker))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._memo[ticker] = entry
+
+    def _migrate_legacy_cache(self, legacy_file):
+        """
+        One-off split of the old whole-file earnings_cache.json into per-ticker entries.
+        Legacy entries carry no timestamp, so the file's mtime is used as fetched_at.
+        """
+        self.logger.info(f"Migrating legacy earnings cache {legacy_file} to {self.store_dir}")
+        try:
+            with open(legacy_file, 'r') as f:
+                legacy = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not read legacy earnings cache: {e}")
+            return
+        fetched_at = datetime.fromtimestamp(os.path.getmtime(legacy_file))
+        for ticker, earnings_list in legacy.items():
+            if ticker not in self:
+                self.put(ticker, earnings_list, fetched_at=fetched_at)
+        os.replace(legacy_file, legacy_file + '.migrated')
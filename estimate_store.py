@@ -0,0 +1,226 @@
+import glob
+import logging
+import os
+import re
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Snapshot files written by fetch_real_data.py and fetch_historical_forecasts.py
+SNAPSHOT_PATTERNS = {
+    'current_forward_peg_*.csv': (re.compile(r'current_forward_peg_(\d{4}-\d{2}-\d{2})\.csv$'), '%Y-%m-%d'),
+    'historical_estimates_*.csv': (re.compile(r'historical_estimates_(\d{8})\.csv$'), '%Y%m%d'),
+}
+
+# Period label used for the '+1y' (next fiscal year) consensus in current_forward_peg snapshots
+FORWARD_YEAR = '+1y'
+
+COLUMNS = ['symbol', 'period', 'period_end', 'as_of', 'eps']
+
+DEFAULT_STORE_PATH = os.path.join("cache", "estimate_vintages.npz")
+
+
+class VintageEstimateStore:
+    """
+    Point-in-time (bitemporal) store of consensus EPS estimates.
+
+    Each row is (symbol, period, period_end, as_of, eps): the consensus for one
+    fiscal period as it was known on `as_of`. Fiscal quarters are keyed by their
+    end date; relative periods such as '+1y' have no period_end. Revisions are
+    kept as separate vintages, so queries never look ahead.
+
+    Persisted as a single columnar .npz under `path`.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.ingested = set()
+        self.df = pd.DataFrame({
+            'symbol': pd.Series(dtype=object),
+            'period': pd.Series(dtype=object),
+            'period_end': pd.Series(dtype='datetime64[ns]'),
+            'as_of': pd.Series(dtype='datetime64[ns]'),
+            'eps': pd.Series(dtype=float),
+        })
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with np.load(self.path, allow_pickle=False) as f:
+            self.df = pd.DataFrame({
+                'symbol': f['symbol'].astype(object),
+                'period': f['period'].astype(object),
+                'period_end': f['period_end'].view('datetime64[ns]'),
+                'as_of': f['as_of'].view('datetime64[ns]'),
+                'eps': f['eps'],
+            })
+            self.ingested = set(f['ingested'].tolist())
+
+    def save(self):
+        """ Atomically writes the store. """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    symbol=self.df['symbol'].to_numpy(dtype=str),
+                    period=self.df['period'].to_numpy(dtype=str),
+                    period_end=self.df['period_end'].to_numpy(dtype='datetime64[ns]').view(np.int64),
+                    as_of=self.df['as_of'].to_numpy(dtype='datetime64[ns]').view(np.int64),
+                    eps=self.df['eps'].to_numpy(dtype=np.float64),
+                    ingested=np.array(sorted(self.ingested), dtype=str),
+                )
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def add(self, rows):
+        """
+        Adds vintages from a DataFrame with COLUMNS. A repeated
+        (symbol, period, as_of) replaces the earlier row.
+        """
+        rows = rows[COLUMNS].copy()
+        rows['period_end'] = pd.to_datetime(rows['period_end']).astype('datetime64[ns]')
+        rows['as_of'] = pd.to_datetime(rows['as_of']).astype('datetime64[ns]')
+        rows['eps'] = pd.to_numeric(rows['eps'], errors='coerce')
+        rows = rows.dropna(subset=['eps'])
+        combined = pd.concat([self.df, rows], ignore_index=True) if len(self.df) else rows.reset_index(drop=True)
+        self.df = combined.drop_duplicates(['symbol', 'period', 'as_of'], keep='last').reset_index(drop=True)
+
+    def ingest_file(self, path, force=False):
+        """
+        Ingests one snapshot CSV; the as-of date comes from its file name.
+        Returns the number of rows added (0 if already ingested).
+        """
+        name = os.path.basename(path)
+        if name in self.ingested and not force:
+            return 0
+        for pattern, date_format in SNAPSHOT_PATTERNS.values():
+            match = pattern.search(name)
+            if match:
+                as_of = pd.to_datetime(match.group(1), format=date_format)
+                break
+        else:
+            raise ValueError(f"Not a recognised estimate snapshot: {name}")
+
+        snap = pd.read_csv(path)
+        if 'Forward_EPS_Est' in snap.columns:
+            rows = pd.DataFrame({
+                'symbol': snap['Ticker'],
+                'period': FORWARD_YEAR,
+                'period_end': pd.NaT,
+                'as_of': as_of,
+                'eps': snap['Forward_EPS_Est'],
+            })
+        else:
+            rows = pd.DataFrame({
+                'symbol': snap['Ticker'],
+                'period': snap['Date'].astype(str),
+                'period_end': pd.to_datetime(snap['Date']),
+                'as_of': as_of,
+                'eps': snap['Estimated_EPS'],
+            })
+        self.add(rows)
+        self.ingested.add(name)
+        self.logger.info(f"Ingested {len(rows)} estimate vintages from {name} (as of {as_of.date()})")
+        return len(rows)
+
+    def ingest_directory(self, directory='.'):
+        """ Ingests every not-yet-seen snapshot CSV in `directory`. """
+        added = 0
+        for pattern in SNAPSHOT_PATTERNS:
+            for path in sorted(glob.glob(os.path.join(directory, pattern))):
+                added += self.ingest_file(path)
+        return added
+
+    def as_of(self, dates, tickers, period=None):
+        """
+        Consensus EPS for every (date, ticker) as it was known on that date.
+
+        period=None   the next fiscal quarter ending on/after each date, at its
+                      latest vintage with as_of <= date
+        period=label  the latest vintage of that period label (e.g. '+1y')
+
+        Answered with one sorted lookup over all tickers; returns a DataFrame
+        (Index=dates, Cols=tickers), NaN where nothing was known yet.
+        """
+        dates = pd.DatetimeIndex(dates)
+        tickers = list(tickers)
+        n_dates, n_tickers = len(dates), len(tickers)
+        panel = np.full((n_dates, n_tickers), np.nan)
+
+        df = self.df[self.df['symbol'].isin(tickers)]
+        if period is None:
+            df = df[df['period_end'].notna()]
+        else:
+            df = df[df['period'] == period]
+        if df.empty or not n_dates:
+            return pd.DataFrame(panel, index=dates, columns=tickers)
+
+        # Work in date-index positions, so every key fits in one int64 sort
+        idx = dates.values.astype('datetime64[ns]')
+        stride = n_dates + 1
+        col = pd.Index(tickers).get_indexer(df['symbol']).astype(np.int64)
+        known_from = np.searchsorted(idx, df['as_of'].values.astype('datetime64[ns]'), side='left')
+        positions = np.arange(n_dates, dtype=np.int64)
+        columns = np.arange(n_tickers, dtype=np.int64)
+
+        if period is None:
+            # Periods of each ticker ordered by end; "last position still <= period end"
+            period_keys = df[['symbol', 'period_end']].drop_duplicates()
+            period_col = pd.Index(tickers).get_indexer(period_keys['symbol']).astype(np.int64)
+            period_last = np.searchsorted(idx, period_keys['period_end'].values.astype('datetime64[ns]'), side='right') - 1
+            period_ends = period_keys['period_end'].values.astype('datetime64[ns]')
+            order = np.lexsort((period_ends, period_last, period_col))
+            period_col, period_last, period_ends = period_col[order], period_last[order], period_ends[order]
+
+            # Next period for each (date, ticker): first with last position >= k
+            queries = positions[:, None] + columns[None, :] * stride
+            nxt = np.searchsorted(period_col * stride + period_last, queries, side='left')
+            safe_nxt = np.minimum(nxt, len(period_col) - 1)
+            has_period = (nxt < len(period_col)) & (period_col[safe_nxt] == columns[None, :])
+
+            # Vintage group id of each row = its period's rank in that order
+            rank = pd.MultiIndex.from_arrays([period_col, period_ends])
+            group = rank.get_indexer(pd.MultiIndex.from_arrays([col, df['period_end'].values]))
+            target_group = np.where(has_period, safe_nxt, -1)
+        else:
+            group = col
+            target_group = np.broadcast_to(columns, (n_dates, n_tickers))
+
+        # Latest vintage in the target group already known at position k
+        as_of = df['as_of'].values.astype('datetime64[ns]')
+        order = np.lexsort((as_of, known_from, group))
+        group_sorted = group[order].astype(np.int64)
+        keys = group_sorted * stride + known_from[order]
+        values = df['eps'].to_numpy(dtype=np.float64)[order]
+
+        found = np.searchsorted(keys, np.maximum(target_group, 0) * stride + positions[:, None], side='right') - 1
+        safe = np.maximum(found, 0)
+        ok = (target_group >= 0) & (found >= 0) & (group_sorted[safe] == target_group)
+        panel[ok] = values[safe[ok]]
+        return pd.DataFrame(panel, index=dates, columns=tickers)
+
+
+def record_snapshot(path, store_path=DEFAULT_STORE_PATH):
+    """ Adds a freshly written snapshot CSV to the vintage store. """
+    store = VintageEstimateStore(store_path)
+    store.ingest_file(path)
+    store.save()
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    directory = sys.argv[1] if len(sys.argv) > 1 else '.'
+    store = VintageEstimateStore()
+    added = store.ingest_directory(directory)
+    store.save()
+    print(f"Added {added} vintages; store holds {len(store.df)} rows for {store.df['symbol'].nunique()} symbols")
@@ -1,10 +1,11 @@
-import requests
 import pandas as pd
-import time
 import argparse
 import logging
 from datetime import datetime
 
+from av_client import AlphaVantageClient
+from estimate_store import record_snapshot
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -15,32 +16,23 @@ def fetch_earnings_data(ticker, api_key):
     """
     Fetches quarterly earnings data including analyst estimates from Alpha Vantage.
     """
-    url = f"https://www.alphavantage.co/query?function=EARNINGS&symbol={ticker}&apikey={api_key}"
-    try:
-        response = requests.get(url)
-        data = response.json()
-        
-        if "quarterlyEarnings" in data:
-            return data["quarterlyEarnings"]
-        else:
-            logger.warning(f"No quarterly earnings data found for {ticker}. Response: {list(data.keys())}")
-            return []
-    except Exception as e:
-        logger.error(f"Error fetching data for {ticker}: {e}")
-        return []
+    return AlphaVantageClient(api_key).fetch_earnings(ticker)
 
-def process_earnings_history(tickers, api_key, years=5):
+def process_earnings_history(tickers, api_key, years=5, requests_per_minute=5, client=None):
     """
     Fetches and processes earnings history for a list of tickers.
     Returns a DataFrame with Date, Ticker, EstimatedEPS, ReportedEPS.
+
+    Tickers are fetched concurrently through AlphaVantageClient, paced by its
+    token bucket (requests_per_minute) rather than a fixed sleep per ticker.
     """
     all_data = []
     start_year = datetime.now().year - years
+    if client is None:
+        client = AlphaVantageClient(api_key, requests_per_minute=requests_per_minute)
     
-    for ticker in tickers:
-        logger.info(f"Fetching earnings history for {ticker}...")
-        raw_data = fetch_earnings_data(ticker, api_key)
-        
+    logger.info(f"Fetching earnings history for {len(tickers)} tickers...")
+    for ticker, raw_data in client.fetch_earnings_many(tickers):
         for entry in raw_data:
             fiscal_date = entry.get('fiscalDateEnding')
             estimated_eps = entry.get('estimatedEPS')
@@ -55,12 +47,6 @@ def process_earnings_history(tickers, api_key, years=5):
                         'Estimated_EPS': float(estimated_eps),
                         'Reported_EPS': float(reported_eps) if reported_eps and reported_eps != 'None' else None
                     })
-        
-        # Rate limiting: Alpha Vantage free tier is ~5 calls per minute
-        # We sleep 12 seconds to be safe if running a list
-        if len(tickers) > 1:
-            logger.info("Sleeping 12s to respect API rate limits...")
-            time.sleep(12)
             
     df = pd.DataFrame(all_data)
     if not df.empty:
@@ -76,6 +62,7 @@ def main():
     parser = argparse.ArgumentParser(description='Fetch Historical Analyst Estimates (Alpha Vantage)')
     parser.add_argument('--key', type=str, default=None, help='Alpha Vantage API Key')
     parser.add_argument('--tickers', type=str, default='IBM', help='Comma separated tickers (e.g. IBM,MSFT)')
+    parser.add_argument('--rpm', type=float, default=float(os.getenv("ALPHA_VANTAGE_RPM", 5)), help='Requests per minute allowed by the API key')
     args = parser.parse_args()
     
     api_key = args.key
@@ -90,12 +77,13 @@ def main():
     safe_key = f"...{api_key[-4:]}" if api_key and len(api_key) > 4 else api_key
     logger.info(f"Starting fetch for {len(ticker_list)} tickers using key ending in {safe_key}")
     
-    df = process_earnings_history(ticker_list, api_key)
+    df = process_earnings_history(ticker_list, api_key, requests_per_minute=args.rpm)
     
     if not df.empty:
         filename = f"historical_estimates_{datetime.now().strftime('%Y%m%d')}.csv"
         df.to_csv(filename, index=False)
         logger.info(f"Saved {len(df)} records to {filename}")
+        record_snapshot(filename)
         print(df.head())
     else:
         logger.warning("No data retrieved.")
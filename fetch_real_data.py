@@ -1,99 +1,222 @@
 import yfinance as yf
 import pandas as pd
+import argparse
 import logging
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 from datetime import datetime
 
+from estimate_store import record_snapshot
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def fetch_current_peg_snapshot(tickers):
+# Snapshots repeated within this many seconds reuse the previous per-ticker rows
+SNAPSHOT_TTL_SECONDS = 300
+
+
+class SnapshotCollector:
+    """
+    Collects current Forward PEG rows for many tickers concurrently.
+
+    Each ticker runs on one of `max_workers` daemon threads and is abandoned once it
+    has been running longer than `timeout` seconds, so a slow symbol cannot stall the
+    snapshot. A hung yfinance call is only abandoned, not stopped: its thread keeps
+    running in the background, but being a daemon it never delays interpreter exit.
+    All yf.Ticker objects share one session (yfinance's process-wide one unless
+    `session` is given). Successful rows are memoized for `ttl` seconds.
+    """
+
+    def __init__(self, max_workers=8, timeout=20.0, ttl=SNAPSHOT_TTL_SECONDS, session=None):
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.ttl = ttl
+        self.session = session
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def _fetch_row(self, ticker):
+        """ Returns the snapshot row for one ticker; raises ValueError when data is missing. """
+        t = yf.Ticker(ticker, session=self.session)
+
+        # Get Current Price
+        # Try fast_info first (faster)
+        try:
+            price = t.fast_info['last_price']
+        except Exception:
+            hist = t.history(period="1d")
+            if hist.empty:
+                raise ValueError("Could not get price")
+            price = hist['Close'].iloc[-1]
+
+        # Get Estimates
+        estimates = t.earnings_estimate
+        if estimates is None or estimates.empty:
+            raise ValueError("No estimates found")
+
+        # Use '+1y' row (Next Fiscal Year)
+        # Sometimes index is '+1y', sometimes '0y' depending on fiscal calendar vs today.
+        # We prefer '+1y' for "Forward".
+        if '+1y' in estimates.index:
+            row = estimates.loc['+1y']
+        elif '0y' in estimates.index:
+            row = estimates.loc['0y'] # Fallback
+        else:
+            raise ValueError("No annual estimate row")
+
+        eps_est = row['avg']
+        growth = row['growth'] # e.g. 0.15 for 15%
+
+        # Calculate Metrics
+        forward_pe = price / eps_est if eps_est > 0 else None # Negative earnings
+
+        peg = None
+        if forward_pe and growth and growth > 0:
+            # PEG formula: PE / (Growth * 100)
+            peg = forward_pe / (growth * 100)
+
+        return {
+            'Ticker': ticker,
+            'Price': price,
+            'Forward_EPS_Est': eps_est,
+            'Growth_Est': growth,
+            'Forward_PE': forward_pe,
+            'Calculated_PEG': peg
+        }
+
+    def _memoized(self, ticker):
+        with self._lock:
+            entry = self._memo.get(ticker)
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def collect(self, tickers):
+        """
+        Returns (DataFrame of rows in ticker order, {ticker: failure reason}).
+        """
+        rows = {}
+        failures = {}
+        todo = []
+        for ticker in tickers:
+            cached = self._memoized(ticker)
+            if cached is not None:
+                rows[ticker] = cached
+            else:
+                todo.append(ticker)
+        if len(todo) < len(tickers):
+            self.logger.info(f"Reusing {len(tickers) - len(todo)} snapshot rows younger than {self.ttl}s")
+
+        started = {}
+
+        def work(ticker):
+            started[ticker] = time.monotonic()
+            return self._fetch_row(ticker)
+
+        # Daemon threads rather than a ThreadPoolExecutor: executor threads are joined at
+        # interpreter exit, so one hung call would outlast `timeout` and hold the CLI open
+        jobs = queue.SimpleQueue()
+        futures = {}
+        for ticker in todo:
+            future = Future()
+            futures[future] = ticker
+            jobs.put((future, ticker))
+
+        def worker():
+            while True:
+                try:
+                    future, ticker = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(work(ticker))
+                except Exception as e:
+                    future.set_exception(e)
+
+        for i in range(min(self.max_workers, len(todo))):
+            threading.Thread(target=worker, name=f"snapshot-{i}", daemon=True).start()
+
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+                for future in done:
+                    ticker = futures[future]
+                    try:
+                        rows[ticker] = future.result()
+                        with self._lock:
+                            self._memo[ticker] = (time.monotonic(), rows[ticker])
+                    except Exception as e:
+                        failures[ticker] = str(e)
+                now = time.monotonic()
+                for future in [f for f in pending if not f.done() and futures[f] in started and now - started[futures[f]] > self.timeout]:
+                    failures[futures[future]] = f"Timed out after {self.timeout:.0f}s"
+                    pending.discard(future)
+        finally:
+            # Tickers not yet started are dropped; timed-out calls finish (or hang) in the background
+            for future in futures:
+                future.cancel()
+
+        for ticker, reason in failures.items():
+            self.logger.warning(f"{ticker}: {reason}")
+        self.logger.info(f"Snapshot collected {len(rows)}/{len(tickers)} tickers, {len(failures)} failed")
+        return pd.DataFrame([rows[t] for t in tickers if t in rows]), failures
+
+
+_default_collector = None
+
+
+def fetch_current_peg_snapshot(tickers, collector=None):
     """
     Fetches current Forward PEG data for a list of tickers.
     Since 'pegRatio' in yf.info is often missing, we calculate it:
     PEG = (Price / Forward EPS) / (Growth Rate * 100)
     
     We uses '+1y' estimate for Forward EPS and Growth.
+    Tickers that failed or timed out are listed in `df.attrs['failures']`.
     """
-    results = []
-    
-    for ticker in tickers:
-        logger.info(f"Fetching data for {ticker}...")
-        try:
-            t = yf.Ticker(ticker)
-            
-            # Get Current Price
-            # Try fast_info first (faster)
-            try:
-                price = t.fast_info['last_price']
-            except:
-                hist = t.history(period="1d")
-                if not hist.empty:
-                    price = hist['Close'].iloc[-1]
-                else:
-                    logger.warning(f"Could not get price for {ticker}")
-                    continue
-            
-            # Get Estimates
-            estimates = t.earnings_estimate
-            if estimates is None or estimates.empty:
-                logger.warning(f"No estimates found for {ticker}")
-                continue
-            
-            # Use '+1y' row (Next Fiscal Year)
-            # Sometimes index is '+1y', sometimes '0y' depending on fiscal calendar vs today.
-            # We prefer '+1y' for "Forward".
-            
-            row = None
-            if '+1y' in estimates.index:
-                row = estimates.loc['+1y']
-            elif '0y' in estimates.index:
-                row = estimates.loc['0y'] # Fallback
-            
-            if row is not None:
-                eps_est = row['avg']
-                growth = row['growth'] # e.g. 0.15 for 15%
-                
-                # Calculate Metrics
-                if eps_est > 0:
-                    forward_pe = price / eps_est
-                else:
-                    forward_pe = None # Negative earnings
-                
-                peg = None
-                if forward_pe and growth and growth > 0:
-                   # PEG formula: PE / (Growth * 100)
-                   peg = forward_pe / (growth * 100)
-                
-                results.append({
-                    'Ticker': ticker,
-                    'Price': price,
-                    'Forward_EPS_Est': eps_est,
-                    'Growth_Est': growth,
-                    'Forward_PE': forward_pe,
-                    'Calculated_PEG': peg
-                })
-                
-        except Exception as e:
-            logger.error(f"Error processing {ticker}: {e}")
-            
-    return pd.DataFrame(results)
+    global _default_collector
+    if collector is None:
+        if _default_collector is None:
+            _default_collector = SnapshotCollector()
+        collector = _default_collector
+    df, failures = collector.collect(tickers)
+    df.attrs['failures'] = failures
+    return df
 
 def main():
+    parser = argparse.ArgumentParser(description="Snapshot current Forward PEG ratios")
+    parser.add_argument('--qqq', action='store_true', help='Snapshot the full QQQ list from backfill_earnings.py')
+    parser.add_argument('--workers', type=int, default=8, help='Tickers fetched concurrently')
+    parser.add_argument('--timeout', type=float, default=20.0, help='Seconds before a ticker is given up on')
+    args = parser.parse_args()
+
     # Define Universe (Same as data_loader)
     top_tech_stocks = [
         "AAPL", "MSFT", "AMZN", "GOOGL", "META", 
         "TSLA", "NVDA", "PYPL", "ADBE", "NFLX",
         "INTC", "CSCO", "CMCSA", "PEP", "AVGO"
     ]
+    if args.qqq:
+        from backfill_earnings import QQQ_TICKERS
+        top_tech_stocks = QQQ_TICKERS
     
     logger.info(f"Starting snapshot for {len(top_tech_stocks)} stocks...")
-    df = fetch_current_peg_snapshot(top_tech_stocks)
+    df = fetch_current_peg_snapshot(top_tech_stocks, SnapshotCollector(max_workers=args.workers, timeout=args.timeout))
+    if df.attrs['failures']:
+        logger.warning(f"Missing {len(df.attrs['failures'])} tickers: {', '.join(sorted(df.attrs['failures']))}")
     
     if not df.empty:
         filename = f"current_forward_peg_{datetime.today().strftime('%Y-%m-%d')}.csv"
         df.to_csv(filename, index=False)
         logger.info(f"Successfully saved snapshot to {filename}")
+        record_snapshot(filename)
         print(df[['Ticker', 'Calculated_PEG', 'Forward_PE', 'Growth_Est']].head(15))
     else:
         logger.error("No data collected.")
@@ -0,0 +1,245 @@
+"""
+Streaming performance metrics for the live book.
+
+StreamingMetrics keeps O(1) state (Welford mean/variance of all and of
+negative returns, first/last/peak equity, worst drawdown, first/last date)
+and updates it one day or one batch at a time, so a daily job never reloads
+the return history. Its summary matches Metrics.get_summary_values on the
+same Daily_Return / Portfolio_Value history.
+
+    python live_metrics.py --state live_metrics.json --init backtest_results.csv
+    python live_metrics.py --state live_metrics.json --date 2025-12-08 --return 0.0042 --value 131250.0
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _moments(values):
+    """ (count, mean, sum of squared deviations) of a 1-D array. """
+    n = len(values)
+    if n == 0:
+        return 0, 0.0, 0.0
+    mean = values.mean()
+    return n, float(mean), float(np.square(values - mean).sum())
+
+
+def _merge_moments(a, b):
+    """ Chan et al. pairwise combination of two (count, mean, M2) triples. """
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    n = n_a + n_b
+    if n_b == 0:
+        return a
+    if n_a == 0:
+        return b
+    delta = mean_b - mean_a
+    return n, mean_a + delta * n_b / n, m2_a + m2_b + delta * delta * n_a * n_b / n
+
+
+class StreamingMetrics:
+    """
+    Incremental equivalent of Metrics.get_summary_values.
+
+    `update` takes one day's return and, optionally, the portfolio value and date;
+    `update_batch` takes arrays or a backtest results frame. Without values the
+    equity compounds from 1.0 like the Metrics default. Without dates CAGR (and
+    hence Calmar) is 0. NaN returns are skipped in the return statistics.
+    Dated observations on or before the last date already added are skipped, so
+    replaying a day (e.g. a retried daily job) never counts it twice.
+    """
+
+    _FIELDS = ["count", "mean", "m2", "down_count", "down_mean", "down_m2",
+               "first_value", "last_value", "peak", "max_drawdown", "first_date", "last_date"]
+
+    def __init__(self):
+        self.count, self.mean, self.m2 = 0, 0.0, 0.0
+        self.down_count, self.down_mean, self.down_m2 = 0, 0.0, 0.0
+        self.first_value = self.last_value = self.peak = None
+        self.max_drawdown = 0.0
+        self.first_date = self.last_date = None
+
+    def update(self, daily_return, value=None, date=None):
+        """ Adds one observation in constant time; a date not after `last_date` is skipped. """
+        if date is not None:
+            date = pd.Timestamp(date)
+            if self.last_date is not None and date <= self.last_date:
+                logger.warning(f"Skipping {date.date()}: already tracked up to {self.last_date.date()}")
+                return self
+        r = float(daily_return)
+        if not math.isnan(r):
+            # Welford
+            self.count += 1
+            delta = r - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (r - self.mean)
+            if r < 0:
+                self.down_count += 1
+                delta = r - self.down_mean
+                self.down_mean += delta / self.down_count
+                self.down_m2 += delta * (r - self.down_mean)
+
+        if value is None:
+            value = (1.0 if self.last_value is None else self.last_value) * (1 + (0.0 if math.isnan(r) else r))
+        value = float(value)
+        if self.first_value is None:
+            self.first_value = self.peak = value
+        self.peak = max(self.peak, value)
+        self.max_drawdown = min(self.max_drawdown, value / self.peak - 1)
+        self.last_value = value
+
+        if date is not None:
+            if self.first_date is None:
+                self.first_date = date
+            self.last_date = date
+        return self
+
+    def update_batch(self, daily_returns, values=None, dates=None):
+        """
+        Adds many observations at once (vectorized; the result equals calling `update`
+        in order). `daily_returns` may be a backtest results DataFrame with Daily_Return,
+        Portfolio_Value and a date index, or a Series/array with optional `values` and `dates`.
+        """
+        if isinstance(daily_returns, pd.DataFrame):
+            frame = daily_returns
+            daily_returns, values = frame['Daily_Return'], frame.get('Portfolio_Value')
+            dates = frame.index
+        elif dates is None and isinstance(daily_returns, pd.Series) and isinstance(daily_returns.index, pd.DatetimeIndex):
+            dates = daily_returns.index
+        r = np.asarray(daily_returns, dtype=np.float64)
+        if dates is not None and self.last_date is not None:
+            dates = pd.DatetimeIndex(dates)
+            new = np.asarray(dates > self.last_date)
+            if not new.all():
+                logger.warning(f"Skipping {np.count_nonzero(~new)} observations up to {self.last_date.date()}: already tracked")
+                r, dates = r[new], dates[new]
+                values = None if values is None else np.asarray(values, dtype=np.float64)[new]
+        if len(r) == 0:
+            return self
+
+        valid = r[~np.isnan(r)]
+        self.count, self.mean, self.m2 = _merge_moments((self.count, self.mean, self.m2), _moments(valid))
+        down = (self.down_count, self.down_mean, self.down_m2)
+        self.down_count, self.down_mean, self.down_m2 = _merge_moments(down, _moments(valid[valid < 0]))
+
+        if values is None:
+            start = 1.0 if self.last_value is None else self.last_value
+            eq = start * np.cumprod(1 + np.nan_to_num(r))
+        else:
+            eq = np.asarray(values, dtype=np.float64)
+        if self.first_value is None:
+            self.first_value = self.peak = float(eq[0])
+        running_peak = np.maximum.accumulate(eq)
+        np.maximum(running_peak, self.peak, out=running_peak)
+        self.max_drawdown = min(self.max_drawdown, float((eq / running_peak).min() - 1))
+        self.peak = float(running_peak[-1])
+        self.last_value = float(eq[-1])
+
+        if dates is not None and len(dates):
+            if self.first_date is None:
+                self.first_date = pd.Timestamp(dates[0])
+            self.last_date = pd.Timestamp(dates[-1])
+        return self
+
+    def summary_values(self):
+        """ Numeric summary, same keys and definitions as Metrics.get_summary_values. """
+        nan = float('nan')
+        std = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else nan
+        down_std = math.sqrt(self.down_m2 / (self.down_count - 1)) * math.sqrt(252) if self.down_count > 1 else nan
+        mean = self.mean if self.count else nan
+
+        total = self.last_value / self.first_value if self.first_value is not None else nan
+        days = (self.last_date - self.first_date).days if self.first_date is not None else 0
+        cagr = total ** (365.25 / days) - 1 if days else 0.0
+        max_dd = self.max_drawdown
+        return {
+            "total_return": total - 1,
+            "cagr": cagr,
+            "sharpe": 0.0 if std == 0 else mean * 252 / (std * math.sqrt(252)),
+            "sortino": 0.0 if self.down_count == 0 or down_std == 0 else mean * 252 / down_std,
+            "calmar": 0.0 if max_dd == 0 else cagr / abs(max_dd),
+            "max_drawdown": max_dd,
+            "volatility": std * math.sqrt(252),
+        }
+
+    def summary_stats(self, benchmark=None):
+        """ Display dict of Metrics.get_summary_stats; `benchmark` is another StreamingMetrics. """
+        return Metrics.format_summary(self.summary_values(),
+                                      None if benchmark is None else benchmark.summary_values())
+
+    def to_dict(self):
+        """ Compact JSON-serializable state (a dozen numbers). """
+        state = {name: getattr(self, name) for name in self._FIELDS}
+        for name in ("first_date", "last_date"):
+            if state[name] is not None:
+                state[name] = state[name].isoformat()
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        acc = cls()
+        for name in cls._FIELDS:
+            setattr(acc, name, state.get(name, getattr(acc, name)))
+        for name in ("first_date", "last_date"):
+            if getattr(acc, name) is not None:
+                setattr(acc, name, pd.Timestamp(getattr(acc, name)))
+        return acc
+
+    def save(self, path):
+        """ Atomically writes the state as JSON (temp file + os.replace). """
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.to_dict(), f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Update live portfolio metrics incrementally')
+    parser.add_argument('--state', type=str, default='live_metrics.json', help='Accumulator state file')
+    parser.add_argument('--init', type=str, default=None, help='Seed the state from a backtest results CSV')
+    parser.add_argument('--date', type=str, default=None, help='Date of the new observation')
+    parser.add_argument('--return', dest='daily_return', type=float, default=None, help='New daily return')
+    parser.add_argument('--value', type=float, default=None, help='New portfolio value')
+    args = parser.parse_args()
+    if args.daily_return is not None and args.date is None:
+        parser.error("--return requires --date (CAGR and the rerun guard use it)")
+
+    if args.init:
+        results = pd.read_csv(args.init, index_col=0, parse_dates=True)
+        acc = StreamingMetrics().update_batch(results)
+    elif os.path.exists(args.state):
+        acc = StreamingMetrics.load(args.state)
+    else:
+        acc = StreamingMetrics()
+    if args.daily_return is not None:
+        acc.update(args.daily_return, args.value, args.date)
+    acc.save(args.state)
+
+    for k, v in acc.summary_stats().items():
+        print(f" {k:<15}: {v}")
+
+
+if __name__ == "__main__":
+    main()
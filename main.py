@@ -4,10 +4,13 @@ import numpy as np
 from datetime import datetime
 import argparse
 
-from data_loader import DataProvider
+from replay_provider import make_data_provider
 from strategy import PegStrategy
-from backtester import Backtester
+from backtester import Backtester, DriftBacktester
+from bootstrap import bootstrap_metrics
 from metrics import Metrics
+from panel_io import save_panel
+from peg_factor import compute_forward_peg
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -26,6 +29,15 @@ def main():
     parser.add_argument('--end', type=str, default=datetime.today().strftime('%Y-%m-%d'), help='End date (YYYY-MM-DD)')
     parser.add_argument('--top_n', type=int, default=5, help='Number of stocks to select')
     parser.add_argument('--api_key', type=str, default=None, help='Alpha Vantage API Key for Real Data')
+    parser.add_argument('--record', type=str, default=os.getenv("PEG_RECORD"), help='Record all provider responses into this archive (.zip)')
+    parser.add_argument('--replay', type=str, default=os.getenv("PEG_REPLAY"), help='Replay provider responses from this archive, no network access')
+    parser.add_argument('--worker_url', type=str, default=None, help='Read prices/earnings from the earnings-worker D1 cache instead of Yahoo/AV')
+    parser.add_argument('--panel_dir', type=str, default='panels', help='Directory for binary (memory-mappable) price/EPS/PEG panels')
+    parser.add_argument('--av_rpm', type=float, default=float(os.getenv("ALPHA_VANTAGE_RPM", 5)), help='Alpha Vantage requests per minute allowed by the key')
+    parser.add_argument('--drift', action='store_true', help='Hold shares between rebalances (drift) instead of daily-rebalanced constant weights')
+    parser.add_argument('--commission', type=float, default=0.0, help='Commission per trade with --drift')
+    parser.add_argument('--slippage_bps', type=float, default=0.0, help='Slippage + fees in bps of traded notional with --drift')
+    parser.add_argument('--bootstrap', type=int, default=0, help='Stationary-bootstrap paths for metric confidence intervals (0 = off)')
     args = parser.parse_args()
 
     # Priority: Command Line > Environment Variable
@@ -36,7 +48,10 @@ def main():
     logger.info("Starting Forward PEG System...")
     
     # 1. Load Data
-    data_provider = DataProvider(api_key=api_key)
+    data_provider = make_data_provider(
+        api_key=api_key, record=args.record, replay=args.replay, worker_url=args.worker_url,
+        av_requests_per_minute=args.av_rpm,
+    )
     
     # Use expanded universe (from data_loader)
     universe_tickers = data_provider.fetch_universe_constituents(args.etf)
@@ -53,41 +68,14 @@ def main():
     eps_estimates = data_provider.get_forward_peg_data(universe_tickers, args.start, args.end)
     
     # 4. Calculate Forward PEG
-    # PEG = (Price / Estimated_EPS) / (Growth_Rate * 100)
-    
-    # A. Calculate Forward PE
-    # Align dates
-    common_idx = prices.index.intersection(eps_estimates.index)
-    prices_aligned = prices.loc[common_idx]
-    eps_aligned = eps_estimates.loc[common_idx]
-    
-    forward_pe = prices_aligned / eps_aligned
-    
-    # B. Calculate Growth Rate
-    # We estimate growth as the 1-year change in the Estimated EPS itself
-    # Growth = (EPS_t / EPS_{t-1y}) - 1
-    # Shift 252 days
-    eps_shifted = eps_aligned.shift(252)
-    growth_rate = (eps_aligned / eps_shifted) - 1
-    
-    # Clean growth rate: replace 0, inf, or negative growth
-    growth_rate = growth_rate.replace([np.inf, -np.inf], np.nan)
-    # Filter reasonable growth (e.g. > 1%) 
-    growth_rate[growth_rate < 0.01] = np.nan
-    
-    # C. PEG Calculation
-    # PEG = PE / (Growth * 100). 
-    # Note: Traditional PEG uses Growth as integer (20 for 20%), so * 100.
-    peg_ratio = forward_pe / (growth_rate * 100)
-    
-    # Fill missing with previous valid
-    peg_ratio = peg_ratio.ffill(limit=10)
+    # PEG = (Price / Estimated_EPS) / (Growth_Rate * 100), growth = 1-year change in the Estimated EPS
+    peg_ratio = compute_forward_peg(prices, eps_estimates)
     
     # If no API key was provided, peg_ratio will be all NaN (since eps_estimates is empty/NA)
     # In that case, we should probably warn or fallback?
     # For now, we proceed as normal, Strategy handles empty data.
     
-    if api_key is None:
+    if api_key is None and not (args.replay or args.worker_url):
         logger.warning("!!! NO API KEY PROVIDED !!!")
         logger.warning("System cannot fetch real earnings. PEG data is missing.")
         logger.warning("Set ALPHA_VANTAGE_API_KEY in .env or use --api_key.")
@@ -95,15 +83,22 @@ def main():
     # 5. Run Strategy
     logger.info("Running Strategy Logic...")
     strategy = PegStrategy(top_n=args.top_n, rebalance_freq='ME')
-    weights = strategy.generate_signals(peg_ratio, prices.index)
+    schedule = strategy.generate_schedule(peg_ratio, prices.index)
     
     # 6. Backtest
     logger.info("Running Backtest Simulation...")
-    backtester = Backtester()
-    results = backtester.run_backtest(prices, weights)
+    if args.drift:
+        backtester = DriftBacktester(commission_per_trade=args.commission, slippage_bps=args.slippage_bps)
+    else:
+        backtester = Backtester()
+    results = backtester.run_backtest(prices, schedule)
     
     # 7. Metrics
     stats = Metrics.get_summary_stats(results['Daily_Return'], results['Portfolio_Value'])
+    if 'Turnover' in results:
+        years = max((results.index[-1] - results.index[0]).days / 365.25, 1e-9)
+        stats["Turnover / yr"] = f"{results['Turnover'].sum() / years:.2f}x"
+        stats["Total Costs"] = f"{results['Costs'].sum():,.2f}"
     
     print("\n" + "="*40)
     print(f" BACKTEST RESULTS ({args.etf})")
@@ -114,15 +109,37 @@ def main():
         print(f" {k:<15}: {v}")
     print("="*40 + "\n")
     
+    if args.bootstrap:
+        # Benchmark: buy-and-hold of the ETF, as in the dashboard; resampled on the same days as the strategy
+        bm_price = data_provider.fetch_price_history([args.etf], args.start, args.end)
+        bm_returns = None
+        if bm_price.empty:
+            logger.warning(f"No prices for {args.etf}: bootstrap intervals without active-return test")
+        else:
+            bm_weights = pd.DataFrame(1.0, index=bm_price.index, columns=bm_price.columns)
+            bm_returns = Backtester().run_backtest(bm_price, bm_weights)['Daily_Return']
+        ci, p_value = bootstrap_metrics(results['Daily_Return'], bm_returns, n_paths=args.bootstrap)
+        print(f" 95% bootstrap intervals ({args.bootstrap} paths)")
+        print(ci.to_string(float_format=lambda v: f"{v:.3f}"))
+        if p_value is not None:
+            print(f" Active return vs {args.etf}: p-value {p_value:.4f} (H0: strategy does not beat {args.etf})")
+        print()
+    
     # Optional: Save results
     results.to_csv("backtest_results.csv")
     peg_ratio.to_csv("derived_peg_ratios.csv")
     
+    # Binary panels: open later with panel_io.load_panel (memory-mapped, no parsing)
+    save_panel(prices, os.path.join(args.panel_dir, "prices"))
+    save_panel(eps_estimates, os.path.join(args.panel_dir, "eps_estimates"))
+    save_panel(peg_ratio, os.path.join(args.panel_dir, "peg_ratio"))
+    
     # 8. Save Rebalance Details
     # Extract snapshot of holdings and PEG at each rebalance
     # We look at weights at month ends (Strategy Freq 'ME' logic)
-    # Using 'ME' resample to mimic strategy trigger points
-    rebalance_snapshots = weights.resample('ME').last()
+    # Using 'ME' resample to mimic strategy trigger points; months without data are skipped
+    month_rows = pd.Series(1, index=schedule.index).resample('ME').count()
+    rebalance_snapshots = schedule.weights_at(month_rows.index[month_rows > 0])
     
     rebalance_log = []
     
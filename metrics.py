@@ -1,4 +1,5 @@
 import numpy as np
+import pandas as pd
 
 class Metrics:
     @staticmethod
@@ -57,46 +58,122 @@ class Metrics:
         # Max DD is typically negative, take absolute
         return cagr / abs(max_dd)
 
+    SUMMARY_FIELDS = ["total_return", "cagr", "sharpe", "sortino", "calmar", "max_drawdown", "volatility"]
+
     @staticmethod
-    def get_summary_stats(daily_returns, equity_curve, benchmark_returns=None, benchmark_curve=None):
-        sharpe = Metrics.calculate_sharpe_ratio(daily_returns)
-        max_dd = Metrics.calculate_max_drawdown(equity_curve)
-        total_ret = (equity_curve.iloc[-1] / equity_curve.iloc[0]) - 1
-        cagr = Metrics.calculate_cagr(equity_curve)
-        sortino = Metrics.calculate_sortino_ratio(daily_returns)
-        calmar = Metrics.calculate_calmar_ratio(cagr, max_dd)
-        vol = daily_returns.std() * np.sqrt(252)
-        
+    def summary_arrays(returns, equity=None, years=None):
+        """
+        Column-wise summary kernel: every statistic for every column of a (days, series)
+        returns array, sharing the intermediate sums instead of rescanning per metric.
+        `equity` defaults to cumprod(1 + returns); `years` is the calendar span for CAGR.
+        NaN returns are skipped like pandas does. Returns {field: (series,) array}.
+        Same definitions as the calculate_* methods above.
+        """
+        returns = np.asarray(returns, dtype=np.float64)
+        if returns.ndim == 1:
+            returns = returns[:, None]
+        equity = np.cumprod(1 + np.nan_to_num(returns), axis=0) if equity is None else np.asarray(equity, dtype=np.float64)
+        if equity.ndim == 1:
+            equity = equity[:, None]
+        n_days = returns.shape[0]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            valid = ~np.isnan(returns)
+            if valid.all():
+                r = returns
+                n = n_days
+                mean = r.sum(axis=0) / n
+                dev = r - mean
+            else:
+                r = np.where(valid, returns, 0.0)
+                n = valid.sum(axis=0)
+                mean = r.sum(axis=0) / n
+                dev = np.where(valid, r - mean, 0.0)
+            std = np.sqrt(np.square(dev, out=dev).sum(axis=0) / (n - 1))
+            del dev
+
+            downside = r < 0
+            n_down = downside.sum(axis=0)
+            down_mean = np.where(downside, r, 0.0).sum(axis=0) / n_down
+            down_dev = np.where(downside, r - down_mean, 0.0)
+            down_std = np.sqrt(np.square(down_dev, out=down_dev).sum(axis=0) / (n_down - 1)) * np.sqrt(252)
+            del down_dev
+
+            growth = equity[-1] / equity[0]
+            if n_days < 2 or not years:
+                cagr = np.zeros(returns.shape[1])
+            else:
+                cagr = growth ** (1 / years) - 1
+
+            drawdown = np.maximum.accumulate(equity, axis=0)
+            np.divide(equity, drawdown, out=drawdown)
+            max_dd = drawdown.min(axis=0) - 1
+
+            return {
+                "total_return": growth - 1,
+                "cagr": cagr,
+                "sharpe": np.where(std == 0, 0.0, mean * 252 / (std * np.sqrt(252))),
+                "sortino": np.where((n_down == 0) | (down_std == 0), 0.0, mean * 252 / down_std),
+                "calmar": np.where(max_dd == 0, 0.0, cagr / np.abs(max_dd)),
+                "max_drawdown": max_dd,
+                "volatility": std * np.sqrt(252),
+            }
+
+    @staticmethod
+    def summary_table(returns, equity=None):
+        """
+        Numeric summary of many series at once: `returns` (and optional `equity`) are
+        Date x Series DataFrames; returns a Series x SUMMARY_FIELDS DataFrame.
+        """
+        days = (returns.index[-1] - returns.index[0]).days if len(returns) > 1 else 0
+        arrays = Metrics.summary_arrays(
+            returns.to_numpy(dtype=np.float64),
+            None if equity is None else equity.to_numpy(dtype=np.float64),
+            days / 365.25,
+        )
+        return pd.DataFrame(arrays, index=returns.columns, columns=Metrics.SUMMARY_FIELDS)
+
+    @staticmethod
+    def get_summary_values(daily_returns, equity_curve):
+        """ Numeric summary (fractions, not percentages) for tables such as sweeps and walk-forward windows. """
+        days = (equity_curve.index[-1] - equity_curve.index[0]).days if len(equity_curve) > 1 else 0
+        arrays = Metrics.summary_arrays(
+            daily_returns.to_numpy(dtype=np.float64), equity_curve.to_numpy(dtype=np.float64), days / 365.25
+        )
+        return {k: float(v[0]) for k, v in arrays.items()}
+
+    @staticmethod
+    def format_summary(values, benchmark_values=None):
+        """ Presentation layer: the display strings of get_summary_stats from numeric summaries. """
         stats = {
-            "Total Return": f"{total_ret:.2%}",
-            "CAGR": f"{cagr:.2%}",
-            "Sharpe Ratio": f"{sharpe:.2f}",
-            "Sortino Ratio": f"{sortino:.2f}",
-            "Calmar Ratio": f"{calmar:.2f}",
-            "Max Drawdown": f"{max_dd:.2%}",
-            "Volatility": f"{vol:.2%}"
+            "Total Return": f"{values['total_return']:.2%}",
+            "CAGR": f"{values['cagr']:.2%}",
+            "Sharpe Ratio": f"{values['sharpe']:.2f}",
+            "Sortino Ratio": f"{values['sortino']:.2f}",
+            "Calmar Ratio": f"{values['calmar']:.2f}",
+            "Max Drawdown": f"{values['max_drawdown']:.2%}",
+            "Volatility": f"{values['volatility']:.2%}"
         }
         
-        if benchmark_returns is not None and benchmark_curve is not None:
-            # Benchmark metrics
-            bm_sharpe = Metrics.calculate_sharpe_ratio(benchmark_returns)
-            bm_max_dd = Metrics.calculate_max_drawdown(benchmark_curve)
-            bm_total_ret = (benchmark_curve.iloc[-1] / benchmark_curve.iloc[0]) - 1
-            bm_cagr = Metrics.calculate_cagr(benchmark_curve)
-            bm_sortino = Metrics.calculate_sortino_ratio(benchmark_returns)
-            bm_calmar = Metrics.calculate_calmar_ratio(bm_cagr, bm_max_dd)
-            bm_vol = benchmark_returns.std() * np.sqrt(252)
-            
-            stats["Benchmark Return"] = f"{bm_total_ret:.2%}"
-            stats["Benchmark CAGR"] = f"{bm_cagr:.2%}"
-            stats["Benchmark Sharpe"] = f"{bm_sharpe:.2f}"
-            stats["Benchmark Sortino"] = f"{bm_sortino:.2f}"
-            stats["Benchmark Calmar"] = f"{bm_calmar:.2f}"
-            stats["Benchmark MDD"] = f"{bm_max_dd:.2%}"
-            stats["Benchmark Volatility"] = f"{bm_vol:.2%}"
+        if benchmark_values is not None:
+            stats["Benchmark Return"] = f"{benchmark_values['total_return']:.2%}"
+            stats["Benchmark CAGR"] = f"{benchmark_values['cagr']:.2%}"
+            stats["Benchmark Sharpe"] = f"{benchmark_values['sharpe']:.2f}"
+            stats["Benchmark Sortino"] = f"{benchmark_values['sortino']:.2f}"
+            stats["Benchmark Calmar"] = f"{benchmark_values['calmar']:.2f}"
+            stats["Benchmark MDD"] = f"{benchmark_values['max_drawdown']:.2%}"
+            stats["Benchmark Volatility"] = f"{benchmark_values['volatility']:.2%}"
             
             # Active Return (Alpha proxy)
-            active_ret = total_ret - bm_total_ret
+            active_ret = values['total_return'] - benchmark_values['total_return']
             stats["Active Return"] = f"{active_ret:.2%}"
 
         return stats
+
+    @staticmethod
+    def get_summary_stats(daily_returns, equity_curve, benchmark_returns=None, benchmark_curve=None):
+        values = Metrics.get_summary_values(daily_returns, equity_curve)
+        benchmark_values = None
+        if benchmark_returns is not None and benchmark_curve is not None:
+            benchmark_values = Metrics.get_summary_values(benchmark_returns, benchmark_curve)
+        return Metrics.format_summary(values, benchmark_values)
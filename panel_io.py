@@ -0,0 +1,67 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+VALUES_FILE = "values.npy"
+DATES_FILE = "dates.npy"
+META_FILE = "meta.json"
+
+
+def save_panel(df, path, dtype=None):
+    """
+    Writes a date x ticker DataFrame as a binary panel directory:
+
+        values.npy  2D array, column-major so each ticker is one contiguous run
+        dates.npy   int64 timestamps of the index
+        meta.json   tickers, index name and dtype
+
+    Unlike CSV this round-trips exactly and can be opened with load_panel
+    without parsing or reading the whole file.
+    """
+    os.makedirs(path, exist_ok=True)
+    values = df.to_numpy(dtype=dtype or np.float64)
+    index = pd.DatetimeIndex(df.index)
+
+    np.save(os.path.join(path, VALUES_FILE), np.asfortranarray(values))
+    date_unit = np.datetime_data(index.values.dtype)[0]
+    np.save(os.path.join(path, DATES_FILE), index.values.astype(np.int64))
+    meta = {
+        "tickers": [str(c) for c in df.columns],
+        "index_name": index.name,
+        "date_unit": date_unit,
+        "columns_name": df.columns.name,
+        "dtype": values.dtype.str,
+        "shape": list(values.shape),
+    }
+    with open(os.path.join(path, META_FILE), 'w') as f:
+        json.dump(meta, f)
+
+
+def load_panel(path, columns=None, mmap=True):
+    """
+    Opens a panel written by save_panel as a DataFrame (Index=Date, Cols=Tickers).
+
+    With mmap=True the values are memory-mapped read-only and wrapped without
+    copying, so opening is instant regardless of size and pages are only read
+    when touched. Passing `columns` reads just those tickers' columns.
+    """
+    with open(os.path.join(path, META_FILE), 'r') as f:
+        meta = json.load(f)
+
+    values = np.load(os.path.join(path, VALUES_FILE), mmap_mode='r' if mmap else None)
+    dates = np.load(os.path.join(path, DATES_FILE)).view(f"datetime64[{meta.get('date_unit', 'ns')}]")
+    index = pd.DatetimeIndex(dates, name=meta["index_name"])
+    tickers = pd.Index(meta["tickers"], name=meta["columns_name"])
+
+    if columns is not None:
+        positions = tickers.get_indexer(columns)
+        if (positions < 0).any():
+            missing = [c for c, p in zip(columns, positions) if p < 0]
+            raise KeyError(f"Tickers not in panel: {missing}")
+        # Columns are contiguous on disk, so this only touches the selected ones
+        values = np.asfortranarray(values[:, positions])
+        tickers = tickers[positions]
+
+    return pd.DataFrame(values, index=index, columns=tickers, copy=False)
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+# Defaults shared by main.py and dashboard.py
+GROWTH_LOOKBACK = 252  # rows (trading days) between the EPS estimates compared
+MIN_GROWTH = 0.01      # growth below 1% gives no PEG
+PEG_FFILL_LIMIT = 10
+
+
+def _aligned_values(df, index, columns, dtype):
+    """ Values of `df` on (index, columns); no copy when it is already aligned and of `dtype`. Never written to. """
+    if not (df.index.equals(index) and df.columns.equals(columns)):
+        df = df.reindex(index=index, columns=columns)
+    return df.to_numpy(dtype=dtype, copy=False)
+
+
+def ffill_limit_inplace(values, limit=None):
+    """
+    Forward fills NaNs down each column of a 2-D array in place, at most `limit`
+    consecutive cells after a valid one (pandas `ffill(limit=...)` semantics).
+    """
+    n_rows, n_cols = values.shape
+    if n_rows == 0 or n_cols == 0:
+        return values
+    pos_dtype = np.int32 if n_rows < np.iinfo(np.int32).max else np.int64
+    positions = np.arange(n_rows, dtype=pos_dtype)[:, None]
+
+    missing = np.isnan(values)
+    src = np.where(missing, pos_dtype(-1), positions)
+    np.maximum.accumulate(src, axis=0, out=src)
+    missing &= src >= 0
+    if limit is not None:
+        missing &= (positions - src) <= limit
+
+    rows = src[missing]
+    cols = np.broadcast_to(np.arange(n_cols), values.shape)[missing]
+    values[missing] = values[rows, cols]
+    return values
+
+
+def compute_forward_peg(prices, eps, lookback=GROWTH_LOOKBACK, min_growth=MIN_GROWTH, ffill_limit=PEG_FFILL_LIMIT,
+                        dtype=np.float64, return_intermediates=False):
+    """
+    Forward PEG panel from daily prices and forward (annualized) EPS estimates.
+
+        Forward PE = Price / EPS
+        Growth     = EPS_t / EPS_{t-lookback} - 1, kept only where finite and >= min_growth
+        PEG        = Forward PE / (Growth * 100), forward filled up to `ffill_limit` rows
+
+    Both frames are aligned on their common dates and the union of their
+    tickers, exactly as the pandas arithmetic this replaces. The work is done on
+    NumPy arrays of `dtype` (float32 halves memory) with two output-sized
+    buffers. With `return_intermediates`, returns (peg, forward_pe, growth)
+    instead of peg alone; those cost two extra buffers.
+    """
+    index = prices.index.intersection(eps.index)
+    columns = prices.columns if prices.columns.equals(eps.columns) else prices.columns.union(eps.columns)
+    p = _aligned_values(prices, index, columns, dtype)
+    e = _aligned_values(eps, index, columns, dtype)
+    n_rows = len(index)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        peg = np.divide(p, e, dtype=dtype)
+        forward_pe = peg.copy() if return_intermediates else None
+
+        growth = np.empty_like(peg)
+        growth[:min(lookback, n_rows)] = np.nan
+        if lookback < n_rows:
+            np.divide(e[lookback:], e[:n_rows - lookback], out=growth[lookback:])
+        growth -= 1
+
+        usable = np.isfinite(growth)
+        usable &= growth >= min_growth
+        if return_intermediates:
+            growth[~usable] = np.nan
+            scaled = growth * 100
+        else:
+            scaled = np.multiply(growth, 100, out=growth)
+        np.divide(peg, scaled, out=peg, where=usable)
+        peg[~usable] = np.nan
+    del p, e, scaled, usable
+
+    ffill_limit_inplace(peg, ffill_limit)
+
+    peg = pd.DataFrame(peg, index=index, columns=columns, copy=False)
+    if not return_intermediates:
+        return peg
+    return (
+        peg,
+        pd.DataFrame(forward_pe, index=index, columns=columns, copy=False),
+        pd.DataFrame(growth, index=index, columns=columns, copy=False),
+    )
@@ -0,0 +1,81 @@
+import logging
+import os
+import re
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+class PriceStore:
+    """
+    Per-ticker on-disk store of daily adjusted closes.
+
+    Layout: one .npz per ticker under `store_dir` holding the bar dates and
+    closes as flat int64/float64 columns, plus the [start, end) date range
+    that has been requested from the source so far ("coverage"). Coverage is
+    tracked separately from the bars so that weekends, holidays and dates
+    before an IPO are not fetched again on every run.
+    """
+
+    def __init__(self, store_dir):
+        self.logger = logging.getLogger(__name__)
+        self.store_dir = store_dir
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def _path(self, ticker):
+        safe = re.sub(r'[^A-Za-z0-9._-]', '_', ticker)
+        return os.path.join(self.store_dir, f"{safe}.npz")
+
+    def load(self, ticker):
+        """
+        Returns (closes, coverage_start, coverage_end) or (None, None, None) if not stored.
+        """
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None, None, None
+        try:
+            with np.load(path) as f:
+                dates = pd.DatetimeIndex(f['dates'].astype('datetime64[ns]'), name='Date')
+                closes = pd.Series(f['close'], index=dates, name=ticker)
+                coverage = pd.to_datetime(f['coverage'].astype('datetime64[ns]'))
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"Ignoring unreadable price cache entry {path}: {e}")
+            return None, None, None
+        return closes, coverage[0], coverage[1]
+
+    def save(self, ticker, closes, coverage_start, coverage_end):
+        """ Atomically writes one ticker's bars and coverage. """
+        closes = closes.dropna().sort_index()
+        fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    dates=closes.index.values.astype('datetime64[ns]').astype(np.int64),
+                    close=closes.to_numpy(dtype=np.float64),
+                    coverage=np.array([pd.Timestamp(coverage_start).value, pd.Timestamp(coverage_end).value]),
+                )
+            os.replace(tmp_path, self._path(ticker))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def missing_ranges(coverage_start, coverage_end, last_bar, start, end):
+        """
+        Half-open [start, end) ranges that still need fetching for a request of [start, end).
+
+        The tail range starts at the last stored bar rather than at coverage_end, so the
+        overlapping bar can be compared to detect a dividend/split re-adjustment.
+        """
+        if coverage_start is None:
+            return [('full', start, end)]
+        ranges = []
+        if start < coverage_start:
+            ranges.append(('head', start, coverage_start))
+        if end > coverage_end:
+            tail_start = last_bar if last_bar is not None and last_bar < coverage_end else coverage_end
+            ranges.append(('tail', tail_start, end))
+        return ranges
@@ -0,0 +1,192 @@
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DataProvider
+
+
+class DataArchive:
+    """
+    Compact zip archive of provider responses.
+
+        prices/<TICKER>.npz     every recorded close of one ticker (dates, values)
+        earnings/<TICKER>.json  one AV quarterlyEarnings payload
+
+    Recorded price frames are merged by ticker and date, so recording the same
+    data again adds nothing and the archive grows only with new bars.
+    """
+
+    def __init__(self):
+        self.prices = {}
+        self.earnings = {}
+
+    def add_prices(self, frame):
+        """ Merges a Date x Ticker frame into the per-ticker series. Returns True if anything was new. """
+        changed = False
+        for ticker in frame.columns:
+            series = frame[ticker].dropna()
+            if series.empty:
+                continue
+            series.index = pd.DatetimeIndex(series.index, name='Date').as_unit('ns')
+            old = self.prices.get(str(ticker))
+            if old is not None:
+                # Bars already recorded win; only new dates are added
+                if series.index.difference(old.index).empty:
+                    continue
+                series = old.combine_first(series)
+            self.prices[str(ticker)] = series.rename(str(ticker))
+            changed = True
+        return changed
+
+    @classmethod
+    def load(cls, path):
+        archive = cls()
+        with zipfile.ZipFile(path, 'r') as zf:
+            for name in sorted(zf.namelist()):
+                if name.startswith('prices/'):
+                    with np.load(io.BytesIO(zf.read(name)), allow_pickle=False) as f:
+                        index = pd.DatetimeIndex(f['dates'].view('datetime64[ns]'), name='Date')
+                        if 'tickers' in f:
+                            # Older archives stored one file per recorded frame
+                            columns = [str(t) for t in f['tickers']]
+                        else:
+                            columns = [name[len('prices/'):-len('.npz')]]
+                        values = f['values'].reshape(len(index), len(columns))
+                    archive.add_prices(pd.DataFrame(values, index=index, columns=columns))
+                elif name.startswith('earnings/'):
+                    ticker = name[len('earnings/'):-len('.json')]
+                    archive.earnings[ticker] = json.loads(zf.read(name))
+        return archive
+
+    def save(self, path):
+        """ Writes the whole archive atomically. """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f, zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED) as zf:
+                for ticker, series in self.prices.items():
+                    buf = io.BytesIO()
+                    np.savez(
+                        buf,
+                        dates=series.index.values.astype(np.int64),
+                        values=series.to_numpy(dtype=np.float64),
+                    )
+                    zf.writestr(f'prices/{ticker}.npz', buf.getvalue())
+                for ticker, payload in self.earnings.items():
+                    zf.writestr(f'earnings/{ticker}.json', json.dumps(payload))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class RecordingDataProvider(DataProvider):
+    """
+    DataProvider that behaves normally but captures every price frame and
+    earnings payload it serves into `archive_path` (rewritten only when a call adds data).
+    """
+
+    def __init__(self, archive_path, **kwargs):
+        super().__init__(**kwargs)
+        self.archive_path = archive_path
+        self.archive = DataArchive.load(archive_path) if os.path.exists(archive_path) else DataArchive()
+        # Prices and earnings may be loaded from different threads
+        self._archive_lock = threading.Lock()
+
+    def fetch_price_history(self, tickers, start_date, end_date):
+        data = super().fetch_price_history(tickers, start_date, end_date)
+        if not data.empty:
+            with self._archive_lock:
+                if self.archive.add_prices(data):
+                    self.archive.save(self.archive_path)
+        return data
+
+    def _load_earnings(self, tickers, progress=None):
+        earnings = super()._load_earnings(tickers, progress=progress)
+        with self._archive_lock:
+            new = {t: e for t, e in earnings.items() if self.archive.earnings.get(t) != e}
+            if new:
+                self.archive.earnings.update(new)
+                self.archive.save(self.archive_path)
+        return earnings
+
+
+class ReplayDataProvider(DataProvider):
+    """
+    Network-free DataProvider serving responses recorded by RecordingDataProvider.
+
+    Price requests are answered from the union of all recorded frames, so any
+    ticker/date range inside what was recorded can be replayed, not only the
+    exact original calls.
+    """
+
+    def __init__(self, archive_path, **kwargs):
+        kwargs['api_key'] = None
+        super().__init__(**kwargs)
+        self.logger = logging.getLogger(__name__)
+        self.archive = DataArchive.load(archive_path)
+        self._prices = self.archive.prices
+        self.logger.info(
+            f"Replaying {len(self._prices)} price series and {len(self.archive.earnings)} earnings payloads from {archive_path}"
+        )
+
+    def fetch_price_history(self, tickers, start_date, end_date):
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date)
+        columns = {}
+        for ticker in sorted(tickers):
+            if ticker not in self._prices:
+                self.logger.warning(f"No recorded prices for {ticker}")
+                continue
+            series = self._prices[ticker]
+            columns[ticker] = series[(series.index >= start) & (series.index < end)]
+        if not columns:
+            return pd.DataFrame()
+        data = pd.DataFrame(columns)
+        data.index.name = 'Date'
+        return data.ffill(limit=3)
+
+    def _load_earnings(self, tickers, progress=None):
+        earnings = {}
+        for ticker in tickers:
+            if ticker in self.archive.earnings:
+                earnings[ticker] = self.archive.earnings[ticker]
+                status = "cached"
+            else:
+                self.logger.warning(f"No recorded earnings for {ticker}")
+                status = "missing"
+            if progress:
+                progress(ticker, status)
+        return earnings
+
+    def _download_prices(self, tickers, start_date, end_date):
+        raise RuntimeError("ReplayDataProvider never downloads")
+
+    def _fetch_av_earnings(self, tickers):
+        raise RuntimeError("ReplayDataProvider never downloads")
+
+
+def make_data_provider(api_key=None, record=None, replay=None, worker_url=None, **kwargs):
+    """
+    Returns a live, recording or replaying DataProvider depending on which archive path is set.
+    With worker_url, live data comes from the earnings-worker instead of Yahoo/Alpha Vantage;
+    worker responses are not recorded, so combining it with `record` is an error.
+    """
+    if worker_url and record:
+        raise ValueError("Recording is not supported with worker_url; drop one of record or worker_url")
+    if replay:
+        return ReplayDataProvider(replay, **kwargs)
+    if worker_url:
+        from worker_client import WorkerDataProvider
+        return WorkerDataProvider(worker_url, **kwargs)
+    if record:
+        return RecordingDataProvider(record, api_key=api_key, **kwargs)
+    return DataProvider(api_key=api_key, **kwargs)
@@ -0,0 +1,118 @@
+"""
+Rolling risk/return statistics for many series at once.
+
+Windowed sums come from prefix sums (each step adds one row and drops one),
+and windowed maxima from the van Herk/Gil-Werman block scan, the vectorized
+equivalent of a monotonic deque: O(1) amortized per step for every column of
+a (days, series) array, with no Python-level loop over days.
+"""
+import numpy as np
+import pandas as pd
+
+ROLLING_WINDOWS = [63, 126, 252]
+
+
+def rolling_sum(values, window):
+    """ Trailing `window`-row sums down each column; the first window-1 rows are NaN. """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if window > len(values):
+        return out
+    prefix = np.zeros((len(values) + 1,) + values.shape[1:])
+    np.cumsum(values, axis=0, out=prefix[1:])
+    out[window - 1:] = prefix[window:] - prefix[:-window]
+    return out
+
+
+def rolling_max(values, window):
+    """
+    Trailing `window`-row maxima down each column (NaNs ignored); the first window-1 rows are NaN.
+
+    Van Herk/Gil-Werman: split rows into blocks of `window`; a window ending at t
+    covers the tail of one block and the head of the next, so its max is
+    max(suffix max at t-window+1, prefix max at t).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    out = np.full(values.shape, np.nan)
+    if window > n:
+        return out
+    n_blocks = -(-n // window)
+    padded = np.full((n_blocks * window,) + values.shape[1:], -np.inf)
+    padded[:n] = values
+    blocks = padded.reshape((n_blocks, window) + values.shape[1:])
+    prefix = np.fmax.accumulate(blocks, axis=1).reshape(padded.shape)
+    suffix = np.fmax.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(padded.shape)
+
+    ends = np.arange(window - 1, n)
+    out[window - 1:] = np.fmax(suffix[ends - window + 1], prefix[ends])
+    out[np.isneginf(out)] = np.nan
+    return out
+
+
+def rolling_metrics(returns, window, equity=None, benchmark_returns=None):
+    """
+    Rolling annualized Sharpe and volatility, drawdown from the trailing-window
+    peak and (with a benchmark) beta, for every column of `returns`.
+
+    Args:
+        returns (pd.DataFrame): Date x Series daily returns.
+        window (int): Trailing window in rows (e.g. 63, 126, 252).
+        equity (pd.DataFrame): Values/prices for the drawdown; defaults to cumprod(1 + returns).
+        benchmark_returns (pd.Series): Benchmark daily returns for beta.
+
+    Returns:
+        dict of pd.DataFrame: 'sharpe', 'volatility', 'drawdown' and, with a benchmark, 'beta'.
+        Windows containing a NaN return are NaN (pandas rolling with min_periods=window).
+    """
+    index, columns = returns.index, returns.columns
+    r = returns.to_numpy(dtype=np.float64)
+    valid = ~np.isnan(r)
+    # Centre each column before summing squares so long histories keep their precision
+    centre = np.nanmean(r, axis=0) if valid.any() else np.zeros(r.shape[1])
+    x = np.where(valid, r - centre, 0.0)
+
+    full = rolling_sum(valid, window) == window
+    s1 = rolling_sum(x, window)
+    s2 = rolling_sum(x * x, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = s1 / window
+        var = np.maximum(s2 - s1 * mean, 0.0) / (window - 1)
+        std = np.sqrt(var)
+        sharpe = np.where(std > 0, (mean + centre) * 252 / (std * np.sqrt(252)), 0.0)
+    sharpe[~full] = np.nan
+    volatility = np.where(full, std * np.sqrt(252), np.nan)
+
+    if equity is None:
+        eq = np.cumprod(1 + np.where(valid, r, 0.0), axis=0)
+    else:
+        eq = equity.reindex(index=index, columns=columns).to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = eq / rolling_max(eq, window) - 1
+
+    out = {
+        'sharpe': pd.DataFrame(sharpe, index=index, columns=columns),
+        'volatility': pd.DataFrame(volatility, index=index, columns=columns),
+        'drawdown': pd.DataFrame(drawdown, index=index, columns=columns),
+    }
+
+    if benchmark_returns is not None:
+        b = benchmark_returns.reindex(index).to_numpy(dtype=np.float64)
+        b_valid = ~np.isnan(b)
+        both = valid & b_valid[:, None]
+        b_centre = np.nanmean(b) if b_valid.any() else 0.0
+        y = np.where(b_valid, b - b_centre, 0.0)[:, None]
+        xb = np.where(both, x, 0.0)
+        full_b = rolling_sum(both, window) == window
+        sy = rolling_sum(y, window)
+        syy = rolling_sum(y * y, window)
+        sxy = rolling_sum(xb * y, window)
+        sx = rolling_sum(xb, window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = sxy - sx * sy / window
+            var_b = syy - sy * sy / window
+            beta = np.where(var_b > 0, cov / var_b, np.nan)
+        beta[~full_b] = np.nan
+        out['beta'] = pd.DataFrame(beta, index=index, columns=columns)
+
+    return out
@@ -1,11 +1,145 @@
 import pandas as pd
 import numpy as np
 
+
+class RebalanceSchedule:
+    """
+    Sparse target weights: only the rebalance events, each a set of
+    (ticker index, weight) pairs, over a full daily `index`. Between events the
+    last event's weights stand; before the first event nothing is held.
+
+    Events are stored CSR-style: event k holds tickers
+    `ticker_idx[offsets[k]:offsets[k+1]]` (positions in `columns`) with the
+    matching `weights`, effective from row `positions[k]` of `index`.
+    """
+
+    def __init__(self, index, columns, positions, offsets, ticker_idx, weights):
+        self.index = pd.DatetimeIndex(index)
+        self.columns = pd.Index(columns)
+        self.positions = np.asarray(positions, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.ticker_idx = np.asarray(ticker_idx, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+
+    @classmethod
+    def from_dense_events(cls, index, columns, positions, targets):
+        """ Builds a schedule from one dense row of targets per event. """
+        rows, cols = np.nonzero(targets)
+        offsets = np.zeros(len(positions) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(positions)), out=offsets[1:])
+        return cls(index, columns, positions, offsets, cols, targets[rows, cols])
+
+    @classmethod
+    def from_weights(cls, weights):
+        """ Builds a schedule from a dense Date x Ticker weights frame: one event per row where weights change. """
+        values = weights.to_numpy(dtype=np.float64)
+        values = np.where(np.isnan(values), 0.0, values)
+        changed = np.ones(len(values), dtype=bool)
+        changed[1:] = (values[1:] != values[:-1]).any(axis=1)
+        changed[0] = values[:1].any()
+        positions = np.flatnonzero(changed)
+        return cls.from_dense_events(weights.index, weights.columns, positions, values[positions])
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def dates(self):
+        """ Dates on which each event takes effect. """
+        return self.index[self.positions]
+
+    def events(self):
+        """ Yields (date, tickers, weights) per rebalance event. """
+        for k, date in enumerate(self.dates):
+            span = slice(self.offsets[k], self.offsets[k + 1])
+            yield date, self.columns[self.ticker_idx[span]], self.weights[span]
+
+    def event_at(self, dates):
+        """ Index of the event standing on each of `dates` (as of that day), -1 before the first. """
+        return np.searchsorted(self.dates.values, pd.DatetimeIndex(dates).values, side='right') - 1
+
+    def _dense_rows(self, event_ids):
+        dense = np.zeros((len(event_ids), len(self.columns)))
+        counts = np.diff(self.offsets)
+        held = event_ids >= 0
+        rows = np.repeat(np.flatnonzero(held), counts[event_ids[held]])
+        spans = [np.arange(self.offsets[k], self.offsets[k + 1]) for k in event_ids[held]]
+        entries = np.concatenate(spans) if spans else np.empty(0, dtype=np.int64)
+        dense[rows, self.ticker_idx[entries]] = self.weights[entries]
+        return dense
+
+    def weights_at(self, dates):
+        """ Dense standing weights on `dates` (Index=dates, Cols=Tickers). """
+        dates = pd.DatetimeIndex(dates)
+        return pd.DataFrame(self._dense_rows(self.event_at(dates)), index=dates, columns=self.columns)
+
+    def to_dense(self):
+        """ Full Date x Ticker weights frame, as returned by PegStrategy.generate_signals. """
+        # Each row takes the weights of the latest event at or before it
+        event_ids = np.searchsorted(self.positions, np.arange(len(self.index)), side='right') - 1
+        held = np.vstack([np.zeros((1, len(self.columns))), self._dense_rows(np.arange(len(self)))])
+        return pd.DataFrame(held[event_ids + 1], index=self.index, columns=self.columns)
+
+
 class PegStrategy:
     def __init__(self, top_n=5, rebalance_freq='ME'):
         self.top_n = top_n
         self.rebalance_freq = rebalance_freq # 'ME', 'QE', 'W'
 
+    def _rebalance_positions(self, index):
+        """
+        Row positions at which the loop implementation rebalances: the first row on or
+        after each period end, with at most one period consumed per row, so period
+        ends skipped by a data gap are caught up on the following rows.
+        """
+        rebalance_dates = pd.Series(0, index=index).resample(self.rebalance_freq).last().index
+        first_on_or_after = index.searchsorted(rebalance_dates, side='left')
+        # p_i = max(s_i, p_{i-1} + 1)  <=>  p_i - i = running max of (s_i - i)
+        steps = np.arange(len(first_on_or_after))
+        positions = np.maximum.accumulate(first_on_or_after - steps) + steps
+        return positions[positions < len(index)]
+
+    def select_top_n(self, pegs):
+        """
+        Equal-weight top_n selection for each row of a 2-D PEG array (lowest positive
+        PEG first, ties broken by column order). Uses a partial sort per row, not a
+        full one. Returns (weights, has_selection); rows without any positive PEG are all zero.
+        """
+        n_rows, n_cols = pegs.shape
+        valid = pegs > 0
+        keys = np.where(valid, pegs, np.inf)
+        k = min(self.top_n, n_cols)
+        if k == 0 or n_rows == 0:
+            return np.zeros(pegs.shape), np.zeros(n_rows, dtype=bool)
+
+        # k-th smallest valid PEG per row: everything strictly below it is selected,
+        # the remaining slots go to the leftmost ties at the threshold.
+        threshold = np.partition(keys, k - 1, axis=1)[:, k - 1:k]
+        below = valid & (keys < threshold)
+        at = valid & (keys == threshold)
+        slots = k - below.sum(axis=1, keepdims=True)
+        selected = below | (at & (np.cumsum(at, axis=1) <= slots))
+
+        counts = selected.sum(axis=1)
+        has_selection = counts > 0
+        weights = np.zeros(pegs.shape)
+        rows, cols = np.nonzero(selected)
+        weights[rows, cols] = 1.0 / counts[rows]
+        return weights, has_selection
+
+    def generate_schedule(self, peg_data, prices_dates):
+        """
+        Generates the rebalance events only, as a RebalanceSchedule over peg_data's dates.
+        Same arguments as generate_signals.
+        """
+        positions = self._rebalance_positions(peg_data.index) if len(peg_data) else np.empty(0, dtype=np.int64)
+        pegs = peg_data.to_numpy(dtype=np.float64)[positions]
+        targets, has_selection = self.select_top_n(pegs)
+        # A rebalance without any valid PEG keeps the previous weights
+        return RebalanceSchedule.from_dense_events(
+            peg_data.index, peg_data.columns, positions[has_selection], targets[has_selection]
+        )
+
     def generate_signals(self, peg_data, prices_dates):
         """
         Generates target weights for each asset over time.
@@ -17,6 +151,13 @@ class PegStrategy:
         Returns:
             pd.DataFrame: Target weights (Index=Date, Cols=Tickers)
         """
+        return self.generate_schedule(peg_data, prices_dates).to_dense()
+
+    def _generate_signals_loop(self, peg_data, prices_dates):
+        """
+        Reference row-by-row implementation of generate_signals, kept for parity tests
+        and benchmarks.
+        """
         # Resample logic to find rebalance dates
         # We want to rebalance at the END of each period
         rebalance_dates = peg_data.resample(self.rebalance_freq).last().index
@@ -0,0 +1,181 @@
+"""
+Parameter sweep over top_n, rebalance frequency and the PEG growth floor.
+
+The price panel and one PEG panel per growth floor are computed once and
+placed in shared memory; worker processes attach to them read-only, so tasks
+only carry their parameters. Run main.py once first to write the panels:
+
+    python sweep.py --top_n 3 5 10 20 --freq W ME QE --min_growth 0 0.01 0.05 0.1
+"""
+import argparse
+import itertools
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtester import Backtester
+from metrics import Metrics
+from panel_io import load_panel
+from peg_factor import MIN_GROWTH, compute_forward_peg
+from strategy import PegStrategy
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_GRID = {
+    'top_n': [5],
+    'rebalance_freq': ['ME'],
+    'min_growth': [MIN_GROWTH],
+}
+
+
+class SharedPanels:
+    """
+    Copies named arrays into POSIX/Windows shared memory once. `spec` is the small
+    picklable description workers use to attach (see attach_shared).
+    """
+
+    def __init__(self, arrays):
+        self._blocks = []
+        self.spec = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+            self._blocks.append(shm)
+            self.spec[name] = (shm.name, array.shape, array.dtype.str)
+
+    def close(self):
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_shared(spec):
+    """ Returns ({name: read-only array}, handles). Keep the handles alive while the arrays are used. """
+    arrays = {}
+    handles = []
+    for name, (shm_name, shape, dtype) in spec.items():
+        # Pool workers share the parent's resource tracker, so the parent's unlink is the only cleanup
+        shm = shared_memory.SharedMemory(name=shm_name)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        array.flags.writeable = False
+        arrays[name] = array
+        handles.append(shm)
+    return arrays, handles
+
+
+# Per-process state set by _init_worker
+_panels = {}
+
+
+def _install_panels(arrays, handles, index, columns, growth_floors, initial_capital):
+    _panels.update(
+        handles=handles,
+        prices=pd.DataFrame(arrays['prices'], index=index, columns=columns, copy=False),
+        pegs={g: pd.DataFrame(arrays['pegs'][i], index=index, columns=columns, copy=False)
+              for i, g in enumerate(growth_floors)},
+        backtester=Backtester(initial_capital=initial_capital),
+    )
+
+
+def _init_worker(spec, *panel_args):
+    arrays, handles = attach_shared(spec)
+    _install_panels(arrays, handles, *panel_args)
+
+
+def _run_combo(params):
+    """ PegStrategy + Backtester + Metrics for one grid point. Returns one tidy result row. """
+    prices = _panels['prices']
+    peg = _panels['pegs'][params['min_growth']]
+
+    schedule = PegStrategy(top_n=params['top_n'], rebalance_freq=params['rebalance_freq']).generate_schedule(peg, prices.index)
+    results = _panels['backtester'].run_backtest(prices, schedule)
+    return {
+        **params,
+        **Metrics.get_summary_values(results['Daily_Return'], results['Portfolio_Value']),
+        'rebalances': len(schedule),
+    }
+
+
+def expand_grid(grid):
+    """ Every combination of the grid's values, in grid order, as parameter dicts. """
+    grid = {**DEFAULT_GRID, **grid}
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def run_sweep(prices, eps, grid, max_workers=None, initial_capital=100000.0):
+    """
+    Backtests every combination of `grid` ({'top_n': [...], 'rebalance_freq': [...],
+    'min_growth': [...]}; missing keys use DEFAULT_GRID) and returns one row per
+    combination with its parameters and numeric performance metrics.
+
+    With max_workers=1 everything runs in this process, without shared memory.
+    """
+    combos = expand_grid(grid)
+    growth_floors = sorted({c['min_growth'] for c in combos})
+
+    # Panels computed once: prices aligned to the PEG dates, one PEG panel per growth floor
+    pegs = [compute_forward_peg(prices, eps, min_growth=g) for g in growth_floors]
+    index, columns = pegs[0].index, pegs[0].columns
+    price_values = prices.reindex(index=index, columns=columns).to_numpy(dtype=np.float64)
+    peg_values = np.stack([p.to_numpy(dtype=np.float64) for p in pegs])
+    del pegs
+
+    max_workers = max_workers or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    logger.info(f"Sweeping {len(combos)} combinations on a {len(index)} x {len(columns)} panel with {max_workers} workers")
+
+    panel_args = (index, columns, growth_floors, initial_capital)
+    if max_workers == 1:
+        _install_panels({'prices': price_values, 'pegs': peg_values}, [], *panel_args)
+        try:
+            rows = [_run_combo(c) for c in combos]
+        finally:
+            _panels.clear()
+    else:
+        with SharedPanels({'prices': price_values, 'pegs': peg_values}) as shared:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(shared.spec, *panel_args)) as pool:
+                chunksize = max(1, len(combos) // (max_workers * 4))
+                rows = list(pool.map(_run_combo, combos, chunksize=chunksize))
+
+    logger.info(f"Sweep finished in {time.perf_counter() - t0:.1f}s")
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parameter sweep for the Forward PEG strategy')
+    parser.add_argument('--panel_dir', type=str, default='panels', help='Panels written by main.py (prices, eps_estimates)')
+    parser.add_argument('--top_n', type=int, nargs='+', default=DEFAULT_GRID['top_n'])
+    parser.add_argument('--freq', type=str, nargs='+', default=DEFAULT_GRID['rebalance_freq'], help="Rebalance frequencies, e.g. W ME QE")
+    parser.add_argument('--min_growth', type=float, nargs='+', default=DEFAULT_GRID['min_growth'], help='EPS growth floors for a valid PEG')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--out', type=str, default='sweep_results.csv')
+    args = parser.parse_args()
+
+    prices = load_panel(os.path.join(args.panel_dir, "prices"))
+    eps = load_panel(os.path.join(args.panel_dir, "eps_estimates"))
+    grid = {'top_n': args.top_n, 'rebalance_freq': args.freq, 'min_growth': args.min_growth}
+
+    results = run_sweep(prices, eps, grid, max_workers=args.workers)
+    results.to_csv(args.out, index=False)
+    logger.info(f"Results saved to {args.out}")
+    print(results.sort_values('sharpe', ascending=False).head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
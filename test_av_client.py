@@ -0,0 +1,90 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from av_client import AlphaVantageClient, TokenBucket
+from fetch_historical_forecasts import process_earnings_history
+
+
+class _StubAV(BaseHTTPRequestHandler):
+    calls = []
+    lock = threading.Lock()
+
+    def do_GET(self):
+        symbol = parse_qs(urlparse(self.path).query)["symbol"][0]
+        with self.lock:
+            self.calls.append(symbol)
+            attempt = self.calls.count(symbol)
+
+        status, body = 200, {
+            "symbol": symbol,
+            "quarterlyEarnings": [
+                {"fiscalDateEnding": "2024-03-31", "estimatedEPS": "1.5", "reportedEPS": "1.6"},
+            ],
+        }
+        if symbol == "NOTE" and attempt == 1:
+            body = {"Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute."}
+        elif symbol == "BUSY" and attempt == 1:
+            status, body = 429, {}
+        elif symbol == "BAD":
+            body = {"Error Message": "Invalid API call."}
+
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    _StubAV.calls = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubAV)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/query"
+    server.shutdown()
+    server.server_close()
+
+
+def _client(url):
+    return AlphaVantageClient("test", requests_per_minute=6000, burst=10, max_workers=4,
+                              backoff_seconds=0.01, base_url=url)
+
+
+def test_fetch_many_retries_throttled_responses(stub_url):
+    results = dict(_client(stub_url).fetch_earnings_many(["AAPL", "NOTE", "BUSY", "BAD"]))
+
+    assert set(results) == {"AAPL", "NOTE", "BUSY", "BAD"}
+    assert results["NOTE"][0]["estimatedEPS"] == "1.5"
+    assert results["BUSY"][0]["estimatedEPS"] == "1.5"
+    assert results["BAD"] == []
+    assert sorted(_StubAV.calls) == ["AAPL", "BAD", "BUSY", "BUSY", "NOTE", "NOTE"]
+
+
+def test_process_earnings_history_uses_client(stub_url):
+    df = process_earnings_history(["MSFT", "AAPL"], "test", years=100, client=_client(stub_url))
+
+    assert df["Ticker"].tolist() == ["AAPL", "MSFT"]
+    assert df["Estimated_EPS"].tolist() == [1.5, 1.5]
+
+
+def test_token_bucket_spaces_calls_at_quota():
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    bucket = TokenBucket(rate_per_minute=5, burst=1, clock=lambda: now[0], sleep=sleep)
+    for _ in range(5):
+        bucket.acquire()
+
+    # First call is immediate, the remaining four are 12s apart
+    assert now[0] == pytest.approx(48.0)
@@ -0,0 +1,103 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from backfill_earnings import AdaptivePacer, Journal, backfill
+
+
+class _StubWorker(BaseHTTPRequestHandler):
+    updates = []
+    throttle_once = set()
+    refreshed = []
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path == '/api/refresh-batch':
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            _StubWorker.refreshed.extend(body['symbols'])
+            self._reply(200, {"updatedCount": len(body['symbols']), "failedCount": 0})
+            return
+        symbol = parse_qs(url.query)['symbol'][0]
+        _StubWorker.updates.append(symbol)
+        if symbol in _StubWorker.throttle_once:
+            _StubWorker.throttle_once.discard(symbol)
+            self._reply(429, {"error": "slow down"})
+        elif symbol == 'BAD':
+            self._reply(400, {"error": "unknown symbol"})
+        else:
+            self._reply(200, {"message": "ok", "count": 4})
+
+    def _reply(self, code, body):
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def worker_url():
+    _StubWorker.updates = []
+    _StubWorker.refreshed = []
+    _StubWorker.throttle_once = {'MSFT'}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubWorker)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_backfill_retries_throttled_and_resumes(worker_url, tmp_path):
+    journal = str(tmp_path / "journal.jsonl")
+    entries = backfill(worker_url, delay=0.01, concurrency=3, journal_path=journal, tickers=['AAPL', 'MSFT', 'BAD'])
+
+    status = {e['symbol']: e['status'] for e in entries}
+    assert status == {'AAPL': 'ok', 'MSFT': 'ok', 'BAD': 'failed'}
+    assert _StubWorker.updates.count('MSFT') == 2
+    assert sorted(_StubWorker.refreshed) == ['AAPL', 'MSFT']
+
+    # An interrupted run (journal left behind) resumes with what did not succeed
+    Journal(journal).append({'symbol': 'AAPL', 'status': 'ok'})
+    Journal(journal).append({'symbol': 'MSFT', 'status': 'failed'})
+    _StubWorker.updates = []
+    backfill(worker_url, delay=0.01, journal_path=journal, quotes=False, tickers=['AAPL', 'MSFT', 'BAD'])
+    assert sorted(_StubWorker.updates) == ['BAD', 'MSFT']
+
+
+def test_pacer_backs_off_and_recovers():
+    pacer = AdaptivePacer(1.0, min_delay=0.5)
+    pacer.record(429, 0.1, retry_after=5)
+    assert pacer.delay == 5
+    pacer.record(200, 20.0)
+    assert pacer.delay == 10
+    for _ in range(50):
+        pacer.record(200, 0.1)
+    assert pacer.delay == 0.5
+
+
+def test_completed_run_clears_journal(worker_url, tmp_path):
+    journal = tmp_path / "journal.jsonl"
+    backfill(worker_url, delay=0.01, journal_path=str(journal), quotes=False, tickers=['AAPL', 'MSFT'])
+    assert not journal.exists()
+
+    # The next scheduled refresh updates every ticker again
+    _StubWorker.updates = []
+    backfill(worker_url, delay=0.01, journal_path=str(journal), quotes=False, tickers=['AAPL', 'MSFT'])
+    assert sorted(_StubWorker.updates) == ['AAPL', 'MSFT']
+
+
+def test_failing_ticker_does_not_pin_the_journal(worker_url, tmp_path):
+    journal = tmp_path / "journal.jsonl"
+    for _ in range(2):
+        _StubWorker.updates = []
+        backfill(worker_url, delay=0.01, journal_path=str(journal), quotes=False, tickers=['AAPL', 'MSFT', 'BAD'])
+        # Every scheduled run refreshes all tickers, although BAD always fails
+        assert sorted(set(_StubWorker.updates)) == ['AAPL', 'BAD', 'MSFT']
+        assert not journal.exists()
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtester import Backtester, DriftBacktester
+from strategy import PegStrategy
+
+
+def test_schedule_matches_dense_weights():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2021-01-01", periods=300)
+    tickers = [f"T{i:02d}" for i in range(20)]
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (300, 20)), axis=0)), index=dates, columns=tickers)
+    prices.iloc[rng.random(prices.shape) < 0.05] = np.nan
+    # PEG panel covers an extra ticker without prices and starts before the prices
+    peg_dates = pd.bdate_range("2020-12-01", dates[-1])
+    peg = pd.DataFrame(rng.lognormal(0, 0.5, (len(peg_dates), 21)), index=peg_dates, columns=tickers + ["NOPX"])
+
+    strategy = PegStrategy(top_n=5)
+    bt = Backtester()
+    dense = bt.run_backtest(prices, strategy.generate_signals(peg, prices.index))
+    sparse = bt.run_backtest(prices, strategy.generate_schedule(peg, prices.index))
+
+    pd.testing.assert_frame_equal(sparse, dense, check_freq=False, rtol=1e-12)
+    assert dense['Daily_Return'].abs().sum() > 0
+
+
+def _two_assets():
+    dates = pd.bdate_range("2022-01-03", periods=60)
+    prices = pd.DataFrame({
+        "A": np.linspace(100, 160, 60),
+        "B": np.linspace(50, 40, 60),
+    }, index=dates)
+    return dates, prices
+
+
+def test_drift_buy_and_hold_matches_constant_weight_single_asset():
+    dates, prices = _two_assets()
+    weights = pd.DataFrame(1.0, index=dates, columns=["A"])
+
+    dense = Backtester().run_backtest(prices[["A"]], weights)
+    drift = DriftBacktester().run_backtest(prices[["A"]], weights)
+
+    pd.testing.assert_series_equal(drift['Portfolio_Value'], dense['Portfolio_Value'], check_freq=False, rtol=1e-12)
+    assert drift['Turnover'].iloc[0] == 1.0 and drift['Turnover'].iloc[1:].sum() == 0
+
+
+def test_positions_drift_between_events_and_pay_costs():
+    dates, prices = _two_assets()
+    weights = pd.DataFrame(0.0, index=dates, columns=["A", "B"])
+    weights.iloc[10:] = 0.5
+    weights.iloc[40:] = [1.0, 0.0]
+
+    drift = DriftBacktester(initial_capital=1000.0).run_backtest(prices, weights)
+
+    # Untouched cash before the first event, then 50/50 held as shares (drifting, not rebalanced)
+    assert (drift['Portfolio_Value'].iloc[:10] == 1000.0).all()
+    expected = 500 * prices["A"] / prices["A"].iloc[10] + 500 * prices["B"] / prices["B"].iloc[10]
+    np.testing.assert_allclose(drift['Portfolio_Value'].iloc[10:40], expected.iloc[10:40], rtol=1e-12)
+    # The second event sells all of B and tops up A: turnover = 2 * B's drifted value / portfolio value
+    value = expected.iloc[40]
+    assert drift['Turnover'].iloc[40] == pytest.approx(2 * (500 * prices["B"].iloc[40] / prices["B"].iloc[10]) / value)
+
+    costly = DriftBacktester(initial_capital=1000.0, commission_per_trade=1.0, slippage_bps=10).run_backtest(prices, weights)
+    assert costly['Costs'].iloc[10] == pytest.approx(2 * 1.0 + 1000 * 0.001, rel=1e-2)
+    assert (costly['Portfolio_Value'] < drift['Portfolio_Value'] + 1e-9).all()
+    assert costly['Portfolio_Value'].iloc[-1] < drift['Portfolio_Value'].iloc[-1]
+
+
+def test_batch_matches_individual_runs():
+    rng = np.random.default_rng(2)
+    dates = pd.bdate_range("2021-01-01", periods=250)
+    tickers = [f"T{i:02d}" for i in range(12)]
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (250, 12)), axis=0)), index=dates, columns=tickers)
+    prices.iloc[rng.random(prices.shape) < 0.05] = np.nan
+    peg = pd.DataFrame(rng.lognormal(0, 0.5, (250, 12)), index=dates, columns=tickers)
+
+    strategies = {
+        "top3": PegStrategy(top_n=3).generate_schedule(peg, dates),
+        "top6_q": PegStrategy(top_n=6, rebalance_freq='QE').generate_signals(peg, dates),
+        "bench": pd.DataFrame(1.0, index=dates, columns=["T00"]),
+    }
+    bt = Backtester()
+    batch = bt.run_batch(prices, strategies)
+
+    assert list(batch.columns.get_level_values(0).unique()) == list(strategies)
+    for name, weights in strategies.items():
+        single = bt.run_backtest(prices, weights)
+        pd.testing.assert_frame_equal(batch[name], single, check_freq=False, check_names=False, rtol=1e-12)
+
+    # Raw (K, days, assets) stacks aligned to prices
+    stack = np.stack([strategies["top6_q"].to_numpy(), np.full(prices.shape, 1 / 12)])
+    raw = bt.run_batch(prices, stack, names=["top6_q", "equal"])
+    pd.testing.assert_frame_equal(raw["top6_q"], batch["top6_q"], check_names=False)
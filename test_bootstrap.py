@@ -0,0 +1,54 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bootstrap import bootstrap_metrics, path_metrics, stationary_bootstrap_indices
+from metrics import Metrics
+
+
+def _returns(seed=0, n_days=1260, drift=0.0005):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2019-01-01", periods=n_days)
+    return pd.Series(rng.normal(drift, 0.015, n_days), index=index)
+
+
+def test_path_metrics_match_metrics():
+    returns = _returns()
+    equity = (1 + returns).cumprod() * 10000
+    years = (returns.index[-1] - returns.index[0]).days / 365.25
+
+    fast = path_metrics(np.stack([returns.to_numpy()] * 2), years)
+    expected = Metrics.get_summary_values(returns, equity)
+    for name, value in expected.items():
+        assert fast[name] == pytest.approx([value, value], rel=1e-9), name
+
+
+def test_indices_follow_blocks():
+    idx = stationary_bootstrap_indices(500, 200, mean_block=25, rng=1)
+    assert idx.shape == (200, 500) and idx.min() >= 0 and idx.max() < 500
+    continues = (idx[:, 1:] == (idx[:, :-1] + 1) % 500).mean()
+    assert 0.93 < continues < 0.99  # ~1 - 1/25
+
+
+def test_intervals_and_active_return_p_value():
+    strategy = _returns(seed=1, drift=0.002)
+    benchmark = _returns(seed=2, drift=0.0)
+
+    t0 = time.perf_counter()
+    table, p_value = bootstrap_metrics(strategy, benchmark, n_paths=10000, seed=7)
+    elapsed = time.perf_counter() - t0
+
+    assert list(table.columns) == ["estimate", "mean", "low", "high"]
+    assert (table["low"] <= table["high"]).all()
+    assert table.loc["sharpe", "low"] < table.loc["sharpe", "estimate"] < table.loc["sharpe", "high"]
+    assert p_value < 0.01
+    assert elapsed < 10
+
+    # Same seed, same answer; a chunked multi-process run draws the same paths
+    again, _ = bootstrap_metrics(strategy, benchmark, n_paths=10000, seed=7, max_workers=2)
+    pd.testing.assert_frame_equal(table, again)
+
+    _, p_null = bootstrap_metrics(benchmark, benchmark * 1.0001 + 0.00001, n_paths=2000, seed=3)
+    assert p_null > 0.5
@@ -6,10 +6,11 @@ import sys
 # Ensure d:/AntigravityProjects/forward_peg_system is in path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from data_loader import DataProvider
+from replay_provider import make_data_provider
 from strategy import PegStrategy
 from backtester import Backtester
 from metrics import Metrics
+from peg_factor import compute_forward_peg
 from dotenv import load_dotenv
 
 # Load env variables (API Key)
@@ -19,7 +20,10 @@ def run_test():
     print("Starting Dashboard Logic Test...")
     
     api_key = os.getenv("ALPHA_VANTAGE_API_KEY", "")
-    if not api_key:
+    # PEG_RECORD=<archive.zip> captures this run, PEG_REPLAY=<archive.zip> replays it offline
+    record = os.getenv("PEG_RECORD")
+    replay = os.getenv("PEG_REPLAY")
+    if not api_key and not replay:
         print("WARNING: ALPHA_VANTAGE_API_KEY not found in env.")
 
     etf_ticker = "QQQ"
@@ -29,7 +33,7 @@ def run_test():
     
     # 1. Initialize
     print("1. Initializing DataProvider...")
-    dp = DataProvider(api_key=api_key)
+    dp = make_data_provider(api_key=api_key, record=record, replay=replay)
     
     # 2. Universe
     print(f"2. Fetching Universe for {etf_ticker}...")
@@ -57,19 +61,7 @@ def run_test():
     try:
         earnings_data = dp.get_forward_peg_data(universe, s_str_fetch, e_str)
         
-        common_idx = prices_full.index.intersection(earnings_data.index)
-        p_aligned = prices_full.loc[common_idx]
-        e_aligned = earnings_data.loc[common_idx]
-        
-        fw_pe = p_aligned / e_aligned
-        e_shift = e_aligned.shift(252)
-        growth = (e_aligned / e_shift) - 1
-        
-        growth = growth.replace([float('inf'), float('-inf')], float('nan'))
-        growth[growth < 0.01] = float('nan')
-        
-        peg_ratio_full = fw_pe / (growth * 100)
-        peg_ratio_full = peg_ratio_full.ffill(limit=10)
+        peg_ratio_full = compute_forward_peg(prices_full, earnings_data)
         print("   PEG Ratio Calculated.")
         
     except Exception as e:
@@ -96,19 +88,22 @@ def run_test():
     # 5. Strategy
     print("5. Running Strategy...")
     strat = PegStrategy(top_n=top_n, rebalance_freq='ME')
-    weights = strat.generate_signals(peg_ratio, prices.index)
+    schedule = strat.generate_schedule(peg_ratio, prices.index)
     print("   Signals Generated.")
 
-    # 6. Backtest Portfolio
+    # 6-7. Backtest Portfolio and Benchmark in one batched pass
     print("6. Running Backtest...")
     bt = Backtester(initial_capital=10000.0)
-    res_port = bt.run_backtest(prices, weights)
-    print(f"   Final Portfolio Value: {res_port['Portfolio_Value'].iloc[-1]:.2f}")
-
-    # 7. Backtest Benchmark
+    strategies = {'Strategy': schedule}
+    all_prices = prices
     if not bm_price.empty:
-        bm_weights = pd.DataFrame(1.0, index=bm_price.index, columns=bm_price.columns)
-        res_bm = bt.run_backtest(bm_price, bm_weights)
+        strategies['Benchmark'] = pd.DataFrame(1.0, index=bm_price.index, columns=bm_price.columns)
+        all_prices = prices.join(bm_price[bm_price.columns.difference(prices.columns)], how='left')
+    batch = bt.run_batch(all_prices, strategies)
+    res_port = batch['Strategy']
+    print(f"   Final Portfolio Value: {res_port['Portfolio_Value'].iloc[-1]:.2f}")
+    if 'Benchmark' in strategies:
+        res_bm = batch['Benchmark']
         print(f"   Final Benchmark Value: {res_bm['Portfolio_Value'].iloc[-1]:.2f}")
     else:
         res_bm = None
@@ -0,0 +1,191 @@
+import numpy as np
+import pandas as pd
+
+from data_loader import DataProvider, build_forward_eps_panel
+
+
+def _random_earnings(rng, n_quarters, start="2012-03-31"):
+    ends = pd.date_range(start=start, periods=n_quarters, freq="QE")
+    records = []
+    for d in ends:
+        roll = rng.random()
+        if roll < 0.05:
+            est = "None"
+        elif roll < 0.08:
+            est = None
+        elif roll < 0.10:
+            est = "n/a"
+        else:
+            est = f"{rng.normal(1.5, 0.8):.2f}"
+        records.append({"fiscalDateEnding": d.strftime("%Y-%m-%d"), "estimatedEPS": est})
+    # Off-cycle fiscal dates and duplicates exercise the overlap/overwrite rule
+    records.append({"fiscalDateEnding": "2015-05-15", "estimatedEPS": "9.99"})
+    records.append({"fiscalDateEnding": ends[10].strftime("%Y-%m-%d"), "estimatedEPS": "-1.25"})
+    rng.shuffle(records)
+    return records
+
+
+def test_eps_panel_matches_legacy_timeseries():
+    rng = np.random.default_rng(7)
+    dp = DataProvider.__new__(DataProvider)
+    earnings = {f"T{i}": _random_earnings(rng, 40) for i in range(6)}
+    earnings["EMPTY"] = []
+    tickers = list(earnings) + ["MISSING"]
+
+    for dates in (
+        pd.date_range("2013-01-01", "2022-12-31", freq="D"),
+        pd.bdate_range("2010-06-01", "2024-01-10"),
+    ):
+        panel = build_forward_eps_panel(earnings, dates, tickers=tickers)
+        assert list(panel.columns) == tickers
+        assert panel.index.equals(dates)
+        for ticker in tickers:
+            expected = dp._process_earnings_to_timeseries(earnings.get(ticker, []), dates)
+            pd.testing.assert_series_equal(panel[ticker], expected, check_names=False)
+
+
+def test_eps_panel_float32_is_typed():
+    rng = np.random.default_rng(11)
+    earnings = {"A": _random_earnings(rng, 30), "B": _random_earnings(rng, 30)}
+    dates = pd.date_range("2013-01-01", "2019-12-31", freq="D")
+
+    panel64 = build_forward_eps_panel(earnings, dates)
+    panel32 = build_forward_eps_panel(earnings, dates, dtype=np.float32)
+
+    assert (panel64.dtypes == np.float64).all()
+    assert (panel32.dtypes == np.float32).all()
+    np.testing.assert_allclose(panel32.to_numpy(), panel64.to_numpy(), rtol=1e-6)
+
+
+def test_forward_peg_data_uses_cache_and_returns_typed_panel(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rng = np.random.default_rng(3)
+    dp = DataProvider()
+    dp.earnings_store.put("A", _random_earnings(rng, 30))
+    dp.earnings_store.put("B", _random_earnings(rng, 30))
+
+    def no_fetch(tickers):
+        assert list(tickers) == []
+        return iter(())
+
+    monkeypatch.setattr(dp, "_fetch_av_earnings", no_fetch)
+
+    eps = dp.get_forward_peg_data(["A", "B"], "2014-01-01", "2018-12-31", dtype=np.float32)
+
+    assert list(eps.columns) == ["A", "B"]
+    assert (eps.dtypes == np.float32).all()
+
+
+class _FakeYahoo:
+    """ Deterministic stand-in for DataProvider._download_prices. """
+
+    def __init__(self, scale=1.0):
+        self.calls = []
+        self.scale = scale
+
+    def __call__(self, tickers, start, end):
+        self.calls.append((tuple(tickers), pd.Timestamp(start), pd.Timestamp(end)))
+        dates = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1))
+        return pd.DataFrame(
+            {t: self.scale * (ord(t[0]) + dates.dayofyear) for t in tickers},
+            index=dates,
+        )
+
+
+def test_price_history_fetches_only_missing_ranges(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dp = DataProvider()
+    fake = _FakeYahoo()
+    monkeypatch.setattr(dp, "_download_prices", fake)
+
+    first = dp.fetch_price_history(["B", "A"], "2020-01-01", "2020-06-30")
+    assert list(first.columns) == ["A", "B"]
+    assert len(fake.calls) == 1
+
+    # Fully covered: served from disk, no download
+    again = dp.fetch_price_history(["A", "B"], "2020-02-01", "2020-05-01")
+    assert len(fake.calls) == 1
+    pd.testing.assert_frame_equal(again, first.loc["2020-02-01":"2020-04-30"], check_freq=False)
+
+    # Wider window: one head download and one tail download shared by both tickers
+    wider = dp.fetch_price_history(["A", "B"], "2019-10-01", "2020-09-30")
+    assert [c[0] for c in fake.calls[1:]] == [("A", "B"), ("A", "B")]
+    head, tail = fake.calls[1:]
+    assert (head[1], head[2]) == (pd.Timestamp("2019-10-01"), pd.Timestamp("2020-01-01"))
+    assert tail[1] == first.index[-1] and tail[2] == pd.Timestamp("2020-09-30")
+    assert wider.index[0] == pd.Timestamp("2019-10-01")
+    assert wider.index.is_unique
+
+
+def test_price_history_refetches_when_adjustment_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dp = DataProvider()
+    monkeypatch.setattr(dp, "_download_prices", _FakeYahoo())
+    dp.fetch_price_history(["A"], "2020-01-01", "2020-06-30")
+
+    # A dividend re-bases all adjusted closes, so the overlapping bar no longer matches
+    rebased = _FakeYahoo(scale=0.98)
+    monkeypatch.setattr(dp, "_download_prices", rebased)
+    prices = dp.fetch_price_history(["A"], "2020-01-01", "2020-09-30")
+
+    assert rebased.calls[-1][1] == pd.Timestamp("2020-01-01")
+    np.testing.assert_allclose(prices["A"].iloc[0], 0.98 * (ord("A") + prices.index[0].dayofyear))
+
+
+def test_forward_peg_data_reports_per_ticker_progress(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rng = np.random.default_rng(5)
+    dp = DataProvider()
+    dp.earnings_store.put("A", _random_earnings(rng, 30))
+    fetched = {"B": _random_earnings(rng, 30), "C": []}
+    monkeypatch.setattr(dp, "_fetch_av_earnings", lambda tickers: ((t, fetched[t]) for t in tickers))
+
+    seen = []
+    dp.get_forward_peg_data(["A", "B", "C"], "2014-01-01", "2018-12-31", progress=lambda t, s: seen.append((t, s)))
+
+    assert seen == [("A", "cached"), ("B", "fetched"), ("C", "missing")]
+
+
+def test_failed_download_does_not_mark_range_covered(tmp_path, monkeypatch):
+    import data_loader
+
+    monkeypatch.chdir(tmp_path)
+    dp = DataProvider()
+    online = {"value": False}
+
+    def fake_download(tickers, start, end, **kwargs):
+        # Offline, yfinance returns an empty frame that still has its (field, ticker) columns
+        columns = pd.MultiIndex.from_product([["Close", "Open"], tickers])
+        if not online["value"]:
+            return pd.DataFrame(columns=columns, dtype=float)
+        dates = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1))
+        frame = pd.DataFrame(1.0, index=dates, columns=columns)
+        return frame
+
+    monkeypatch.setattr(data_loader.yf, "download", fake_download)
+
+    offline = dp.fetch_price_history(["A", "B"], "2020-01-01", "2020-06-30")
+    assert offline.shape == (0, 0)
+    assert dp.price_store.load("A") == (None, None, None)
+
+    online["value"] = True
+    prices = dp.fetch_price_history(["A", "B"], "2020-01-01", "2020-06-30")
+    assert list(prices.columns) == ["A", "B"] and len(prices) > 100
+
+
+def test_ticker_without_bars_is_covered_and_not_refetched(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dp = DataProvider()
+    yahoo = _FakeYahoo()
+
+    def pre_ipo(tickers, start, end):
+        # B is not listed yet: the batch succeeds but has no bars for it
+        return yahoo(tickers, start, end).drop(columns=["B"], errors="ignore")
+
+    monkeypatch.setattr(dp, "_download_prices", pre_ipo)
+    first = dp.fetch_price_history(["A", "B"], "2020-01-01", "2020-06-30")
+    assert list(first.columns) == ["A"]
+
+    dp.fetch_price_history(["B"], "2020-01-01", "2020-06-30")
+    dp.fetch_price_history(["A", "B"], "2020-02-01", "2020-06-30")
+    assert len(yahoo.calls) == 1
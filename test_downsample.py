@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from downsample import downsample, lttb_indices, minmax_indices
+
+
+def _curves(n_days=5040, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2005-01-03", periods=n_days)
+    equity = pd.DataFrame(np.exp(np.cumsum(rng.normal(0.0003, 0.012, (n_days, 2)), axis=0)) * 10000,
+                          index=index, columns=["Strategy", "Benchmark"])
+    return equity, equity / equity.cummax() - 1
+
+
+@pytest.mark.parametrize("method", ["minmax", "lttb"])
+def test_downsample_keeps_extremes_and_endpoints(method):
+    equity, drawdown = _curves()
+    for df in (equity, drawdown):
+        small = downsample(df, width=600, method=method)
+
+        assert len(small) <= 1200
+        assert small.index.is_monotonic_increasing
+        assert small.index[0] == df.index[0] and small.index[-1] == df.index[-1]
+        pd.testing.assert_series_equal(small.min(), df.min())
+        pd.testing.assert_series_equal(small.max(), df.max())
+        pd.testing.assert_frame_equal(small, df.loc[small.index])
+
+
+def test_minmax_buckets_and_lttb_shape():
+    values = np.array([0.0, 5.0, -3.0, 1.0, np.nan, 2.0, 9.0, -1.0, 4.0])
+    # Buckets of 3 rows: [0,5,-3] [1,nan,2] [9,-1,4]
+    assert minmax_indices(values, 3).tolist() == [0, 1, 2, 3, 5, 6, 7, 8]
+
+    # A single spike in a flat line is the largest triangle of its bucket
+    y = np.zeros(1000)
+    y[437] = 10.0
+    picks = lttb_indices(y, 50)
+    assert len(picks) == 50 and picks[0] == 0 and picks[-1] == 999
+    assert 437 in picks
+
+    short = pd.DataFrame({"a": np.arange(10.0)})
+    assert downsample(short) is short
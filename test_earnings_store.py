@@ -0,0 +1,48 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+from earnings_store import EarningsStore
+
+RECORDS = [{"fiscalDateEnding": "2024-03-31", "estimatedEPS": "1.50"}]
+
+
+def test_put_get_and_ttl(tmp_path):
+    store = EarningsStore(str(tmp_path / "earnings"), ttl_days=7)
+    assert store.get("AAPL") is None
+    assert store.is_stale("AAPL")
+
+    store.put("AAPL", RECORDS, fetched_at=datetime.now() - timedelta(days=3))
+    store.put("MSFT", RECORDS, fetched_at=datetime.now() - timedelta(days=10))
+
+    reopened = EarningsStore(str(tmp_path / "earnings"), ttl_days=7)
+    assert reopened.tickers() == ["AAPL", "MSFT"]
+    assert reopened.get("AAPL") == RECORDS
+    assert not reopened.is_stale("AAPL")
+    assert reopened.is_stale("MSFT")
+    assert not EarningsStore(str(tmp_path / "earnings"), ttl_days=None).is_stale("MSFT")
+    # No temp files left behind by the atomic writes
+    assert sorted(os.listdir(tmp_path / "earnings")) == ["AAPL.json", "MSFT.json"]
+
+
+def test_reads_are_lazy(tmp_path):
+    store = EarningsStore(str(tmp_path), ttl_days=None)
+    store.put("AAPL", RECORDS)
+    (tmp_path / "BROKEN.json").write_text("{not json")
+
+    reopened = EarningsStore(str(tmp_path), ttl_days=None)
+    assert reopened.get("AAPL") == RECORDS
+    assert reopened._memo.keys() == {"AAPL"}
+    assert reopened.get("BROKEN") is None
+
+
+def test_migrates_legacy_whole_file_cache(tmp_path):
+    legacy = tmp_path / "earnings_cache.json"
+    legacy.write_text(json.dumps({"AAPL": RECORDS, "NVDA": RECORDS}))
+
+    store = EarningsStore(str(tmp_path / "earnings"), ttl_days=30, legacy_file=str(legacy))
+
+    assert store.tickers() == ["AAPL", "NVDA"]
+    assert store.get("NVDA") == RECORDS
+    assert not legacy.exists()
+    assert (tmp_path / "earnings_cache.json.migrated").exists()
@@ -0,0 +1,82 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from estimate_store import FORWARD_YEAR, VintageEstimateStore
+
+
+def _random_vintages(rng, tickers, n_snapshots=60):
+    rows = []
+    period_ends = pd.date_range("2014-03-31", "2025-12-31", freq="QE")
+    for as_of in pd.to_datetime(rng.choice(pd.date_range("2014-01-01", "2025-06-30").values, n_snapshots)):
+        for t in tickers:
+            upcoming = period_ends[(period_ends >= as_of - pd.Timedelta(days=200)) & (period_ends <= as_of + pd.Timedelta(days=400))]
+            for end in upcoming[rng.random(len(upcoming)) < 0.7]:
+                rows.append((t, end.strftime("%Y-%m-%d"), end, as_of, rng.normal(2, 0.5)))
+            rows.append((t, FORWARD_YEAR, pd.NaT, as_of, rng.normal(8, 1)))
+    return pd.DataFrame(rows, columns=["symbol", "period", "period_end", "as_of", "eps"])
+
+
+def _reference(df, dates, tickers, period):
+    out = pd.DataFrame(np.nan, index=dates, columns=tickers)
+    for d in dates:
+        for t in tickers:
+            known = df[(df["symbol"] == t) & (df["as_of"] <= d)]
+            if period is None:
+                known = known[known["period_end"].notna()]
+                future = df[(df["symbol"] == t) & (df["period_end"] >= d)]
+                if future.empty:
+                    continue
+                known = known[known["period_end"] == future["period_end"].min()]
+            else:
+                known = known[known["period"] == period]
+            if not known.empty:
+                out.loc[d, t] = known.sort_values("as_of", kind="stable")["eps"].iloc[-1]
+    return out
+
+
+def test_as_of_matches_brute_force(tmp_path):
+    rng = np.random.default_rng(5)
+    tickers = ["AAA", "BBB", "CCC"]
+    vintages = _random_vintages(rng, tickers)
+
+    store = VintageEstimateStore(str(tmp_path / "vintages.npz"))
+    store.add(vintages)
+    store.save()
+    store = VintageEstimateStore(str(tmp_path / "vintages.npz"))
+
+    stored = store.df
+    dates = pd.bdate_range("2015-01-01", "2016-12-31")[::7]
+    query = tickers + ["ZZZ"]
+    for period in (None, FORWARD_YEAR):
+        expected = _reference(stored, dates, query, period)
+        pd.testing.assert_frame_equal(store.as_of(dates, query, period=period), expected)
+
+
+def test_ingests_snapshot_files(tmp_path):
+    pd.DataFrame({"Ticker": ["AAPL"], "Forward_EPS_Est": [9.1]}).to_csv(tmp_path / "current_forward_peg_2025-12-07.csv", index=False)
+    pd.DataFrame({"Ticker": ["AAPL"], "Forward_EPS_Est": [9.4]}).to_csv(tmp_path / "current_forward_peg_2025-12-09.csv", index=False)
+    pd.DataFrame({"Ticker": ["IBM", "IBM"], "Date": ["2025-09-30", "2025-12-31"], "Estimated_EPS": [2.4, 4.3],
+                  "Reported_EPS": [2.6, None]}).to_csv(tmp_path / "historical_estimates_20251208.csv", index=False)
+
+    store = VintageEstimateStore(str(tmp_path / "vintages.npz"))
+    assert store.ingest_directory(str(tmp_path)) == 4
+    assert store.ingest_directory(str(tmp_path)) == 0
+
+    dates = pd.to_datetime(["2025-12-06", "2025-12-08", "2025-12-10"])
+    fwd = store.as_of(dates, ["AAPL"], period=FORWARD_YEAR)["AAPL"].tolist()
+    assert np.isnan(fwd[0]) and fwd[1:] == [9.1, 9.4]
+    assert store.as_of(dates, ["IBM"])["IBM"].tolist()[1:] == [4.3, 4.3]
+
+
+def test_query_speed_100_tickers_10_years(tmp_path):
+    rng = np.random.default_rng(1)
+    store = VintageEstimateStore(str(tmp_path / "vintages.npz"))
+    store.add(_random_vintages(rng, [f"T{i:03d}" for i in range(100)], n_snapshots=120))
+    dates = pd.bdate_range("2015-01-01", "2024-12-31")
+
+    start = time.perf_counter()
+    panel = store.as_of(dates, [f"T{i:03d}" for i in range(100)])
+    assert time.perf_counter() - start < 1.0
+    assert panel.shape == (len(dates), 100)
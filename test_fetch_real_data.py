@@ -0,0 +1,65 @@
+import subprocess
+import sys
+import textwrap
+import time
+
+from fetch_real_data import SnapshotCollector
+
+
+class _FakeCollector(SnapshotCollector):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = []
+
+    def _fetch_row(self, ticker):
+        self.calls.append(ticker)
+        if ticker == 'SLOW':
+            time.sleep(2)
+        if ticker == 'NOEST':
+            raise ValueError("No estimates found")
+        return {'Ticker': ticker, 'Price': 100.0, 'Forward_EPS_Est': 5.0, 'Growth_Est': 0.2,
+                'Forward_PE': 20.0, 'Calculated_PEG': 1.0}
+
+
+def test_collect_reports_partial_failures_without_waiting_on_slow_tickers():
+    collector = _FakeCollector(max_workers=4, timeout=0.3)
+    t0 = time.monotonic()
+    df, failures = collector.collect(['AAPL', 'SLOW', 'NOEST', 'MSFT'])
+
+    assert time.monotonic() - t0 < 1.5
+    assert list(df['Ticker']) == ['AAPL', 'MSFT']
+    assert failures['NOEST'] == "No estimates found"
+    assert failures['SLOW'].startswith("Timed out")
+
+
+def test_collect_memoizes_successes_within_ttl():
+    collector = _FakeCollector(ttl=60)
+    collector.collect(['AAPL', 'NOEST'])
+    df, _ = collector.collect(['AAPL', 'NOEST', 'MSFT'])
+
+    assert sorted(collector.calls) == ['AAPL', 'MSFT', 'NOEST', 'NOEST']
+    assert list(df['Ticker']) == ['AAPL', 'MSFT']
+
+    collector.ttl = 0
+    collector.collect(['AAPL'])
+    assert collector.calls.count('AAPL') == 2
+
+
+def test_hung_ticker_does_not_hold_the_process_open():
+    script = textwrap.dedent("""
+        import threading
+        from fetch_real_data import SnapshotCollector
+
+        class Hung(SnapshotCollector):
+            def _fetch_row(self, ticker):
+                threading.Event().wait()
+
+        _, failures = Hung(timeout=0.3).collect(['HUNG'])
+        print(failures['HUNG'])
+    """)
+    t0 = time.monotonic()
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=30)
+
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.startswith("Timed out")
+    assert time.monotonic() - t0 < 15
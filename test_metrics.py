@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from metrics import Metrics
+
+
+def _series(n_series=6, n_days=500, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2020-01-01", periods=n_days)
+    returns = pd.DataFrame(rng.normal(0.0004, 0.015, (n_days, n_series)), index=index,
+                           columns=[f"S{i}" for i in range(n_series)])
+    returns.iloc[:5, 1] = np.nan  # late start
+    returns.iloc[:, 2] = 0.0      # flat: zero volatility and drawdown
+    return returns
+
+
+def test_kernel_matches_per_metric_methods():
+    returns = _series()
+    equity = (1 + returns.fillna(0)).cumprod() * 10000
+
+    table = Metrics.summary_table(returns, equity)
+
+    assert list(table.index) == list(returns.columns)
+    for name in returns.columns:
+        r, eq = returns[name], equity[name]
+        cagr = Metrics.calculate_cagr(eq)
+        max_dd = Metrics.calculate_max_drawdown(eq)
+        expected = {
+            "total_return": eq.iloc[-1] / eq.iloc[0] - 1,
+            "cagr": cagr,
+            "sharpe": Metrics.calculate_sharpe_ratio(r),
+            "sortino": Metrics.calculate_sortino_ratio(r),
+            "calmar": Metrics.calculate_calmar_ratio(cagr, max_dd),
+            "max_drawdown": max_dd,
+            "volatility": r.std() * np.sqrt(252),
+        }
+        assert table.loc[name].to_dict() == pytest.approx(expected, rel=1e-10, abs=1e-15), name
+
+
+def test_formatting_is_separate_from_values():
+    returns = _series()
+    equity = (1 + returns.fillna(0)).cumprod() * 10000
+    strategy = Metrics.get_summary_values(returns["S0"], equity["S0"])
+    benchmark = Metrics.get_summary_values(returns["S1"], equity["S1"])
+
+    stats = Metrics.get_summary_stats(returns["S0"], equity["S0"], returns["S1"], equity["S1"])
+
+    assert stats == Metrics.format_summary(strategy, benchmark)
+    assert stats["Sharpe Ratio"] == f"{strategy['sharpe']:.2f}"
+    assert stats["Active Return"] == f"{strategy['total_return'] - benchmark['total_return']:.2%}"
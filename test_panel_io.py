@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from panel_io import load_panel, save_panel
+
+
+def _panel():
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2015-01-01", periods=300, name="Date")
+    values = rng.normal(1.0, 0.2, size=(len(index), 8))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    return pd.DataFrame(values, index=index, columns=[f"T{i}" for i in range(8)])
+
+
+def test_round_trip_is_exact_and_memory_mapped(tmp_path):
+    df = _panel()
+    save_panel(df, str(tmp_path / "peg"))
+
+    loaded = load_panel(str(tmp_path / "peg"))
+    pd.testing.assert_frame_equal(loaded, df, check_freq=False)
+
+    base = loaded._mgr.blocks[0].values
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    assert isinstance(base, np.memmap)
+
+
+def test_column_subset_and_float32(tmp_path):
+    df = _panel()
+    save_panel(df, str(tmp_path / "peg"), dtype=np.float32)
+
+    subset = load_panel(str(tmp_path / "peg"), columns=["T5", "T1"])
+    assert list(subset.columns) == ["T5", "T1"]
+    assert (subset.dtypes == np.float32).all()
+    np.testing.assert_allclose(subset.to_numpy(), df[["T5", "T1"]].to_numpy(), rtol=1e-6)
+
+    with pytest.raises(KeyError):
+        load_panel(str(tmp_path / "peg"), columns=["NOPE"])
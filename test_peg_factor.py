@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from peg_factor import compute_forward_peg
+
+
+def _reference_peg(prices, eps):
+    """ The pandas calculation previously inlined in main.py and dashboard.py. """
+    common_idx = prices.index.intersection(eps.index)
+    prices_aligned = prices.loc[common_idx]
+    eps_aligned = eps.loc[common_idx]
+    forward_pe = prices_aligned / eps_aligned
+    growth_rate = (eps_aligned / eps_aligned.shift(252)) - 1
+    growth_rate = growth_rate.replace([np.inf, -np.inf], np.nan)
+    growth_rate[growth_rate < 0.01] = np.nan
+    peg_ratio = forward_pe / (growth_rate * 100)
+    return peg_ratio.ffill(limit=10), forward_pe, growth_rate
+
+
+def _panels(seed=0, n_days=700, tickers=("AAPL", "MSFT", "NVDA", "ZERO")):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2020-01-01", periods=n_days)
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_days, len(tickers))), axis=0)),
+                          index=dates, columns=list(tickers))
+    prices.iloc[rng.random(prices.shape) < 0.02] = np.nan
+
+    # Stepwise quarterly estimates with gaps, zeros and shrinking EPS
+    eps_dates = pd.date_range(dates[0] - pd.Timedelta(days=10), dates[-1], freq="D")
+    steps = np.repeat(rng.normal(5, 2, (len(eps_dates) // 60 + 1, len(tickers))), 60, axis=0)[:len(eps_dates)]
+    eps = pd.DataFrame(steps, index=eps_dates, columns=list(tickers))
+    eps.iloc[:200, 1] = np.nan
+    eps["ZERO"] = 0.0
+    eps.iloc[300:330, 2] = np.nan
+    eps["EXTRA"] = 4.0  # ticker without prices
+    return prices, eps
+
+
+def test_matches_pandas_reference():
+    prices, eps = _panels()
+    expected, expected_pe, expected_growth = _reference_peg(prices, eps)
+
+    peg, forward_pe, growth = compute_forward_peg(prices, eps, return_intermediates=True)
+
+    pd.testing.assert_frame_equal(peg, expected, check_freq=False)
+    pd.testing.assert_frame_equal(forward_pe, expected_pe, check_freq=False)
+    pd.testing.assert_frame_equal(growth, expected_growth.reindex(columns=peg.columns), check_freq=False)
+    pd.testing.assert_frame_equal(compute_forward_peg(prices, eps), expected, check_freq=False)
+    assert peg.notna().values.sum() > 0
+
+
+def test_float32_and_short_history():
+    prices, eps = _panels(seed=1)
+    expected, _, _ = _reference_peg(prices, eps)
+
+    peg = compute_forward_peg(prices, eps, dtype=np.float32)
+    assert peg.dtypes.unique().tolist() == [np.float32]
+    np.testing.assert_allclose(peg.to_numpy(), expected.to_numpy(), rtol=1e-4)
+
+    # Less history than the growth lookback yields an all-NaN panel of the right shape
+    short = compute_forward_peg(prices.iloc[:100], eps)
+    assert short.shape == (100, 5) and short.isna().all().all()
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from replay_provider import RecordingDataProvider, ReplayDataProvider, make_data_provider
+
+EARNINGS = {
+    "A": [{"fiscalDateEnding": "2020-03-31", "estimatedEPS": "1.0"},
+          {"fiscalDateEnding": "2020-06-30", "estimatedEPS": "1.2"}],
+    "B": [{"fiscalDateEnding": "2020-06-30", "estimatedEPS": "2.0"}],
+}
+
+
+def _fake_download(tickers, start, end):
+    dates = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1))
+    return pd.DataFrame({t: ord(t[0]) + np.arange(len(dates), dtype=float) for t in tickers}, index=dates)
+
+
+def _fake_av(tickers):
+    for t in tickers:
+        yield t, EARNINGS.get(t, [])
+
+
+def test_replay_serves_recorded_responses_offline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    archive = str(tmp_path / "run.zip")
+
+    recorder = RecordingDataProvider(archive, api_key="x")
+    monkeypatch.setattr(recorder, "_download_prices", _fake_download)
+    monkeypatch.setattr(recorder, "_fetch_av_earnings", _fake_av)
+    prices = recorder.fetch_price_history(["A", "B"], "2020-01-01", "2020-07-31")
+    bench = recorder.fetch_price_history(["QQQ"], "2020-01-01", "2020-07-31")
+    eps = recorder.get_forward_peg_data(["A", "B"], "2020-01-01", "2020-07-31")
+
+    # Fresh working directory: nothing cached, only the archive
+    (tmp_path / "offline").mkdir()
+    monkeypatch.chdir(tmp_path / "offline")
+    replay = ReplayDataProvider(archive)
+
+    pd.testing.assert_frame_equal(replay.fetch_price_history(["A", "B"], "2020-01-01", "2020-07-31"), prices, check_freq=False)
+    pd.testing.assert_frame_equal(replay.fetch_price_history(["QQQ"], "2020-01-01", "2020-07-31"), bench, check_freq=False)
+    pd.testing.assert_frame_equal(replay.get_forward_peg_data(["A", "B"], "2020-01-01", "2020-07-31"), eps)
+
+    # Sub-ranges of what was recorded can be replayed too
+    sub = replay.fetch_price_history(["B"], "2020-03-01", "2020-04-01")
+    pd.testing.assert_frame_equal(sub, prices.loc["2020-03-01":"2020-03-31", ["B"]], check_freq=False)
+
+
+def test_recording_merges_repeated_prices(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    archive = tmp_path / "run.zip"
+
+    recorder = RecordingDataProvider(str(archive), api_key="x")
+    monkeypatch.setattr(recorder, "_download_prices", _fake_download)
+    recorder.fetch_price_history(["A", "B"], "2020-01-01", "2020-07-31")
+    size, mtime = archive.stat().st_size, archive.stat().st_mtime_ns
+
+    # Same data again (also from a later run): nothing new, so the archive is not rewritten
+    for _ in range(3):
+        recorder.fetch_price_history(["A", "B"], "2020-02-01", "2020-05-01")
+    RecordingDataProvider(str(archive), api_key="x").fetch_price_history(["A"], "2020-01-01", "2020-07-31")
+    assert (archive.stat().st_size, archive.stat().st_mtime_ns) == (size, mtime)
+
+    # New dates extend each ticker's single series
+    recorder.fetch_price_history(["A"], "2020-07-01", "2020-09-30")
+    replay = ReplayDataProvider(str(archive))
+    assert sorted(replay.archive.prices) == ["A", "B"]
+    assert replay.fetch_price_history(["A"], "2020-01-01", "2020-09-30").index[-1] == pd.Timestamp("2020-09-29")
+
+
+def test_record_with_worker_url_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="worker_url"):
+        make_data_provider(record=str(tmp_path / "run.zip"), worker_url="http://worker.invalid")
+    assert not (tmp_path / "run.zip").exists()
@@ -0,0 +1,61 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rolling_metrics import rolling_max, rolling_metrics
+
+
+def _returns(n_days=700, n_series=5, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2020-01-01", periods=n_days)
+    returns = pd.DataFrame(rng.normal(0.0005, 0.02, (n_days, n_series)), index=index,
+                           columns=[f"S{i}" for i in range(n_series)])
+    returns.iloc[:30, 1] = np.nan   # late listing
+    returns.iloc[400, 2] = np.nan   # one-day gap
+    returns.iloc[:, 3] = 0.001      # constant: zero volatility
+    bench = pd.Series(rng.normal(0.0003, 0.01, n_days), index=index)
+    return returns, bench
+
+
+@pytest.mark.parametrize("window", [5, 63, 252])
+def test_rolling_max_matches_pandas(window):
+    returns, _ = _returns()
+    equity = (1 + returns.fillna(0)).cumprod()
+    equity.iloc[10:20, 0] = np.nan
+
+    expected = equity.rolling(window, min_periods=1).max()
+    expected.iloc[:window - 1] = np.nan
+    np.testing.assert_allclose(rolling_max(equity.to_numpy(), window), expected.to_numpy())
+
+
+@pytest.mark.parametrize("window", [63, 126])
+def test_rolling_metrics_match_pandas(window):
+    returns, bench = _returns()
+    out = rolling_metrics(returns, window, benchmark_returns=bench)
+
+    roll = returns.rolling(window)
+    vol = roll.std() * np.sqrt(252)
+    sharpe = roll.mean() * 252 / vol
+    sharpe[vol == 0] = 0.0
+    beta = returns.apply(lambda col: col.rolling(window).cov(bench)) / bench.rolling(window).var().to_numpy()[:, None]
+    equity = (1 + returns.fillna(0)).cumprod()
+    drawdown = equity / equity.rolling(window).max() - 1
+
+    pd.testing.assert_frame_equal(out['volatility'], vol, rtol=1e-7, atol=1e-12)
+    pd.testing.assert_frame_equal(out['sharpe'], sharpe, rtol=1e-6, atol=1e-9)
+    pd.testing.assert_frame_equal(out['beta'].drop(columns="S3"), beta.drop(columns="S3"), rtol=1e-6, atol=1e-9)
+    pd.testing.assert_frame_equal(out['drawdown'], drawdown, rtol=1e-12)
+
+
+def test_many_series_quickly():
+    rng = np.random.default_rng(1)
+    index = pd.bdate_range("2005-01-01", periods=5040)
+    returns = pd.DataFrame(rng.normal(0, 0.02, (5040, 500)), index=index)
+    bench = pd.Series(rng.normal(0, 0.01, 5040), index=index)
+
+    t0 = time.perf_counter()
+    out = rolling_metrics(returns, 252, benchmark_returns=bench)
+    assert time.perf_counter() - t0 < 5
+    assert out['beta'].iloc[251:].notna().all().all()
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy import PegStrategy
+
+
+def _peg_panel(seed, n_days=400, n_tickers=12):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2021-01-01", periods=n_days)
+    # Drop a few weeks so some period ends are caught up on later rows
+    dates = dates.delete(np.r_[40:70, 200:215])
+    # Continuous values: the loop's quicksort orders ties arbitrarily
+    pegs = rng.normal(1.5, 1.0, (len(dates), n_tickers))
+    pegs[rng.random(pegs.shape) < 0.2] = np.nan
+    pegs[100:130] = np.nan  # rebalance with nothing valid keeps the old weights
+    pegs[5, 3] = np.inf
+    return pd.DataFrame(pegs, index=dates, columns=[f"T{i:02d}" for i in range(n_tickers)])
+
+
+@pytest.mark.parametrize("freq", ["ME", "QE", "W"])
+@pytest.mark.parametrize("top_n", [1, 5, 20])
+def test_matches_loop_implementation(freq, top_n):
+    peg = _peg_panel(seed=top_n)
+    strategy = PegStrategy(top_n=top_n, rebalance_freq=freq)
+
+    expected = strategy._generate_signals_loop(peg, peg.index)
+    result = strategy.generate_signals(peg, peg.index)
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert (result.sum(axis=1) > 0).any()
+
+
+def test_ties_broken_by_column_order():
+    dates = pd.bdate_range("2021-01-25", "2021-02-05")
+    peg = pd.DataFrame({"A": 2.0, "B": 1.0, "C": 1.0, "D": 1.0, "E": -1.0}, index=dates)
+
+    weights = PegStrategy(top_n=2).generate_signals(peg, dates)
+
+    assert weights.iloc[-1].to_dict() == {"A": 0.0, "B": 0.5, "C": 0.5, "D": 0.0, "E": 0.0}
+    assert (weights.loc[:"2021-01-29"] == 0).all().all()
+
+
+def test_schedule_is_sparse_and_expands_to_signals():
+    peg = _peg_panel(seed=3, n_tickers=30)
+    strategy = PegStrategy(top_n=4)
+
+    schedule = strategy.generate_schedule(peg, peg.index)
+
+    assert len(schedule.weights) == 4 * len(schedule)
+    pd.testing.assert_frame_equal(schedule.to_dense(), strategy._generate_signals_loop(peg, peg.index))
+
+    # Standing weights on arbitrary dates, including ones before the first event and off the index
+    probe = pd.DatetimeIndex(["2020-12-31", "2021-03-06", str(peg.index[-1].date())])
+    at = schedule.weights_at(probe)
+    assert (at.iloc[0] == 0).all()
+    pd.testing.assert_series_equal(at.iloc[1], schedule.to_dense().loc[:"2021-03-06"].iloc[-1], check_names=False)
+
+    date, tickers, weights = list(schedule.events())[-1]
+    assert date == schedule.dates[-1] and len(tickers) == 4 and weights.sum() == pytest.approx(1.0)
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtester import Backtester
+from metrics import Metrics
+from peg_factor import compute_forward_peg
+from strategy import PegStrategy
+from sweep import run_sweep
+
+
+def _panels(seed=0, n_days=600, n_tickers=15):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2019-01-01", periods=n_days)
+    tickers = [f"T{i:02d}" for i in range(n_tickers)]
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, (n_days, n_tickers)), axis=0)),
+                          index=dates, columns=tickers)
+    quarterly = rng.normal(5, 1, (n_days // 63 + 1, n_tickers)) * np.linspace(1, 2, n_days // 63 + 1)[:, None]
+    eps = pd.DataFrame(np.repeat(quarterly, 63, axis=0)[:n_days], index=dates, columns=tickers)
+    return prices, eps
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sweep_matches_single_runs(workers):
+    prices, eps = _panels()
+    grid = {'top_n': [2, 5], 'rebalance_freq': ['ME', 'QE'], 'min_growth': [0.01, 0.2]}
+
+    results = run_sweep(prices, eps, grid, max_workers=workers)
+
+    assert len(results) == 8
+    assert list(results.columns[:3]) == ['top_n', 'rebalance_freq', 'min_growth']
+    for row in results.itertuples():
+        peg = compute_forward_peg(prices, eps, min_growth=row.min_growth)
+        schedule = PegStrategy(top_n=row.top_n, rebalance_freq=row.rebalance_freq).generate_schedule(peg, prices.index)
+        bt = Backtester().run_backtest(prices, schedule)
+        assert row.sharpe == pytest.approx(Metrics.calculate_sharpe_ratio(bt['Daily_Return']))
+        assert row.total_return == pytest.approx(bt['Portfolio_Value'].iloc[-1] / bt['Portfolio_Value'].iloc[0] - 1)
+    assert results['total_return'].nunique() > 1
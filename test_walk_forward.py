@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtester import Backtester
+from strategy import PegStrategy
+from walk_forward import make_windows, walk_forward
+
+
+def _panels(seed=0, years=6, n_tickers=15):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2015-01-01", periods=252 * years)
+    tickers = [f"T{i:02d}" for i in range(n_tickers)]
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0.0004, 0.02, (len(dates), n_tickers)), axis=0)),
+                          index=dates, columns=tickers)
+    peg = pd.DataFrame(rng.lognormal(0, 0.5, prices.shape), index=dates, columns=tickers)
+    return prices, peg
+
+
+def test_windows_roll_and_tile_the_test_periods():
+    index = pd.bdate_range("2015-01-01", "2020-12-31")
+    windows = make_windows(index, train_months=24, test_months=12)
+
+    assert len(windows) == 4
+    assert index[windows[0][1]] == pd.Timestamp("2017-01-02")
+    for (_, _, end), (_, start, _) in zip(windows, windows[1:]):
+        assert end == start
+    assert windows[-1][2] == len(index)
+
+
+def test_windows_match_full_history_backtest_and_stitch():
+    prices, peg = _panels()
+    candidates = [{'top_n': 3}, {'top_n': 8, 'rebalance_freq': 'QE'}]
+
+    windows, oos = walk_forward(prices, peg, candidates, train_months=24, test_months=12)
+
+    assert len(windows) == 4
+    full = {c['top_n']: Backtester().run_backtest(prices, PegStrategy(**c).generate_schedule(peg, prices.index))
+            for c in candidates}
+    for row in windows.itertuples():
+        expected = full[row.top_n]['Daily_Return'].loc[row.test_start:row.test_end]
+        curve = (1 + expected).cumprod()
+        assert row.total_return == pytest.approx(curve.iloc[-1] / curve.iloc[0] - 1)
+        pd.testing.assert_series_equal(oos['Daily_Return'].loc[row.test_start:row.test_end], expected,
+                                       check_names=False, check_freq=False)
+
+    assert oos.index[0] == windows['test_start'].iloc[0] and oos.index[-1] == prices.index[-1]
+    assert oos['Portfolio_Value'].iloc[-1] == pytest.approx(100000 * (1 + oos['Daily_Return']).prod())
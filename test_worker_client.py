@@ -0,0 +1,104 @@
+import base64
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from worker_client import WorkerClient, WorkerDataProvider
+
+EARNINGS = [
+    {"symbol": s, "fiscal_date_ending": d, "estimated_eps": eps, "reported_eps": None,
+     "surprise": None, "surprise_percentage": None, "report_date": None, "updated_at": u}
+    for s, d, eps, u in [
+        ("AAPL", "2024-03-31", 1.5, "2024-04-01 00:00:00"),
+        ("AAPL", "2024-06-30", 1.6, "2024-07-01 00:00:00"),
+        ("MSFT", "2024-06-30", 2.9, "2024-07-01 00:00:00"),
+    ]
+]
+PRICES = [
+    {"symbol": s, "date": d, "close": c, "updated_at": "2024-07-01 00:00:00"}
+    for s, d, c in [("AAPL", "2024-07-01", 210.0), ("AAPL", "2024-07-02", 212.0), ("MSFT", "2024-07-01", 450.0)]
+]
+
+
+class _StubWorker(BaseHTTPRequestHandler):
+    requests_seen = []
+    tables = {}
+
+    def do_GET(self):
+        expected = "Basic " + base64.b64encode(b"admin:password").decode()
+        if self.headers.get("Authorization") != expected:
+            self.send_response(401)
+            self.end_headers()
+            return
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        _StubWorker.requests_seen.append((url.path, query))
+        symbols = query["symbols"].split(",")
+        rows = [r for r in self.tables[url.path] if r["symbol"] in symbols]
+        if "since" in query:
+            rows = [r for r in rows if r["updated_at"] > query["since"]]
+
+        payload = json.dumps({"results": rows}).encode()
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            payload = gzip.compress(payload)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def worker_url():
+    _StubWorker.requests_seen = []
+    _StubWorker.tables = {"/api/earnings": list(EARNINGS), "/api/prices": list(PRICES)}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubWorker)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_batches_symbols_per_request(worker_url):
+    client = WorkerClient(worker_url, batch_size=2, sync_dir=None)
+    rows = client.fetch_earnings(["aapl", "MSFT", "NVDA"])
+
+    assert [r["fiscal_date_ending"] for r in rows["AAPL"]] == ["2024-03-31", "2024-06-30"]
+    assert rows["NVDA"] == []
+    assert sorted(q["symbols"] for _, q in _StubWorker.requests_seen) == ["AAPL,MSFT", "NVDA"]
+
+
+def test_sync_only_requests_newer_rows(worker_url, tmp_path):
+    client = WorkerClient(worker_url, sync_dir=str(tmp_path))
+    client.sync("earnings", ["AAPL", "MSFT"])
+    assert "since" not in _StubWorker.requests_seen[-1][1]
+
+    _StubWorker.tables["/api/earnings"].append(dict(EARNINGS[1], estimated_eps=1.7, updated_at="2024-07-15 00:00:00"))
+    rows = WorkerClient(worker_url, sync_dir=str(tmp_path)).sync("earnings", ["AAPL", "MSFT"])
+
+    assert _StubWorker.requests_seen[-1][1]["since"] == "2024-07-01 00:00:00"
+    assert [r["estimated_eps"] for r in rows["AAPL"]] == [1.5, 1.7]
+    assert [r["estimated_eps"] for r in rows["MSFT"]] == [2.9]
+
+
+def test_worker_data_provider(worker_url, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dp = WorkerDataProvider(worker_url)
+
+    prices = dp.fetch_price_history(["MSFT", "AAPL"], "2024-07-01", "2024-07-03")
+    assert list(prices.columns) == ["AAPL", "MSFT"]
+    assert prices.loc["2024-07-02", "MSFT"] == 450.0  # forward filled
+
+    eps = dp.get_forward_peg_data(["AAPL", "MSFT"], "2024-06-01", "2024-06-30")
+    assert eps.loc["2024-06-30", "AAPL"] == pytest.approx(1.6 * 4)
+    assert eps.loc["2024-06-30", "MSFT"] == pytest.approx(2.9 * 4)
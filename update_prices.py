@@ -1,12 +1,12 @@
 import requests
 import sys
 
-def update_prices(base_url, symbol):
+def update_prices(base_url, symbol, session=None):
     """Fetch price data for a symbol"""
     print(f"Fetching price data for {symbol}...")
     
     try:
-        response = requests.post(
+        response = (session or requests).post(
             f"{base_url}/api/update-prices",
             params={"symbol": symbol},
             timeout=60
@@ -28,21 +28,23 @@ def update_prices(base_url, symbol):
 
 if __name__ == "__main__":
     if len(sys.argv) < 3:
-        print("Usage: python update_prices.py <WORKER_URL> <SYMBOL>")
-        print("Example: python update_prices.py https://earnings-worker.brilliantforecast.workers.dev AAPL")
+        print("Usage: python update_prices.py <WORKER_URL> <SYMBOL> [SYMBOL ...]")
+        print("Example: python update_prices.py https://earnings-worker.brilliantforecast.workers.dev AAPL MSFT")
         sys.exit(1)
     
     url = sys.argv[1].rstrip('/')
-    symbol = sys.argv[2].upper()
+    symbols = [s.upper() for s in sys.argv[2:]]
     
     print(f"Worker URL: {url}")
-    print(f"Symbol: {symbol}\n")
+    print(f"Symbols: {', '.join(symbols)}\n")
     
-    success = update_prices(url, symbol)
+    # One keep-alive session for all symbols
+    session = requests.Session()
+    failed = [symbol for symbol in symbols if not update_prices(url, symbol, session=session)]
     
-    if success:
-        print(f"\n✅ Price data ready! Now you can analyze {symbol}")
-        print(f"   Visit: {url}/?symbol={symbol}")
+    if not failed:
+        print(f"\n✅ Price data ready! Now you can analyze {', '.join(symbols)}")
+        print(f"   Visit: {url}/?symbol={symbols[0]}")
     else:
-        print(f"\n❌ Failed to fetch price data")
+        print(f"\n❌ Failed to fetch price data for {', '.join(failed)}")
         sys.exit(1)
@@ -0,0 +1,155 @@
+"""
+Walk-forward (rolling train/test) evaluation of the Forward PEG strategy.
+
+Every candidate parameter set is backtested once over the whole precomputed
+price/PEG panel; windows are then just slices of those shared daily returns
+and of their cumulative product, so overlapping windows cost nothing extra.
+In each window the candidate with the best train Sharpe is evaluated on the
+following test period, and the test periods are stitched into one
+out-of-sample equity curve.
+
+    python walk_forward.py --panel_dir panels --train_months 36 --test_months 12 --top_n 3 5 10 --freq ME QE
+"""
+import argparse
+import itertools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backtester import Backtester
+from metrics import Metrics
+from panel_io import load_panel
+from strategy import PegStrategy
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_CANDIDATES = [{'top_n': 5, 'rebalance_freq': 'ME'}]
+
+
+def make_windows(index, train_months, test_months, step_months=None):
+    """
+    Row ranges [(train_start, test_start, test_end)] of rolling windows over `index`.
+    The last test period may be shorter than `test_months`.
+    """
+    step = pd.DateOffset(months=step_months or test_months)
+    windows = []
+    start = index[0]
+    while True:
+        test_start_date = start + pd.DateOffset(months=train_months)
+        if test_start_date > index[-1]:
+            break
+        test_end_date = test_start_date + pd.DateOffset(months=test_months)
+        train_start, test_start, test_end = index.searchsorted([start, test_start_date, test_end_date])
+        if test_end > test_start and test_start > train_start:
+            windows.append((train_start, test_start, test_end))
+        start = start + step
+    return windows
+
+
+def _sharpe(returns):
+    """ Metrics.calculate_sharpe_ratio for each row of a (K, days) array. """
+    std = returns.std(axis=1, ddof=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = returns.mean(axis=1) * 252 / (std * np.sqrt(252))
+    return np.where(std == 0, 0.0, sharpe)
+
+
+def walk_forward(prices, peg, candidates=None, train_months=36, test_months=12, step_months=None,
+                 initial_capital=100000.0, max_workers=None):
+    """
+    Rolling out-of-sample evaluation.
+
+    Args:
+        prices (pd.DataFrame): Daily prices.
+        peg (pd.DataFrame): Forward PEG panel (e.g. peg_factor.compute_forward_peg).
+        candidates (list of dict): PegStrategy keyword sets to choose from on each train window.
+        train_months, test_months, step_months: Window geometry (step defaults to test_months).
+
+    Returns:
+        (pd.DataFrame, pd.DataFrame): one row per window (dates, chosen parameters, train
+        Sharpe, test metrics), and the stitched out-of-sample Portfolio_Value / Daily_Return.
+        Where test periods overlap, each day's return comes from the earliest window.
+    """
+    candidates = candidates or DEFAULT_CANDIDATES
+    index = prices.index.intersection(peg.index)
+    prices = prices.loc[index]
+    peg = peg.loc[index]
+
+    # Shared state: every candidate's full-history daily returns (one batched pass) and their cumulative product
+    schedules = [PegStrategy(**c).generate_schedule(peg, index) for c in candidates]
+    batch = Backtester(initial_capital=initial_capital).run_batch(prices, schedules)
+    returns = np.stack([batch[k]['Daily_Return'].to_numpy() for k in range(len(candidates))])
+    growth = np.cumprod(1 + returns, axis=1)
+
+    windows = make_windows(index, train_months, test_months, step_months)
+    logger.info(f"Walk-forward: {len(windows)} windows x {len(candidates)} candidates on {len(index)} days")
+
+    def evaluate(window):
+        train_start, test_start, test_end = window
+        train_sharpe = _sharpe(returns[:, train_start:test_start])
+        best = int(np.argmax(train_sharpe))
+
+        # Windows start from the standing portfolio; rebase the shared cumulative product to the window
+        base = growth[best, test_start - 1] if test_start > 0 else 1.0
+        dates = index[test_start:test_end]
+        curve = pd.Series(growth[best, test_start:test_end] / base * initial_capital, index=dates)
+        daily = pd.Series(returns[best, test_start:test_end], index=dates)
+        return best, {
+            'train_start': index[train_start],
+            'test_start': dates[0],
+            'test_end': dates[-1],
+            **candidates[best],
+            'train_sharpe': train_sharpe[best],
+            **Metrics.get_summary_values(daily, curve),
+        }
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(evaluate, windows))
+
+    # Stitch test periods: fill latest window first so the earliest one wins on overlaps
+    owner = np.full(len(index), -1, dtype=np.int64)
+    for (_, test_start, test_end), (best, _) in reversed(list(zip(windows, results))):
+        owner[test_start:test_end] = best
+    positions = np.flatnonzero(owner >= 0)
+    oos_returns = pd.Series(returns[owner[positions], positions], index=index[positions])
+    oos = pd.DataFrame({
+        'Portfolio_Value': (1 + oos_returns).cumprod() * initial_capital,
+        'Daily_Return': oos_returns,
+    })
+    return pd.DataFrame([row for _, row in results]), oos
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Walk-forward evaluation of the Forward PEG strategy')
+    parser.add_argument('--panel_dir', type=str, default='panels', help='Panels written by main.py (prices, peg_ratio)')
+    parser.add_argument('--train_months', type=int, default=36)
+    parser.add_argument('--test_months', type=int, default=12)
+    parser.add_argument('--step_months', type=int, default=None, help='Defaults to --test_months (non-overlapping tests)')
+    parser.add_argument('--top_n', type=int, nargs='+', default=[5])
+    parser.add_argument('--freq', type=str, nargs='+', default=['ME'])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out', type=str, default='walk_forward')
+    args = parser.parse_args()
+
+    prices = load_panel(os.path.join(args.panel_dir, "prices"))
+    peg = load_panel(os.path.join(args.panel_dir, "peg_ratio"))
+    candidates = [{'top_n': n, 'rebalance_freq': f} for n, f in itertools.product(args.top_n, args.freq)]
+
+    windows, oos = walk_forward(prices, peg, candidates, args.train_months, args.test_months, args.step_months,
+                                max_workers=args.workers)
+    windows.to_csv(f"{args.out}_windows.csv", index=False)
+    oos.to_csv(f"{args.out}_oos.csv")
+    logger.info(f"Results saved to {args.out}_windows.csv and {args.out}_oos.csv")
+
+    print(windows.to_string(index=False))
+    print("\nStitched out-of-sample:")
+    for k, v in Metrics.get_summary_stats(oos['Daily_Return'], oos['Portfolio_Value']).items():
+        print(f" {k:<15}: {v}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import json
+import logging
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from data_loader import DataProvider
+
+# Must match MAX_SYMBOLS in earnings-worker/src/routes/legacy.ts
+MAX_SYMBOLS_PER_REQUEST = 50
+
+
+class WorkerClient:
+    """
+    Bulk client for the earnings-worker /api/earnings and /api/prices routes.
+
+    Symbols are requested in batches (`?symbols=A,B,C`) over one pooled
+    keep-alive session, several batches at a time; responses are gzip-encoded
+    by Cloudflare. With a `sync_dir`, rows are mirrored locally per symbol and
+    only rows whose `updated_at` is newer than the last sync are requested.
+    """
+
+    KEYS = {'earnings': 'fiscal_date_ending', 'prices': 'date'}
+
+    def __init__(self, base_url=None, auth=None, batch_size=MAX_SYMBOLS_PER_REQUEST, max_workers=4,
+                 timeout=60, sync_dir=os.path.join("cache", "worker")):
+        self.logger = logging.getLogger(__name__)
+        self.base_url = (base_url or os.getenv("WORKER_URL", "")).rstrip('/')
+        if not self.base_url:
+            raise ValueError("Worker URL required (argument or WORKER_URL)")
+        self.batch_size = min(batch_size, MAX_SYMBOLS_PER_REQUEST)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.sync_dir = sync_dir
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Accept-Encoding': 'gzip', 'Accept': 'application/json'})
+        self.session.auth = auth or (os.getenv("AUTH_USERNAME", "admin"), os.getenv("AUTH_PASSWORD", "password"))
+
+    def _get_batch(self, route, symbols, since=None, **params):
+        params = {'symbols': ','.join(symbols), **params}
+        if since:
+            params['since'] = since
+        r = self.session.get(f"{self.base_url}/api/{route}", params=params, timeout=self.timeout)
+        r.raise_for_status()
+        return r.json().get('results', [])
+
+    def _fetch(self, route, symbols, since=None, **params):
+        """ Returns {symbol: [rows]} for all symbols, batches fetched concurrently. """
+        symbols = [s.upper() for s in symbols]
+        batches = [symbols[i:i + self.batch_size] for i in range(0, len(symbols), self.batch_size)]
+        by_symbol = {s: [] for s in symbols}
+        if not batches:
+            return by_symbol
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+            batch_since = [since(b) if callable(since) else since for b in batches]
+            for rows in pool.map(lambda args: self._get_batch(route, args[0], args[1], **params), zip(batches, batch_since)):
+                for row in rows:
+                    by_symbol.setdefault(row['symbol'], []).append(row)
+        return by_symbol
+
+    def fetch_earnings(self, symbols, since=None):
+        """ Raw earnings_estimates rows per symbol. """
+        return self._fetch('earnings', symbols, since=since)
+
+    def fetch_prices(self, symbols, since=None, start=None):
+        """ Raw stock_prices rows (symbol, date, close, updated_at) per symbol. """
+        params = {'start': start} if start else {}
+        return self._fetch('prices', symbols, since=since, **params)
+
+    # --- Incremental local mirror ---
+
+    def _sync_path(self, route, symbol):
+        safe = re.sub(r'[^A-Za-z0-9._-]', '_', symbol)
+        return os.path.join(self.sync_dir, route, f"{safe}.json")
+
+    def _read_mirror(self, route, symbol):
+        path = self._sync_path(route, symbol)
+        if not os.path.exists(path):
+            return {'updated_at': None, 'rows': []}
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _write_mirror(self, route, symbol, mirror):
+        directory = os.path.dirname(self._sync_path(route, symbol))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(mirror, f)
+        os.replace(tmp_path, self._sync_path(route, symbol))
+
+    def sync(self, route, symbols):
+        """
+        Brings the local mirror of `route` ('earnings' or 'prices') up to date and
+        returns {symbol: [rows]}. Each batch asks only for rows updated after the
+        oldest last-sync time among its symbols; never-synced symbols get everything.
+        """
+        key = self.KEYS[route]
+        symbols = [s.upper() for s in symbols]
+        mirrors = {s: self._read_mirror(route, s) for s in symbols}
+
+        def batch_since(batch):
+            stamps = [mirrors[s]['updated_at'] for s in batch]
+            return None if None in stamps else min(stamps)
+
+        fresh = self._fetch(route, symbols, since=batch_since)
+        for symbol in symbols:
+            rows = fresh.get(symbol, [])
+            if not rows:
+                continue
+            merged = {r[key]: r for r in mirrors[symbol]['rows']}
+            merged.update({r[key]: r for r in rows})
+            stamps = [r.get('updated_at') for r in merged.values() if r.get('updated_at')]
+            mirrors[symbol] = {
+                'updated_at': max(stamps) if stamps else None,
+                'rows': sorted(merged.values(), key=lambda r: r[key]),
+            }
+            self._write_mirror(route, symbol, mirrors[symbol])
+        return {s: mirrors[s]['rows'] for s in symbols}
+
+
+def _to_av_record(row):
+    """ Maps an earnings_estimates row to the Alpha Vantage quarterlyEarnings shape. """
+    def fmt(value):
+        return 'None' if value is None else str(value)
+
+    return {
+        'fiscalDateEnding': row['fiscal_date_ending'],
+        'reportedDate': row.get('report_date'),
+        'reportedEPS': fmt(row.get('reported_eps')),
+        'estimatedEPS': fmt(row.get('estimated_eps')),
+        'surprise': fmt(row.get('surprise')),
+        'surprisePercentage': fmt(row.get('surprise_percentage')),
+    }
+
+
+class WorkerDataProvider(DataProvider):
+    """
+    DataProvider backed by the earnings-worker's D1 tables instead of Yahoo and Alpha Vantage.
+
+    Note: stock_prices holds the close stored by the worker's price job; unlike
+    the Yahoo path it is not guaranteed to be dividend-adjusted.
+    """
+
+    def __init__(self, base_url=None, client=None, **kwargs):
+        kwargs['api_key'] = None
+        super().__init__(**kwargs)
+        self.client = client or WorkerClient(base_url)
+
+    def fetch_price_history(self, tickers, start_date, end_date):
+        self.logger.info(f"Fetching price data for {len(tickers)} tickers from worker {self.client.base_url}")
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date)
+        rows = self.client.sync('prices', tickers)
+        columns = {}
+        for ticker in sorted(tickers):
+            symbol_rows = rows.get(ticker.upper(), [])
+            if not symbol_rows:
+                continue
+            series = pd.Series(
+                [r['close'] for r in symbol_rows],
+                index=pd.to_datetime([r['date'] for r in symbol_rows]),
+                dtype=float,
+            )
+            columns[ticker] = series[(series.index >= start) & (series.index < end)]
+        if not columns:
+            return pd.DataFrame()
+        data = pd.DataFrame(columns)
+        data.index.name = 'Date'
+        return data.ffill(limit=3)
+
+    def _load_earnings(self, tickers, progress=None):
+        rows = self.client.sync('earnings', tickers)
+        earnings = {}
+        for ticker in tickers:
+            symbol_rows = rows.get(ticker.upper(), [])
+            if symbol_rows:
+                earnings[ticker] = [_to_av_record(r) for r in symbol_rows]
+                status = "fetched"
+            else:
+                self.logger.warning(f"No earnings data for {ticker} in worker")
+                status = "missing"
+            if progress:
+                progress(ticker, status)
+        return earnings